@@ -0,0 +1 @@
+"""Database engine and table definitions."""
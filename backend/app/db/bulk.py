@@ -0,0 +1,60 @@
+"""Bulk writes with asyncpg's binary COPY."""
+
+import uuid
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import Table, column, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.expression import TableClause
+
+
+async def copy_records(
+    conn: AsyncConnection, target: Table | TableClause, columns: Sequence[str], records: Iterable
+) -> None:
+    """
+    Stream rows into a table with a single binary COPY.
+
+    Runs in the connection's current transaction, which must already have
+    executed a statement (SQLAlchemy's asyncpg adapter begins transactions
+    lazily, and COPY bypasses it).
+
+    Args:
+        conn: Connection inside a transaction
+        target: Table to copy into
+        columns: Columns the records provide, in order
+        records: Row tuples
+    """
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+        target.name, records=records, columns=list(columns)
+    )
+
+
+async def stage_records(
+    conn: AsyncConnection, target: Table, columns: Sequence[str], records: Iterable
+) -> TableClause:
+    """
+    COPY rows into a temporary table shaped like ``target``, for merging with SQL.
+
+    COPY can't skip or update conflicting rows, so upserts copy into a
+    staging table first and then run ``INSERT ... SELECT ... ON CONFLICT``
+    against it. The staging table is dropped when the transaction commits.
+
+    Args:
+        conn: Connection inside a transaction
+        target: Table whose columns (and defaults) the staging table copies
+        columns: Columns the records provide, in order
+        records: Row tuples
+
+    Returns:
+        The staging table, with ``columns``
+    """
+    staging = table(f"_staging_{target.name}_{uuid.uuid4().hex[:8]}", *map(column, columns))
+    await conn.execute(
+        text(
+            f'CREATE TEMPORARY TABLE "{staging.name}" '
+            f'(LIKE "{target.name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+        )
+    )
+    await copy_records(conn, staging, columns, records)
+    return staging
@@ -0,0 +1,172 @@
+"""Async database engine, session factory and connection pool telemetry."""
+
+import logging
+import time
+import uuid
+from typing import NamedTuple
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.config import settings
+from app.db.tables import metadata
+from app.services.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKOUT_DURATION,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Singleton instances
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+class PoolStats(NamedTuple):
+    """Snapshot of connection pool usage."""
+
+    checked_out: int
+    idle: int
+    capacity: int  # Pool size + overflow
+
+
+class _InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that reports checkout waits and usage to Prometheus.
+
+    Hooks the pool's get/return implementation methods, so usage gauges
+    are updated after each change rather than while it is in progress.
+    """
+
+    @property
+    def capacity(self) -> int:
+        """Most connections the pool will open (pool size + overflow)."""
+        return self.size() + max(self._max_overflow, 0)
+
+    def stats(self) -> PoolStats:
+        """Current usage."""
+        return PoolStats(self.checkedout(), self.checkedin(), self.capacity)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+        self._record_usage()
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        DB_POOL_CONNECTIONS.labels("checked_out").set(self.checkedout())
+        DB_POOL_CONNECTIONS.labels("idle").set(self.checkedin())
+
+
+def init_engine() -> AsyncEngine:
+    """
+    Create the engine and session factory from settings (once).
+
+    Called at application startup; ``get_engine`` falls back to it for
+    scripts and tests that run without the lifespan.
+
+    Raises:
+        ValueError: If DATABASE_URL is not configured
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        return _engine
+    if not settings.DATABASE_URL:
+        error_msg = "Database not configured"
+        raise ValueError(error_msg)
+
+    connect_args: dict = {
+        # asyncpg's own cache, used for statements sent outside SQLAlchemy's
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        # SQLAlchemy's per-connection cache of prepared statements
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DATABASE_UNIQUE_STATEMENT_NAMES:
+        # PgBouncer in transaction mode may hand each transaction a different server
+        # connection, where a reused statement name would collide or be missing
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+
+    _engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=_InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    DB_POOL_CAPACITY.set(pool_stats(_engine).capacity)
+    _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+    logger.info(
+        "Database engine created",
+        extra={
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+    )
+    return _engine
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Get the async database engine, creating it if needed.
+
+    Raises:
+        ValueError: If DATABASE_URL is not configured
+    """
+    return _engine if _engine is not None else init_engine()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Get the ORM session factory bound to the engine.
+
+    Raises:
+        ValueError: If DATABASE_URL is not configured
+    """
+    init_engine()
+    return _session_factory  # type: ignore[return-value]
+
+
+def pool_stats(engine: AsyncEngine) -> PoolStats:
+    """Current usage of an engine's connection pool (zeros for other pool types)."""
+    pool = engine.sync_engine.pool
+    return pool.stats() if isinstance(pool, _InstrumentedPool) else PoolStats(0, 0, 0)
+
+
+async def create_tables() -> None:
+    """Create any missing tables (tests and benchmarks; deployments run just migrate)."""
+    async with get_engine().begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    logger.info("Database tables ready")
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections."""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+        DB_POOL_CONNECTIONS.labels("checked_out").set(0)
+        DB_POOL_CONNECTIONS.labels("idle").set(0)
+        DB_POOL_CAPACITY.set(0)
@@ -0,0 +1,153 @@
+"""SQLAlchemy Core table definitions."""
+
+from sqlalchemy import (
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+
+metadata = MetaData()
+
+# Cached chat completions, keyed by a hash of the request (see services/response_cache.py)
+response_cache = Table(
+    "response_cache",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("content", Text, nullable=False),
+    Column("model", String(100), nullable=False),
+    Column("tokens_used", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("expires_at", DateTime(timezone=True), nullable=False, index=True),
+    Column(
+        "last_accessed_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+    ),
+)
+
+# Uploaded documents; each upload of a document adds a version
+documents = Table(
+    "documents",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("filename", String(255), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+document_versions = Table(
+    "document_versions",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column(
+        "document_id",
+        String(36),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    ),
+    Column("sha256", String(64), nullable=False, index=True),
+    Column("page_count", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Content-addressed chunk text, shared by every version that contains it
+# (see services/chunking.py). The 'simple' text search configuration doesn't stem
+# or drop stop words, so exact tokens like order numbers and SKUs stay matchable.
+chunks = Table(
+    "chunks",
+    metadata,
+    Column("hash", String(64), primary_key=True),
+    Column("text", Text, nullable=False),
+    Column("tsv", TSVECTOR, Computed("to_tsvector('simple', text)", persisted=True)),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Index("ix_chunks_tsv", "tsv", postgresql_using="gin"),
+)
+
+# Ordered chunk references of a document version
+document_version_chunks = Table(
+    "document_version_chunks",
+    metadata,
+    Column(
+        "version_id",
+        String(36),
+        ForeignKey("document_versions.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("position", Integer, primary_key=True),
+    Column("chunk_hash", String(64), ForeignKey("chunks.hash"), nullable=False, index=True),
+    Column("page", Integer, nullable=False),
+)
+
+# Key fields extracted from a version's text (see services/field_extraction.py)
+document_fields = Table(
+    "document_fields",
+    metadata,
+    Column(
+        "version_id",
+        String(36),
+        ForeignKey("document_versions.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("name", String(50), primary_key=True),
+    Column("value", Text, nullable=False),
+    Column("source", String(10), nullable=False),
+    Column("confidence", Float, nullable=False),
+    Column("page", Integer),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Embedding vectors (float32 bytes), keyed by model and SHA-256 of the embedded
+# text; for document chunks the hash is the chunk hash (see services/embedding_cache.py)
+embeddings = Table(
+    "embeddings",
+    metadata,
+    Column("model", String(100), primary_key=True),
+    Column("text_hash", String(64), primary_key=True),
+    Column("dimensions", Integer, nullable=False),
+    Column("vector", LargeBinary, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Durable background jobs, claimed with FOR UPDATE SKIP LOCKED (see services/job_queue.py)
+jobs = Table(
+    "jobs",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("queue", String(50), nullable=False),
+    Column("subject_id", String(36), index=True),
+    Column("status", String(20), nullable=False),
+    Column("payload", JSONB, nullable=False),
+    Column("checkpoint", JSONB, nullable=False, server_default=text("'{}'::jsonb")),
+    Column("progress", JSONB),
+    Column("attempts", Integer, nullable=False, server_default=text("0")),
+    Column("max_attempts", Integer, nullable=False),
+    Column("error", Text),
+    Column("locked_by", String(100)),
+    Column("locked_until", DateTime(timezone=True)),
+    Column("run_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("finished_at", DateTime(timezone=True)),
+    # Claims only scan unfinished jobs
+    Index(
+        "ix_jobs_claim",
+        "queue",
+        "run_at",
+        postgresql_where=text("status IN ('queued', 'running')"),
+    ),
+)
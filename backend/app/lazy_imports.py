@@ -0,0 +1,45 @@
+"""Deferred imports of heavy third-party modules, to keep process startup fast."""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module on first attribute access instead of now.
+
+    Uses importlib's ``LazyLoader``: the module is registered in
+    ``sys.modules`` right away but only executed when one of its attributes
+    is first used. Callers must therefore only touch it at call time
+    (``openai.AsyncOpenAI(...)``, ``except openai.OpenAIError``), never in
+    module-level code, annotations evaluated at definition time, or
+    ``from name import ...`` statements, which would load it immediately.
+
+    Args:
+        name: Absolute module name, e.g. "openai" or "rich.logging"
+
+    Returns:
+        The module, executed on first use
+
+    Raises:
+        ModuleNotFoundError: If the module isn't installed
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        error_msg = f"No module named {name!r}"
+        raise ModuleNotFoundError(error_msg, name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def preload(module: ModuleType) -> None:
+    """Execute a lazily imported module now (e.g. to warm up before serving)."""
+    # Any attribute access runs the deferred import
+    vars(module)
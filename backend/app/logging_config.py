@@ -1,40 +1,81 @@
 """Logging configuration."""
 
+import atexit
+import copy
+import json
 import logging
+import queue
+import sys
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 
-from rich.console import Console
-from rich.logging import RichHandler
-from rich.traceback import install as install_rich_traceback
+# Attributes present on every LogRecord; anything else was passed via `extra={}`
+_RESERVED_ATTRS = frozenset(
+    [*vars(logging.LogRecord("", 0, "", 0, "", None, None)), "message", "asctime", "taskName"]
+)
 
-# Install rich traceback for better error formatting
-install_rich_traceback(show_locals=True)
+_queue_listener: QueueListener | None = None
 
 
-def setup_logging(log_level: str = "INFO") -> None:
+class JsonFormatter(logging.Formatter):
+    """Format records as compact single-line JSON, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+
+        return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enqueue records for the listener thread, doing as little work as possible inline."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now: args and exc_info can change
+        # or go away before the listener thread gets to the record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(log_level: str = "INFO", json_logs: bool = False) -> None:
     """
-    Configure application logging with rich formatting and colors.
+    Configure application logging.
 
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        json_logs: Emit JSON lines from a background thread (production).
+            Otherwise use rich, colored output written inline (development).
     """
-    # Create rich console
-    console = Console(stderr=True)
-
-    # Configure root logger with rich handler
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[
-            RichHandler(
-                console=console,
-                rich_tracebacks=True,
-                show_path=True,
-                tracebacks_show_locals=True,
-                markup=True,  # Enable rich markup in log messages
-            )
-        ],
-    )
+    shutdown_logging()
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, log_level.upper()))
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    if json_logs:
+        root.addHandler(_create_json_queue_handler())
+    else:
+        root.addHandler(_create_rich_handler())
 
     # Set third-party loggers to WARNING to reduce noise
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -42,3 +83,54 @@ def setup_logging(log_level: str = "INFO") -> None:
     logging.getLogger("openai").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
+
+
+def shutdown_logging() -> None:
+    """Stop the background log writer, flushing queued records."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+# Flush records still queued at exit (registered once, however often logging is set up)
+atexit.register(shutdown_logging)
+
+
+def _create_json_queue_handler() -> logging.Handler:
+    """
+    Queue handler whose records are formatted and written by a background thread.
+
+    Logging calls on the event loop only copy the record onto a queue; JSON
+    formatting and the stderr write happen on the listener thread.
+    """
+    global _queue_listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _queue_listener.start()
+
+    return _NonBlockingQueueHandler(log_queue)
+
+
+def _create_rich_handler() -> logging.Handler:
+    """Rich handler with colored output and detailed tracebacks."""
+    # Imported here: rich is only used for development logs and is slow to import
+    from rich.console import Console  # noqa: PLC0415
+    from rich.logging import RichHandler  # noqa: PLC0415
+    from rich.traceback import install as install_rich_traceback  # noqa: PLC0415
+
+    # Install rich traceback for better error formatting
+    install_rich_traceback(show_locals=True)
+
+    handler = RichHandler(
+        console=Console(stderr=True),
+        rich_tracebacks=True,
+        show_path=True,
+        tracebacks_show_locals=True,
+        markup=True,  # Enable rich markup in log messages
+    )
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    return handler
@@ -1,5 +1,6 @@
 import logging
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
@@ -7,15 +8,30 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.lazy_imports import lazy_import
 from app.logging_config import setup_logging
-from app.middleware.logging import LoggingMiddleware
-from app.middleware.request_id import RequestIDMiddleware
-from app.middleware.security import SecurityHeadersMiddleware
+from app.middleware.request_context import RequestContextMiddleware
 from app.models.errors import ErrorDetail, ErrorResponse
-from app.routes import ai, health
+from app.responses import json_response_class, trusted_model
+from app.routes import ai, documents, health, jobs, metrics, search
+from app.services.health_prober import get_health_prober
+from app.services.http_client import close_http_client
+from app.services.ingestion import INDEX_QUEUE, get_ingestion_service
+from app.services.metrics import mark_worker_stopped
+from app.services.openai_service import get_openai_service
+from app.services.tokenizer import get_tokenizer
+from app.services.vector_index import get_vector_index
+
+if TYPE_CHECKING:
+    from app.db import engine as db_engine
+    from app.services import job_queue
+else:
+    # SQLAlchemy takes a few hundred milliseconds to import: only load it to use a database
+    db_engine = lazy_import("app.db.engine")
+    job_queue = lazy_import("app.services.job_queue")
 
 # Setup logging
-setup_logging(log_level="DEBUG" if settings.DEBUG else "INFO")
+setup_logging(log_level="DEBUG" if settings.DEBUG else "INFO", json_logs=not settings.DEBUG)
 logger = logging.getLogger(__name__)
 
 
@@ -23,15 +39,47 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
-    routes = []
-    for route in app.routes:
-        if hasattr(route, "path") and hasattr(route, "methods"):
-            route_path = getattr(route, "path", "")
-            route_methods = getattr(route, "methods", set())
-            routes.append({"path": route_path, "methods": list(route_methods)})
-    logger.info(f"Registered {len(routes)} routes", extra={"routes": routes})
+    if logger.isEnabledFor(logging.DEBUG):
+        routes = []
+        for route in app.routes:
+            if hasattr(route, "path") and hasattr(route, "methods"):
+                route_path = getattr(route, "path", "")
+                route_methods = getattr(route, "methods", set())
+                routes.append({"path": route_path, "methods": list(route_methods)})
+        logger.debug(f"Registered {len(routes)} routes", extra={"routes": routes})
+    if not settings.LAZY_STARTUP:
+        # Pay for the deferred imports and client now rather than on the first requests
+        get_openai_service().warm_up()
+        get_tokenizer().warm_up()
+    if settings.DATABASE_URL:
+        # Tables come from the migrations (just migrate), not from the app
+        db_engine.init_engine()
+    # Open the memory-mapped index now rather than on the first search
+    get_vector_index()
+    health_prober = get_health_prober()
+    await health_prober.start()
+    ingestion_service = get_ingestion_service()
+    ingestion_service.start(workers=settings.INGEST_PROCESS_WORKERS or None)
+    # With queued ingestion, the final (indexing) stage runs here, next to the vector index
+    index_worker = None
+    queue = job_queue.get_job_queue() if settings.INGEST_BACKEND == "queue" else None
+    if queue is not None:
+        index_worker = job_queue.JobWorker(
+            queue, [INDEX_QUEUE], ingestion_service.run_job, settings.JOB_POLL_INTERVAL_SECONDS
+        )
+        index_worker.start()
     yield
-    # Shutdown (if needed in the future)
+    # Shutdown
+    if index_worker is not None:
+        await index_worker.stop()
+    await ingestion_service.stop()
+    # Before closing the client: a probe after that would open a new pool
+    await health_prober.stop()
+    await get_openai_service().close()
+    await close_http_client()
+    if settings.DATABASE_URL:
+        await db_engine.dispose_engine()
+    mark_worker_stopped()
 
 
 app = FastAPI(
@@ -40,14 +88,13 @@ app = FastAPI(
     version="1.0.0",
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=json_response_class(),
 )
 
 logger.info(f"🚀 Starting Mnemos API (DEBUG={settings.DEBUG})")
 
 # Middleware (order matters - last added is first executed)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(LoggingMiddleware)
-app.add_middleware(RequestIDMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 # CORS (configured per environment)
 app.add_middleware(
@@ -67,7 +114,8 @@ async def validation_exception_handler(
     """Handle validation errors with consistent format."""
     request_id = getattr(request.state, "request_id", None)
     errors = [
-        ErrorDetail(
+        trusted_model(
+            ErrorDetail,
             field=".".join(str(loc) for loc in error["loc"]),
             message=error["msg"],
             type=error["type"],
@@ -75,9 +123,10 @@ async def validation_exception_handler(
         for error in exc.errors()
     ]
 
-    return JSONResponse(
+    return json_response_class()(
         status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
-        content=ErrorResponse(
+        content=trusted_model(
+            ErrorResponse,
             error="Validation error",
             detail="Request validation failed",
             request_id=request_id,
@@ -96,9 +145,10 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
         exc_info=True,
     )
 
-    return JSONResponse(
+    return json_response_class()(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=ErrorResponse(
+        content=trusted_model(
+            ErrorResponse,
             error="Internal server error",
             detail="An unexpected error occurred" if not settings.DEBUG else str(exc),
             request_id=request_id,
@@ -110,6 +160,10 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
 # Include routers
 app.include_router(health.router)
 app.include_router(ai.router)
+app.include_router(documents.router)
+app.include_router(search.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["Root"])
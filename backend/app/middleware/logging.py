@@ -1,70 +0,0 @@
-"""Request/response logging middleware."""
-
-import logging
-import time
-
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-logger = logging.getLogger(__name__)
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Log all HTTP requests and responses."""
-
-    async def dispatch(self, request: Request, call_next):
-        # Get request ID from state (set by RequestIDMiddleware)
-        request_id = getattr(request.state, "request_id", "unknown")
-
-        # Start timer
-        start_time = time.time()
-
-        # Log request
-        logger.info(
-            f"{request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client": request.client.host if request.client else None,
-            },
-        )
-
-        # Process request
-        try:
-            response: Response = await call_next(request)
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(
-                f"{request.method} {request.url.path} - Error",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "process_time": f"{process_time:.3f}s",
-                    "error": str(e),
-                },
-                exc_info=True,
-            )
-            raise
-        else:
-            process_time = time.time() - start_time
-
-            # Log response
-            logger.info(
-                f"{request.method} {request.url.path} - {response.status_code}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "process_time": f"{process_time:.3f}s",
-                },
-            )
-
-            # Add process time header
-            response.headers["X-Process-Time"] = f"{process_time:.3f}"
-
-            return response
@@ -0,0 +1,192 @@
+"""Request context middleware: request IDs, access logging and response headers."""
+
+import functools
+import logging
+import random
+import time
+import uuid
+
+from starlette import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.services.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    UNMATCHED_ROUTE,
+    record_error,
+)
+from app.services.usage import ANONYMOUS_USER, current_user
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = b"x-request-id"
+USER_ID_HEADER = b"x-user-id"
+PROCESS_TIME_HEADER = b"x-process-time"
+# Set by this middleware, replacing any the app set (clients expect a single value)
+_REPLACED_HEADERS = frozenset({REQUEST_ID_HEADER, PROCESS_TIME_HEADER})
+_MAX_USER_ID_LENGTH = 128
+
+
+def _build_security_headers(debug: bool) -> list[tuple[bytes, bytes]]:
+    """Build the static security headers added to every response."""
+    headers = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    ]
+
+    # Don't add HSTS in development
+    if not debug:
+        headers.append((b"strict-transport-security", b"max-age=31536000; includeSubDomains"))
+
+    return headers
+
+
+class AccessLogSampler:
+    """Per-route access log sample rates, matched by longest path prefix."""
+
+    def __init__(self, rates: dict[str, float]):
+        # Longest prefix first, so "/api/v1/health/full" can override "/api/v1/health"
+        self._rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.rate_for = functools.lru_cache(maxsize=1024)(self._lookup)
+
+    def should_log(self, path: str) -> bool:
+        """Decide whether to log this request."""
+        rate = self.rate_for(path)
+        return rate >= 1.0 or random.random() < rate
+
+    def _lookup(self, path: str) -> float:
+        for prefix, rate in self._rates:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return rate
+        return 1.0
+
+
+class RequestContextMiddleware:
+    """
+    Assign request IDs, log, time and meter requests, and add response headers.
+
+    Implemented as a pure ASGI middleware so the response body is passed
+    through untouched: no extra task or memory stream per request (as with
+    ``BaseHTTPMiddleware``), and streaming responses are relayed as they are
+    produced. Headers are injected on ``http.response.start``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Static headers only depend on settings, so build them once
+        self._security_headers = _build_security_headers(settings.DEBUG)
+        self._sampler = AccessLogSampler(settings.access_log_sample_rates)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _get_request_id(scope)
+        # Attributes AI usage to the caller (see app.services.usage)
+        user_token = current_user.set(_get_user_id(scope))
+
+        # Expose as request.state.request_id (shared with exception handlers)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        start_time = time.perf_counter()
+        status_code = 500
+        log_access = self._sampler.should_log(path)
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+
+        if log_access:
+            logger.info(
+                f"{method} {path}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "query_params": scope.get("query_string", b"").decode("latin-1"),
+                    "client": client[0] if client else None,
+                },
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                message["headers"] = [
+                    *(
+                        (name, value)
+                        for name, value in message.get("headers", ())
+                        if name.lower() not in _REPLACED_HEADERS
+                    ),
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1")),
+                    (PROCESS_TIME_HEADER, f"{process_time:.3f}".encode("latin-1")),
+                    *self._security_headers,
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = time.perf_counter() - start_time
+            record_error("http", e)
+            logger.error(
+                f"{method} {path} - Error",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "process_time": f"{process_time:.3f}s",
+                    "error": str(e),
+                },
+                exc_info=True,
+            )
+            raise
+        else:
+            # Server errors are always logged, even for sampled-out routes
+            if not log_access and status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                return
+            process_time = time.perf_counter() - start_time
+            logger.info(
+                f"{method} {path} - {status_code}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "process_time": f"{process_time:.3f}s",
+                },
+            )
+        finally:
+            current_user.reset(user_token)
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, _route_template(scope), str(status_code)).observe(
+                time.perf_counter() - start_time
+            )
+
+
+def _route_template(scope: Scope) -> str:
+    """Path template of the matched route (e.g. "/api/v1/jobs/{job_id}"), set during routing."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _get_request_id(scope: Scope) -> str:
+    """Return the client-supplied X-Request-ID, or generate a new one."""
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER and value:
+            return value.decode("latin-1")
+    return str(uuid.uuid4())
+
+
+def _get_user_id(scope: Scope) -> str:
+    """Return the client-supplied X-User-ID, or the anonymous user."""
+    for name, value in scope["headers"]:
+        if name == USER_ID_HEADER and value:
+            return value.decode("latin-1")[:_MAX_USER_ID_LENGTH]
+    return ANONYMOUS_USER
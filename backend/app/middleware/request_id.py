@@ -1,26 +0,0 @@
-"""Request ID middleware for request tracing."""
-
-import uuid
-
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Add unique request ID to each request for tracing."""
-
-    async def dispatch(self, request: Request, call_next):
-        # Get or create request ID
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-
-        # Add to request state
-        request.state.request_id = request_id
-
-        # Process request
-        response: Response = await call_next(request)
-
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-
-        return response
@@ -2,20 +2,156 @@
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
+
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
 
     message: str = Field(..., min_length=1, description="User message to send to AI")
     model: str = Field(
-        default="gpt-4o-mini",
+        default=settings.CHAT_MODEL,
         description="OpenAI model to use",
     )
 
 
+class DocumentChatRequest(ChatRequest):
+    """Request model for chat endpoint, optionally answered from ingested documents."""
+
+    use_documents: bool = Field(
+        default=False,
+        description="Answer from the best matching document chunks, with citations",
+    )
+    document_id: str | None = Field(default=None, description="Only use this document")
+    tags: list[str] = Field(
+        default_factory=list, description="Only use documents with all of these tags"
+    )
+
+
+class Citation(BaseModel):
+    """A document chunk given to the model as context."""
+
+    index: int = Field(..., ge=1, description="Marker the response uses for it, e.g. [1]")
+    document_id: str = Field(..., description="Document the chunk belongs to")
+    page: int = Field(..., ge=0, description="Page the chunk is on (0-based)")
+    chunk_hash: str = Field(..., description="Content hash of the chunk")
+    score: float = Field(..., description="Search score (reciprocal rank fusion)")
+    cited: bool = Field(..., description="Whether the response refers to this chunk")
+
+
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
 
     response: str = Field(..., description="AI-generated response")
     model: str = Field(..., description="Model that generated the response")
     tokens_used: int = Field(..., ge=0, description="Total tokens used")
+    citations: list[Citation] = Field(
+        default_factory=list, description="Document chunks given as context (document chat only)"
+    )
+
+
+class ChatBatchRequest(BaseModel):
+    """Request model for batch chat endpoint."""
+
+    items: list[ChatRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Chat requests to run; results are returned in the same order",
+    )
+
+
+class ChatBatchItemError(BaseModel):
+    """Error for a single failed batch item."""
+
+    status_code: int = Field(..., description="HTTP status the item would have returned")
+    detail: str = Field(..., description="Error message")
+
+
+class ChatBatchItemResult(BaseModel):
+    """Result of a single batch item: either a response or an error."""
+
+    index: int = Field(..., ge=0, description="Position of the item in the request")
+    result: ChatResponse | None = Field(default=None, description="Response (if successful)")
+    error: ChatBatchItemError | None = Field(default=None, description="Error (if failed)")
+
+
+class ChatBatchResponse(BaseModel):
+    """Response model for batch chat endpoint."""
+
+    results: list[ChatBatchItemResult] = Field(..., description="Per-item results, in order")
+    succeeded: int = Field(..., ge=0, description="Number of successful items")
+    failed: int = Field(..., ge=0, description="Number of failed items")
+
+
+class ChatStreamToken(BaseModel):
+    """Incremental piece of a streamed chat response."""
+
+    content: str = Field(..., description="Text delta")
+
+
+class ChatStreamDone(BaseModel):
+    """Final event of a streamed chat response."""
+
+    model: str = Field(..., description="Model that generated the response")
+    tokens_used: int = Field(..., ge=0, description="Total tokens used")
+    time_to_first_token_ms: float | None = Field(
+        default=None, ge=0, description="Time until the first token arrived from the AI service"
+    )
+    total_time_ms: float = Field(..., ge=0, description="Total time to stream the response")
+
+
+class CacheStats(BaseModel):
+    """Chat response cache counters."""
+
+    backend: str = Field(..., description="Cache backend in use")
+    hits: int = Field(..., ge=0, description="Lookups served from the cache")
+    misses: int = Field(..., ge=0, description="Lookups that went to the AI service")
+    hit_ratio: float = Field(..., ge=0, le=1, description="hits / (hits + misses)")
+    evictions: int = Field(..., ge=0, description="Entries evicted by LRU or TTL")
+    entries: int | None = Field(default=None, ge=0, description="Current entries (if known)")
+
+
+class SingleFlightStats(BaseModel):
+    """Counters for coalescing of identical in-flight requests."""
+
+    executions: int = Field(..., ge=0, description="Upstream calls actually made")
+    coalesced: int = Field(..., ge=0, description="Requests that joined an in-flight call")
+    in_flight: int = Field(..., ge=0, description="Distinct calls currently in flight")
+
+
+class EmbeddingBatchStats(BaseModel):
+    """Counters for micro-batching of embedding requests."""
+
+    batches: int = Field(..., ge=0, description="Upstream embeddings requests made")
+    texts: int = Field(..., ge=0, description="Texts embedded across all batches")
+    queued: int = Field(..., ge=0, description="Texts currently waiting for a batch")
+
+
+class AIStats(BaseModel):
+    """AI service runtime statistics."""
+
+    cache: CacheStats | None = Field(default=None, description="Response cache stats (if enabled)")
+    coalescing: SingleFlightStats = Field(..., description="Request coalescing stats")
+    embeddings: EmbeddingBatchStats | None = Field(
+        default=None, description="Embedding batching stats (if the service is configured)"
+    )
+
+
+class UserUsage(BaseModel):
+    """OpenAI chat usage and estimated cost attributed to one user."""
+
+    user: str = Field(..., description="X-User-ID of the requests (or 'anonymous')")
+    requests: int = Field(default=0, ge=0, description="Chat completions made upstream")
+    prompt_tokens: int = Field(default=0, ge=0, description="Prompt tokens billed")
+    cached_prompt_tokens: int = Field(
+        default=0, ge=0, description="Prompt tokens served from the provider's prefix cache"
+    )
+    completion_tokens: int = Field(default=0, ge=0, description="Output tokens billed")
+    cost_usd: float = Field(default=0.0, ge=0, description="Estimated cost at list prices")
+
+
+class UsageReport(BaseModel):
+    """Per-user usage since this process started."""
+
+    users: list[UserUsage] = Field(..., description="Users, most recently active first")
@@ -0,0 +1,82 @@
+"""Document ingestion models."""
+
+from datetime import datetime
+from enum import StrEnum, auto
+
+from pydantic import BaseModel, Field
+
+
+class DocumentStatusEnum(StrEnum):
+    """Document ingestion status values."""
+
+    QUEUED = auto()
+    EXTRACTING = auto()
+    EMBEDDING = auto()
+    INDEXING = auto()
+    COMPLETED = auto()
+    FAILED = auto()
+
+
+class FieldSource(StrEnum):
+    """How an extracted field was found."""
+
+    RULES = auto()  # Regex and layout heuristics
+    LLM = auto()
+
+
+class ExtractedField(BaseModel):
+    """A key field extracted from a document's text."""
+
+    name: str = Field(..., description="Field name: vendor, date, total or warranty_period")
+    value: str = Field(
+        ...,
+        description="Normalized value (dates as YYYY-MM-DD, totals as 1234.50, periods as '2 years')",
+    )
+    source: FieldSource = Field(..., description="How the field was found")
+    confidence: float = Field(..., ge=0, le=1, description="Estimated likelihood it's correct")
+    page: int | None = Field(default=None, ge=0, description="Page it was found on (rules only)")
+
+
+class DocumentUploadParams(BaseModel):
+    """Document upload query parameters."""
+
+    filename: str = Field(..., min_length=1, max_length=255, description="Original file name")
+    document_id: str | None = Field(
+        default=None, max_length=36, description="Upload as a new version of this document"
+    )
+    tag: list[str] = Field(
+        default_factory=list, max_length=20, description="Labels to filter search results by"
+    )
+
+
+class DocumentStatus(BaseModel):
+    """Uploaded document and its ingestion progress."""
+
+    id: str = Field(..., description="Document ID")
+    filename: str = Field(..., description="Original file name")
+    sha256: str = Field(..., description="SHA-256 of the uploaded file")
+    size_bytes: int = Field(..., ge=0, description="File size")
+    tags: list[str] = Field(default_factory=list, description="Labels to filter search by")
+    status: DocumentStatusEnum = Field(..., description="Ingestion status")
+    pages_total: int | None = Field(default=None, ge=0, description="Page count, once known")
+    pages_processed: int = Field(default=0, ge=0, description="Pages whose text has been extracted")
+    version_id: str | None = Field(
+        default=None, description="Stored version (when a database is configured)"
+    )
+    chunks_total: int | None = Field(default=None, ge=0, description="Chunks in this version")
+    chunks_new: int | None = Field(
+        default=None, ge=0, description="Chunks not already stored from earlier uploads"
+    )
+    chunks_embedded: int | None = Field(
+        default=None, ge=0, description="Distinct chunks embedded so far (when AI is configured)"
+    )
+    fields: list[ExtractedField] = Field(
+        default_factory=list, description="Key fields found in the text, once extracted"
+    )
+    job_id: str | None = Field(
+        default=None,
+        description="Background job ingesting the document (with INGEST_BACKEND=queue)",
+    )
+    error: str | None = Field(default=None, description="Failure reason (if failed)")
+    created_at: datetime = Field(..., description="When the upload finished")
+    completed_at: datetime | None = Field(default=None, description="When ingestion finished")
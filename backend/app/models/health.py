@@ -1,5 +1,6 @@
 """Health check models."""
 
+from datetime import datetime
 from enum import StrEnum, auto
 
 from pydantic import BaseModel, Field
@@ -32,6 +33,8 @@ class ServiceHealthStatus(BaseModel):
 
     status: ServiceHealthStatusEnum = Field(..., description="Service status")
     message: str = Field(..., description="Status message")
+    checked_at: datetime | None = Field(default=None, description="When the check last ran")
+    age_seconds: float | None = Field(default=None, ge=0, description="Seconds since the check ran")
 
 
 class DetailedHealthCheck(BaseModel):
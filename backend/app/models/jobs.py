@@ -0,0 +1,41 @@
+"""Background job models."""
+
+from datetime import datetime
+from enum import StrEnum, auto
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class JobStatusEnum(StrEnum):
+    """Job status values."""
+
+    QUEUED = auto()  # Waiting to run (or to be retried)
+    RUNNING = auto()
+    COMPLETED = auto()
+    FAILED = auto()  # Gave up after its last attempt
+
+
+class JobStatus(BaseModel):
+    """A background job and its progress."""
+
+    id: str = Field(..., description="Job ID")
+    kind: str = Field(..., description="What the job does, e.g. ingest_document")
+    queue: str = Field(..., description="Queue of the job's current stage")
+    subject_id: str | None = Field(
+        default=None, description="What the job works on, e.g. a document ID"
+    )
+    status: JobStatusEnum = Field(..., description="Job status")
+    attempts: int = Field(..., ge=0, description="Attempts at the current stage so far")
+    max_attempts: int = Field(..., ge=1, description="Attempts before the job fails")
+    checkpoint: dict[str, Any] = Field(
+        default_factory=dict, description="Results of completed stages, used to resume"
+    )
+    progress: dict[str, Any] | None = Field(default=None, description="Latest progress report")
+    error: str | None = Field(default=None, description="Error of the latest failed attempt")
+    run_at: datetime = Field(..., description="When the job is (or was) due to run")
+    created_at: datetime = Field(..., description="When the job was enqueued")
+    updated_at: datetime = Field(..., description="When the job last changed")
+    finished_at: datetime | None = Field(
+        default=None, description="When the job completed or failed"
+    )
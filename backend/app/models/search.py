@@ -0,0 +1,45 @@
+"""Hybrid search models."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SearchParams(BaseModel):
+    """Search query parameters."""
+
+    q: str = Field(..., min_length=1, max_length=1000, description="Search text")
+    k: int = Field(default=10, ge=1, le=100, description="Results to return")
+    tag: list[str] = Field(
+        default_factory=list, description="Only documents with all of these tags"
+    )
+    date_from: datetime | None = Field(default=None, description="Only chunks indexed at or after")
+    date_to: datetime | None = Field(default=None, description="Only chunks indexed at or before")
+    document_id: str | None = Field(default=None, description="Only this document")
+
+
+class SearchResult(BaseModel):
+    """A matching document chunk."""
+
+    document_id: str = Field(..., description="Document the chunk belongs to")
+    page: int = Field(..., ge=0, description="Page the chunk is on (0-based)")
+    score: float = Field(..., description="Reciprocal rank fusion score across search legs")
+    chunk_hash: str = Field(..., description="Content hash of the chunk")
+    text: str | None = Field(default=None, description="Chunk text (when a database is configured)")
+    vector_score: float | None = Field(
+        default=None, description="Cosine similarity to the query (if found by vector search)"
+    )
+    lexical_score: float | None = Field(
+        default=None, description="Full-text rank (if found by full-text search)"
+    )
+
+
+class SearchResponse(BaseModel):
+    """Search results, best match first."""
+
+    query: str = Field(..., description="The search query")
+    results: list[SearchResult] = Field(..., description="Matching chunks")
+    degraded: list[str] = Field(
+        default_factory=list,
+        description="Search legs (vector, lexical) left out after a timeout or error",
+    )
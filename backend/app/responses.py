@@ -0,0 +1,105 @@
+"""Custom response classes."""
+
+from collections.abc import AsyncGenerator, Mapping
+from typing import Any, TypeVar
+
+import anyio
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_response_class() -> type[JSONResponse]:
+    """JSON response class for the app: orjson-backed with FAST_JSON_RESPONSES."""
+    return ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+
+
+def trusted_model(model_class: type[ModelT], **fields: Any) -> ModelT:  # noqa: UP047
+    """
+    Build a response model from values the application produced itself.
+
+    With FAST_JSON_RESPONSES the fields are set without validation
+    (``model_construct``): the route's ``response_model`` accepts the instance
+    as is, so nothing is validated on the way out. The values must already
+    have the declared types, e.g. nested models rather than dicts.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return model_class.model_construct(**fields)
+    return model_class(**fields)
+
+
+class CancellableStreamingResponse(StreamingResponse):
+    """
+    Streaming response that stops producing when the client goes away.
+
+    Starlette only watches for ``http.disconnect`` on older ASGI servers; here
+    we always listen for it and close the body generator, so upstream work
+    (e.g. an OpenAI token stream) is cancelled instead of running to completion.
+    """
+
+    def __init__(
+        self,
+        content: AsyncGenerator[str, None],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        super().__init__(
+            content,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+        )
+        self._generator = content
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:  # noqa: ARG002
+        try:
+            async with anyio.create_task_group() as task_group:
+
+                async def stream_and_stop() -> None:
+                    await self.stream_response(send)
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream_and_stop)
+                await self.listen_for_disconnect(receive)
+                task_group.cancel_scope.cancel()
+        finally:
+            await self._generator.aclose()
+        # Like Starlette, run background tasks once the response is over (finished or abandoned)
+        if self.background is not None:
+            await self.background()
+
+
+class EventStreamResponse(CancellableStreamingResponse):
+    """Server-Sent Events response."""
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        content: AsyncGenerator[str, None],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        super().__init__(
+            content,
+            status_code=status_code,
+            # Disable client caching and proxy buffering so events arrive immediately
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+            background=background,
+        )
+
+
+class NDJSONResponse(CancellableStreamingResponse):
+    """Newline-delimited JSON response, one object per line as it is produced."""
+
+    media_type = "application/x-ndjson"
@@ -1,11 +1,39 @@
 import logging
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, Depends, HTTPException
-from openai import OpenAIError
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
 
-from app.models.ai import ChatRequest, ChatResponse
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.ai import (
+    AIStats,
+    ChatBatchItemResult,
+    ChatBatchRequest,
+    ChatBatchResponse,
+    ChatRequest,
+    ChatResponse,
+    ChatStreamDone,
+    ChatStreamToken,
+    DocumentChatRequest,
+    UsageReport,
+)
 from app.models.common import ServiceStatus, ServiceStatusEnum
+from app.responses import EventStreamResponse, NDJSONResponse, trusted_model
+from app.routes.errors import prompt_too_long, rate_limited
+from app.services.chat_batch import run_chat_batch
 from app.services.openai_service import OpenAIService, get_openai_service
+from app.services.rag import RAGService, get_rag_service
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
+from app.services.usage import UsageLedger, get_usage_ledger
+from app.services.vector_index import SearchFilters
+
+if TYPE_CHECKING:
+    import openai
+else:
+    openai = lazy_import("openai")
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/ai", tags=["AI"])
@@ -13,12 +41,22 @@ router = APIRouter(prefix="/api/v1/ai", tags=["AI"])
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
-    request: ChatRequest,
+    request: DocumentChatRequest,
     openai_service: OpenAIService = Depends(get_openai_service),
+    rag_service: RAGService = Depends(get_rag_service),
+    cache_control: str | None = Header(None),
 ) -> ChatResponse:
     """
     Send a chat message to the AI assistant.
 
+    With `use_documents`, the answer is based on the best matching chunks of
+    ingested documents (optionally only `document_id`, or documents with all
+    of `tags`), and `citations` lists the chunks the model was given, marking
+    those the answer refers to by number (e.g. `[1]`).
+
+    Repeated questions are served from the response cache. Send
+    `Cache-Control: no-cache` to bypass it.
+
     Example request:
     ```json
     {
@@ -35,9 +73,18 @@ async def chat(
         )
 
     try:
+        if request.use_documents:
+            return await rag_service.chat(
+                request.message,
+                request.model,
+                SearchFilters(tags=tuple(request.tags), document_id=request.document_id),
+                use_cache=not _bypasses_cache(cache_control),
+            )
+
         content, model_used, tokens = await openai_service.chat_completion(
             message=request.message,
             model=request.model,
+            use_cache=not _bypasses_cache(cache_control),
         )
 
         if content is None:
@@ -46,17 +93,22 @@ async def chat(
                 detail="Failed to generate response",
             )
 
-        return ChatResponse(
+        return trusted_model(
+            ChatResponse,
             response=content,
             model=model_used,
             tokens_used=tokens,
         )
 
+    except RateLimitExceededError as e:
+        raise rate_limited(e) from e
+    except PromptTooLongError as e:
+        raise prompt_too_long(e) from e
     except ValueError as e:
         # Service not available
         logger.error("Service error in chat endpoint", exc_info=True)
         raise HTTPException(status_code=503, detail="AI service unavailable") from e
-    except OpenAIError as e:
+    except openai.OpenAIError as e:
         # OpenAI API error
         logger.error(
             "OpenAI API error in chat endpoint",
@@ -76,6 +128,135 @@ async def chat(
         ) from e
 
 
+def _bypasses_cache(cache_control: str | None) -> bool:
+    """Whether the client asked not to use cached responses."""
+    if not cache_control:
+        return False
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    return bool(directives & {"no-cache", "no-store"})
+
+
+@router.post("/chat/stream", response_class=EventStreamResponse)
+async def chat_stream(
+    request: ChatRequest,
+    openai_service: OpenAIService = Depends(get_openai_service),
+) -> EventStreamResponse:
+    """
+    Stream a chat response as Server-Sent Events.
+
+    Emits `token` events (`{"content": "..."}`) as text arrives, then a single
+    `done` event with the model, token usage and time-to-first-token. If the
+    AI service fails mid-stream an `error` event is sent instead of `done`.
+    Disconnecting cancels the upstream request.
+    """
+    if not openai_service.is_available:
+        logger.warning("Chat stream request rejected - OpenAI service not available")
+        raise HTTPException(
+            status_code=503,
+            detail="AI service is not available",
+        )
+
+    events = openai_service.chat_completion_stream(
+        message=request.message,
+        model=request.model,
+    )
+
+    # Start the upstream call before responding so errors map to status codes
+    try:
+        first_event = await anext(events)
+    except RateLimitExceededError as e:
+        raise rate_limited(e) from e
+    except PromptTooLongError as e:
+        raise prompt_too_long(e) from e
+    except ValueError as e:
+        logger.error("Service error in chat stream endpoint", exc_info=True)
+        raise HTTPException(status_code=503, detail="AI service unavailable") from e
+    except openai.OpenAIError as e:
+        logger.error(
+            "OpenAI API error in chat stream endpoint",
+            extra={"error_type": type(e).__name__},
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=502,
+            detail="External AI service error",
+        ) from e
+
+    return EventStreamResponse(_sse_events(first_event, events))
+
+
+async def _sse_events(
+    first_event: ChatStreamToken | ChatStreamDone,
+    events: AsyncGenerator[ChatStreamToken | ChatStreamDone, None],
+) -> AsyncGenerator[str, None]:
+    """Format stream events as SSE messages, closing the upstream stream when done."""
+    try:
+        yield _format_sse(first_event)
+        async for event in events:
+            yield _format_sse(event)
+    except openai.OpenAIError as e:
+        logger.error(
+            "OpenAI API error during chat stream",
+            extra={"error_type": type(e).__name__},
+            exc_info=True,
+        )
+        yield 'event: error\ndata: {"detail": "External AI service error"}\n\n'
+    finally:
+        await events.aclose()
+
+
+def _format_sse(event: BaseModel) -> str:
+    """Format a stream event as an SSE message."""
+    name = "token" if isinstance(event, ChatStreamToken) else "done"
+    return f"event: {name}\ndata: {event.model_dump_json()}\n\n"
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch(
+    request: ChatBatchRequest,
+    openai_service: OpenAIService = Depends(get_openai_service),
+    accept: str | None = Header(None),
+) -> ChatBatchResponse | NDJSONResponse:
+    """
+    Run many chat requests in one call, with bounded concurrency.
+
+    Each item succeeds or fails independently: failed items carry an `error`
+    instead of a `result`. Results are returned in request order. Send
+    `Accept: application/x-ndjson` to instead receive each item as one JSON
+    line as soon as it finishes (use `index` to match it to the request).
+    """
+    if not openai_service.is_available:
+        logger.warning("Chat batch request rejected - OpenAI service not available")
+        raise HTTPException(
+            status_code=503,
+            detail="AI service is not available",
+        )
+
+    results = run_chat_batch(openai_service, request.items, settings.AI_BATCH_CONCURRENCY)
+
+    if accept and "application/x-ndjson" in accept:
+        return NDJSONResponse(_ndjson_lines(results))
+
+    collected = sorted([result async for result in results], key=lambda r: r.index)
+    failed = sum(1 for result in collected if result.error is not None)
+    return ChatBatchResponse(
+        results=collected,
+        succeeded=len(collected) - failed,
+        failed=failed,
+    )
+
+
+async def _ndjson_lines(
+    results: AsyncGenerator[ChatBatchItemResult, None],
+) -> AsyncGenerator[str, None]:
+    """Format batch results as NDJSON, cancelling pending items if the client leaves."""
+    try:
+        async for result in results:
+            yield result.model_dump_json() + "\n"
+    finally:
+        await results.aclose()
+
+
 @router.get("/test", response_model=ServiceStatus)
 async def test_openai_connection(
     openai_service: OpenAIService = Depends(get_openai_service),
@@ -95,3 +276,27 @@ async def test_openai_connection(
         status=ServiceStatusEnum.AVAILABLE if success else ServiceStatusEnum.ERROR,
         message=message,
     )
+
+
+@router.get("/stats", response_model=AIStats)
+async def ai_stats(
+    openai_service: OpenAIService = Depends(get_openai_service),
+) -> AIStats:
+    """
+    AI service runtime statistics (response cache and request coalescing counters).
+    """
+    return openai_service.stats()
+
+
+@router.get("/usage", response_model=UsageReport)
+async def ai_usage(
+    user: str | None = None,
+    usage_ledger: UsageLedger = Depends(get_usage_ledger),
+) -> UsageReport:
+    """
+    Chat tokens and estimated cost per user, attributed by the `X-User-ID` request header.
+
+    Counts calls made by this API process since it started. Pass `user` to
+    get a single user's usage.
+    """
+    return usage_ledger.report(user)
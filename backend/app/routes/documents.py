@@ -0,0 +1,90 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+
+from app.models.documents import DocumentStatus, DocumentUploadParams
+from app.services.ingestion import (
+    DocumentNotFoundError,
+    IngestionService,
+    UnsupportedDocumentError,
+    UploadTooLargeError,
+    get_ingestion_service,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/documents", tags=["Documents"])
+
+
+@router.post(
+    "",
+    response_model=DocumentStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/pdf": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def upload_document(
+    request: Request,
+    params: Annotated[DocumentUploadParams, Query()],
+    content_length: int | None = Header(None),
+    ingestion_service: IngestionService = Depends(get_ingestion_service),
+) -> DocumentStatus:
+    """
+    Upload a PDF for ingestion.
+
+    Send the raw file as the request body (`Content-Type: application/pdf`),
+    e.g. `curl --data-binary @manual.pdf -H "Content-Type: application/pdf"
+    "/api/v1/documents?filename=manual.pdf"`. The file is streamed to disk and
+    text extraction runs in the background; poll `GET /api/v1/documents/{id}`
+    for progress. Pass `document_id` to upload a new version of an existing
+    document: only text that changed since earlier uploads is stored again.
+    Repeat `tag` to label the document for filtering search results.
+    """
+    if content_length is not None and content_length > ingestion_service.max_upload_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Document exceeds {ingestion_service.max_upload_bytes} bytes",
+        )
+
+    try:
+        return await ingestion_service.upload(
+            request.stream(), params.filename, params.document_id, params.tag
+        )
+    except DocumentNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Document not found"
+        ) from e
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document versions require a database",
+        ) from e
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Document exceeds {e.max_bytes} bytes",
+        ) from e
+    except UnsupportedDocumentError as e:
+        logger.warning("Rejected non-PDF upload", extra={"upload_filename": params.filename})
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e),
+        ) from e
+
+
+@router.get("/{document_id}", response_model=DocumentStatus)
+async def get_document(
+    document_id: str,
+    ingestion_service: IngestionService = Depends(get_ingestion_service),
+) -> DocumentStatus:
+    """
+    Document metadata and ingestion progress.
+    """
+    document = await ingestion_service.get_status(document_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    return document
@@ -0,0 +1,28 @@
+"""HTTP errors shared by route handlers."""
+
+import math
+
+from fastapi import HTTPException, status
+
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
+
+
+def rate_limited(error: RateLimitExceededError) -> HTTPException:
+    """429 telling the client when the AI service will have capacity again."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="AI service rate limit reached, retry later",
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+def prompt_too_long(error: PromptTooLongError) -> HTTPException:
+    """413 for a prompt the model's context window can't take (with room for an answer)."""
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=(
+            f"Message is too long for the model: {error.prompt_tokens} prompt tokens, "
+            f"at most {error.max_prompt_tokens}"
+        ),
+    )
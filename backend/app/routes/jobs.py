@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.lazy_imports import lazy_import
+from app.models.jobs import JobStatus
+
+if TYPE_CHECKING:
+    from app.services import job_queue as job_queue_module
+    from app.services.job_queue import JobQueue
+else:
+    # Imports SQLAlchemy: defer it to the first request
+    job_queue_module = lazy_import("app.services.job_queue")
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+
+
+def get_job_queue() -> "JobQueue | None":
+    """The job queue (None when no database is configured)."""
+    return job_queue_module.get_job_queue()
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    job_queue: "JobQueue | None" = Depends(get_job_queue),
+) -> JobStatus:
+    """
+    Background job status, attempts and progress.
+
+    Uploads return the ID of their ingestion job (`job_id`) when ingestion
+    runs in worker processes.
+    """
+    if job_queue is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background jobs require a database",
+        )
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.services.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics: HTTP latency and in-flight requests, OpenAI latency,
+    token usage, database pool checkouts and saturation, and error counts.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,60 @@
+import logging
+from typing import TYPE_CHECKING, Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.lazy_imports import lazy_import
+from app.models.search import SearchParams, SearchResponse
+from app.routes.errors import rate_limited
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.search import SearchService, get_search_service
+from app.services.vector_index import SearchFilters
+
+if TYPE_CHECKING:
+    import openai
+else:
+    openai = lazy_import("openai")
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1", tags=["Search"])
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    params: Annotated[SearchParams, Query()],
+    search_service: SearchService = Depends(get_search_service),
+) -> SearchResponse:
+    """
+    Hybrid search over ingested documents.
+
+    Combines semantic (embedding) search with full-text search, which
+    matches exact tokens like order numbers, e.g.
+    `/api/v1/search?q=warranty expiry&tag=appliances&k=5`. Supports
+    web-search syntax for the full-text part (`"exact phrase"`, `-exclude`).
+    """
+    filters = SearchFilters(
+        tags=tuple(params.tag),
+        date_from=params.date_from,
+        date_to=params.date_to,
+        document_id=params.document_id,
+    )
+    try:
+        return await search_service.search(params.q, params.k, filters)
+    except RateLimitExceededError as e:
+        raise rate_limited(e) from e
+    except ValueError as e:
+        logger.warning("Search rejected - AI service not available")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is not available",
+        ) from e
+    except openai.OpenAIError as e:
+        logger.error(
+            "OpenAI API error in search endpoint",
+            extra={"error_type": type(e).__name__},
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="External AI service error",
+        ) from e
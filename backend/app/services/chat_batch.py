@@ -0,0 +1,107 @@
+"""Fan-out of batch chat requests through OpenAIService."""
+
+import asyncio
+import logging
+import math
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
+
+from app.lazy_imports import lazy_import
+from app.models.ai import ChatBatchItemError, ChatBatchItemResult, ChatRequest, ChatResponse
+from app.services.openai_service import OpenAIService
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
+
+if TYPE_CHECKING:
+    import openai
+else:
+    openai = lazy_import("openai")
+
+logger = logging.getLogger(__name__)
+
+
+async def run_chat_batch(
+    openai_service: OpenAIService,
+    items: list[ChatRequest],
+    concurrency: int,
+) -> AsyncGenerator[ChatBatchItemResult, None]:
+    """
+    Run chat requests concurrently, yielding each result as it finishes.
+
+    At most ``concurrency`` requests are in flight at once. Failures are
+    returned as per-item errors so one bad item doesn't fail the batch.
+    Closing the generator cancels any items still pending.
+
+    Args:
+        openai_service: Service used for each completion
+        items: Chat requests to run
+        concurrency: Maximum concurrent upstream calls
+
+    Yields:
+        ChatBatchItemResult per item, in completion order (see ``index``)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, item: ChatRequest) -> ChatBatchItemResult:
+        async with semaphore:
+            return await _run_item(openai_service, index, item)
+
+    tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_item(
+    openai_service: OpenAIService, index: int, item: ChatRequest
+) -> ChatBatchItemResult:
+    """Run one batch item, converting failures into an item error."""
+    try:
+        content, model_used, tokens = await openai_service.chat_completion(
+            message=item.message,
+            model=item.model,
+        )
+    except (RateLimitExceededError, PromptTooLongError) as e:
+        return _rejected(index, e)
+    except ValueError:
+        logger.error("Service error in chat batch item", extra={"index": index}, exc_info=True)
+        return _item_error(index, 503, "AI service unavailable")
+    except openai.OpenAIError as e:
+        logger.error(
+            "OpenAI API error in chat batch item",
+            extra={"index": index, "error_type": type(e).__name__},
+            exc_info=True,
+        )
+        return _item_error(index, 502, "External AI service error")
+    except Exception:
+        logger.error("Unexpected error in chat batch item", extra={"index": index}, exc_info=True)
+        return _item_error(index, 500, "An unexpected error occurred")
+
+    if content is None:
+        return _item_error(index, 500, "Failed to generate response")
+
+    return ChatBatchItemResult(
+        index=index,
+        result=ChatResponse(response=content, model=model_used, tokens_used=tokens),
+    )
+
+
+def _rejected(
+    index: int, error: RateLimitExceededError | PromptTooLongError
+) -> ChatBatchItemResult:
+    """Item error for a call refused before reaching the AI service."""
+    if isinstance(error, PromptTooLongError):
+        return _item_error(index, 413, f"Message is too long for the model: {error}")
+    return _item_error(
+        index, 429, f"AI service rate limit reached, retry after {math.ceil(error.retry_after)}s"
+    )
+
+
+def _item_error(index: int, status_code: int, detail: str) -> ChatBatchItemResult:
+    return ChatBatchItemResult(
+        index=index,
+        error=ChatBatchItemError(status_code=status_code, detail=detail),
+    )
@@ -0,0 +1,276 @@
+"""Postgres store for documents, their versions and content-addressed chunks."""
+
+import logging
+import uuid
+from typing import NamedTuple
+
+from sqlalchemy import delete, exists, func, insert, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.db.bulk import copy_records, stage_records
+from app.db.engine import get_engine
+from app.db.tables import (
+    chunks,
+    document_fields,
+    document_version_chunks,
+    document_versions,
+    documents,
+)
+from app.models.documents import ExtractedField
+from app.services.chunking import Chunk
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration of the chunks.tsv column
+_TEXT_SEARCH_CONFIG = literal_column("'simple'")
+
+
+class StoredVersion(NamedTuple):
+    """A stored document version."""
+
+    version_id: str
+    page_count: int
+    chunks_total: int
+    new_chunk_hashes: list[str]  # Chunks this version added to the store
+
+
+class ChunkStore:
+    """
+    Documents, versions and chunks in Postgres.
+
+    A version references its chunks by hash rather than copying their text,
+    so re-uploads and lightly edited documents only add the chunks that
+    changed. ``new_chunk_hashes`` tells callers which chunks still need
+    downstream work (e.g. embedding).
+    """
+
+    async def document_exists(self, document_id: str) -> bool:
+        """Whether a document with this ID has been stored."""
+        async with get_engine().connect() as conn:
+            return bool(await conn.scalar(select(exists().where(documents.c.id == document_id))))
+
+    async def get_version_chunks(self, version_id: str) -> list[Chunk]:
+        """Chunks of a stored version, in document order."""
+        async with get_engine().connect() as conn:
+            result = await conn.execute(
+                select(chunks.c.hash, chunks.c.text, document_version_chunks.c.page)
+                .join(chunks, chunks.c.hash == document_version_chunks.c.chunk_hash)
+                .where(document_version_chunks.c.version_id == version_id)
+                .order_by(document_version_chunks.c.position)
+            )
+            return [Chunk(*row) for row in result]
+
+    async def get_texts(self, hashes: list[str]) -> dict[str, str]:
+        """Text of the given chunks, by hash (unknown hashes are left out)."""
+        if not hashes:
+            return {}
+        async with get_engine().connect() as conn:
+            result = await conn.execute(
+                select(chunks.c.hash, chunks.c.text).where(chunks.c.hash.in_(hashes))
+            )
+            return dict(result.tuples().all())
+
+    async def search_text(self, query: str, limit: int) -> dict[str, float]:
+        """
+        Full-text search over chunk text.
+
+        Args:
+            query: Web-search style query (quoted phrases, ``or``, ``-excluded``)
+            limit: Most chunks to return
+
+        Returns:
+            Rank of each matching chunk by hash, best first
+        """
+        ts_query = func.websearch_to_tsquery(_TEXT_SEARCH_CONFIG, query)
+        rank = func.ts_rank(chunks.c.tsv, ts_query)
+        async with get_engine().connect() as conn:
+            result = await conn.execute(
+                select(chunks.c.hash, rank)
+                .where(chunks.c.tsv.bool_op("@@")(ts_query))
+                .order_by(rank.desc())
+                .limit(limit)
+            )
+            return dict(result.tuples().all())
+
+    async def reuse_version(
+        self, document_id: str, filename: str, sha256: str
+    ) -> StoredVersion | None:
+        """
+        Record a version for a file that has been ingested before, without re-extracting it.
+
+        Returns:
+            The version (existing, if this document already has this file), or
+            None if the file has never been ingested
+        """
+        async with get_engine().begin() as conn:
+            source = (
+                await conn.execute(
+                    select(
+                        document_versions.c.id,
+                        document_versions.c.document_id,
+                        document_versions.c.page_count,
+                    )
+                    .where(document_versions.c.sha256 == sha256)
+                    .order_by(
+                        # Prefer this document's own version of the file
+                        (document_versions.c.document_id == document_id).desc(),
+                        document_versions.c.created_at,
+                    )
+                    .limit(1)
+                )
+            ).first()
+            if source is None:
+                return None
+
+            source_id, source_document_id, page_count = source
+            chunk_count = await conn.scalar(
+                select(func.count()).where(document_version_chunks.c.version_id == source_id)
+            )
+            if source_document_id == document_id:
+                return StoredVersion(source_id, page_count, chunk_count or 0, [])
+
+            await self._upsert_document(conn, document_id, filename)
+            version_id = str(uuid.uuid4())
+            await conn.execute(
+                insert(document_versions).values(
+                    id=version_id, document_id=document_id, sha256=sha256, page_count=page_count
+                )
+            )
+            await conn.execute(
+                insert(document_version_chunks).from_select(
+                    ["version_id", "position", "chunk_hash", "page"],
+                    select(
+                        literal(version_id),
+                        document_version_chunks.c.position,
+                        document_version_chunks.c.chunk_hash,
+                        document_version_chunks.c.page,
+                    ).where(document_version_chunks.c.version_id == source_id),
+                )
+            )
+            field_columns = ["name", "value", "source", "confidence", "page"]
+            await conn.execute(
+                insert(document_fields).from_select(
+                    ["version_id", *field_columns],
+                    select(
+                        literal(version_id), *(document_fields.c[name] for name in field_columns)
+                    ).where(document_fields.c.version_id == source_id),
+                )
+            )
+        return StoredVersion(version_id, page_count, chunk_count or 0, [])
+
+    async def add_version(
+        self,
+        document_id: str,
+        filename: str,
+        sha256: str,
+        page_count: int,
+        version_chunks: list[Chunk],
+    ) -> StoredVersion:
+        """
+        Store a new document version, inserting only chunks not already stored.
+
+        Everything is written in one transaction; chunk text and the
+        version's chunk list are streamed with binary COPY, so a large
+        manual costs a handful of round trips rather than one per chunk.
+
+        Args:
+            document_id: Document the version belongs to (created if new)
+            filename: File name of this upload
+            sha256: Hash of the uploaded file
+            page_count: Pages in the file
+            version_chunks: Chunks in document order
+
+        Returns:
+            The stored version, with the hashes of chunks that were new
+        """
+        version_id = str(uuid.uuid4())
+        unique = {chunk.hash: chunk.text for chunk in version_chunks}
+
+        async with get_engine().begin() as conn:
+            await self._upsert_document(conn, document_id, filename)
+            await conn.execute(
+                insert(document_versions).values(
+                    id=version_id, document_id=document_id, sha256=sha256, page_count=page_count
+                )
+            )
+
+            # COPY can't skip chunks that are already stored, so merge from a staging table
+            staging = await stage_records(conn, chunks, ["hash", "text"], unique.items())
+            result = await conn.execute(
+                pg_insert(chunks)
+                .from_select(["hash", "text"], select(staging.c.hash, staging.c.text))
+                .on_conflict_do_nothing(index_elements=[chunks.c.hash])
+                .returning(chunks.c.hash)
+            )
+            new_hashes = list(result.scalars())
+
+            await copy_records(
+                conn,
+                document_version_chunks,
+                ["version_id", "position", "chunk_hash", "page"],
+                (
+                    (version_id, position, chunk.hash, chunk.page)
+                    for position, chunk in enumerate(version_chunks)
+                ),
+            )
+
+        logger.info(
+            "Stored document version",
+            extra={
+                "document_id": document_id,
+                "version_id": version_id,
+                "chunks_total": len(version_chunks),
+                "chunks_new": len(new_hashes),
+            },
+        )
+        return StoredVersion(version_id, page_count, len(version_chunks), new_hashes)
+
+    async def get_fields(self, version_id: str) -> list[ExtractedField]:
+        """Key fields stored for a version."""
+        async with get_engine().connect() as conn:
+            result = await conn.execute(
+                select(
+                    document_fields.c.name,
+                    document_fields.c.value,
+                    document_fields.c.source,
+                    document_fields.c.confidence,
+                    document_fields.c.page,
+                ).where(document_fields.c.version_id == version_id)
+            )
+            return [ExtractedField(**row) for row in result.mappings()]
+
+    async def save_fields(self, version_id: str, fields: list[ExtractedField]) -> None:
+        """Store a version's key fields, replacing any stored before."""
+        async with get_engine().begin() as conn:
+            await conn.execute(
+                delete(document_fields).where(document_fields.c.version_id == version_id)
+            )
+            if fields:
+                await conn.execute(
+                    insert(document_fields),
+                    [{"version_id": version_id, **field.model_dump()} for field in fields],
+                )
+
+    async def _upsert_document(
+        self, conn: AsyncConnection, document_id: str, filename: str
+    ) -> None:
+        statement = pg_insert(documents).values(id=document_id, filename=filename)
+        await conn.execute(
+            statement.on_conflict_do_update(
+                index_elements=[documents.c.id], set_={"filename": statement.excluded.filename}
+            )
+        )
+
+
+# Singleton instance
+_chunk_store: ChunkStore | None = None
+
+
+def get_chunk_store() -> ChunkStore | None:
+    """Get or create the chunk store (None when no database is configured)."""
+    global _chunk_store
+    if _chunk_store is None and settings.DATABASE_URL:
+        _chunk_store = ChunkStore()
+    return _chunk_store
@@ -0,0 +1,112 @@
+"""
+Split document text into content-addressed chunks.
+
+Chunks never cross page boundaries and are packed from whole paragraphs,
+so an edit only changes the chunks of the paragraphs around it. Each chunk
+is identified by the SHA-256 of its normalized text: identical text in any
+document, or any version of one, maps to the same chunk.
+
+Kept free of app imports: this runs in ingestion worker processes.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import NamedTuple
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class Chunk(NamedTuple):
+    """A chunk of document text."""
+
+    hash: str
+    text: str
+    page: int  # 0-based page the chunk came from
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalize and collapse whitespace, so cosmetic differences hash the same."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def chunk_hash(normalized_text: str) -> str:
+    """Content address of a normalized chunk."""
+    return hashlib.sha256(normalized_text.encode()).hexdigest()
+
+
+def chunk_page(text: str, page: int, target_chars: int, max_chars: int) -> list[Chunk]:
+    """
+    Split one page into paragraph-aligned chunks.
+
+    Paragraphs are packed together until a chunk reaches ``target_chars``.
+    Paragraphs longer than ``max_chars`` are split at sentence boundaries
+    (or, failing that, hard-split).
+
+    Args:
+        text: Page text, as extracted
+        page: Page index
+        target_chars: Preferred chunk size
+        max_chars: Hard upper bound on chunk size
+
+    Returns:
+        Chunks in page order
+    """
+    pieces: list[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        normalized = normalize_text(paragraph)
+        if normalized:
+            pieces.extend(_split_long(normalized, max_chars))
+
+    chunks: list[Chunk] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > target_chars:
+            chunks.append(Chunk(chunk_hash(current), current, page))
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(Chunk(chunk_hash(current), current, page))
+    return chunks
+
+
+def chunk_pages(
+    pages: list[str], first_page: int, target_chars: int, max_chars: int
+) -> list[Chunk]:
+    """Chunk consecutive pages, numbering them from ``first_page``."""
+    return [
+        chunk
+        for offset, text in enumerate(pages)
+        for chunk in chunk_page(text, first_page + offset, target_chars, max_chars)
+    ]
+
+
+def _split_long(paragraph: str, max_chars: int) -> list[str]:
+    """Split a paragraph that exceeds max_chars, preferring sentence boundaries."""
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+
+    parts: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        rest = sentence
+        while len(rest) > max_chars:
+            # No usable sentence boundary: cut at the last space before the limit
+            cut = rest.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(rest[:cut].strip())
+            rest = rest[cut:].strip()
+        if current and len(current) + 1 + len(rest) > max_chars:
+            parts.append(current)
+            current = rest
+        else:
+            current = f"{current} {rest}" if current else rest
+    if current:
+        parts.append(current)
+    return parts
@@ -0,0 +1,183 @@
+"""Micro-batching of concurrent embedding requests into single API calls."""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import IntEnum
+
+import numpy as np
+
+from app.models.ai import EmbeddingBatchStats
+from app.services.metrics import EMBEDDING_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingPriority(IntEnum):
+    """Queue priority; lower values are batched first."""
+
+    QUERY = 0  # Live search and chat requests
+    BULK = 1  # Document ingestion
+
+
+@dataclass(slots=True)
+class _Item:
+    text: str
+    future: asyncio.Future[np.ndarray]
+
+
+class EmbeddingBatcher:
+    """
+    Gather concurrent embed() calls into batched upstream requests.
+
+    A batch is sent once it reaches ``max_batch_size`` texts or its oldest
+    text has waited ``max_wait_seconds``, whichever comes first. At most
+    ``max_concurrent_batches`` requests are in flight; a batch's contents are
+    only decided when a slot frees up, so queries that arrive while bulk
+    ingestion saturates the slots still go out in the very next batch.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Awaitable[np.ndarray]],
+        max_batch_size: int,
+        max_wait_seconds: float,
+        max_concurrent_batches: int,
+    ):
+        """
+        Args:
+            embed_batch: Embeds a list of texts, returning one row per text
+            max_batch_size: Most texts per upstream request
+            max_wait_seconds: Longest a text waits for its batch to fill
+            max_concurrent_batches: Most upstream requests in flight
+        """
+        self._embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queues: tuple[deque[_Item], ...] = tuple(deque() for _ in EmbeddingPriority)
+        self._queued = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrent_batches)
+        self._runner: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(
+        self, texts: list[str], priority: EmbeddingPriority = EmbeddingPriority.QUERY
+    ) -> np.ndarray:
+        """
+        Embed texts, batched together with other concurrent callers.
+
+        Args:
+            texts: Texts to embed
+            priority: Queue to wait in
+
+        Returns:
+            float32 array with one row per text, in order
+
+        Raises:
+            Exception: Whatever the upstream call raised for a batch holding these texts
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._queues[priority].extend(
+            _Item(text, future) for text, future in zip(texts, futures, strict=True)
+        )
+        self._queued.set()
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run(), name="embedding-batcher")
+
+        try:
+            vectors = await asyncio.gather(*futures)
+        except BaseException:
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled():
+                    # Mark as retrieved; the first error is re-raised below
+                    future.exception()
+            raise
+        return np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> EmbeddingBatchStats:
+        """Snapshot of the batching counters."""
+        return EmbeddingBatchStats(batches=self.batches, texts=self.texts, queued=self._pending())
+
+    async def close(self) -> None:
+        """Stop batching, cancelling in-flight requests and waiting callers."""
+        tasks = [*self._in_flight, *([self._runner] if self._runner else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        for queue in self._queues:
+            while queue:
+                queue.popleft().future.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._queued.wait()
+            deadline = loop.time() + self.max_wait_seconds
+            await self._slots.acquire()
+
+            # Give the batch until the oldest text's deadline to fill up
+            while self._pending() < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._queued.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._queued.wait(), remaining)
+
+            batch = self._take_batch()
+            if self._pending():
+                self._queued.set()
+            else:
+                self._queued.clear()
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def _pending(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def _take_batch(self) -> list[_Item]:
+        """Take up to max_batch_size live items, highest priority first."""
+        batch: list[_Item] = []
+        for queue in self._queues:
+            while queue and len(batch) < self.max_batch_size:
+                item = queue.popleft()
+                if not item.future.done():  # Skip callers that gave up
+                    batch.append(item)
+        return batch
+
+    async def _send(self, batch: list[_Item]) -> None:
+        try:
+            self.batches += 1
+            self.texts += len(batch)
+            EMBEDDING_BATCH_SIZE.observe(len(batch))
+            vectors = await self._embed_batch([item.text for item in batch])
+        except Exception as e:
+            logger.warning(
+                f"Embedding batch failed: {type(e).__name__}", extra={"batch_size": len(batch)}
+            )
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+        else:
+            for item, vector in zip(batch, vectors, strict=True):
+                if not item.future.done():
+                    item.future.set_result(vector)
+        finally:
+            self._slots.release()
+            # Cancelled by close(): don't leave callers waiting forever
+            for item in batch:
+                item.future.cancel()
@@ -0,0 +1,135 @@
+"""Two-tier embedding cache: in-process LRU in front of Postgres."""
+
+import hashlib
+import logging
+from collections import OrderedDict
+
+import asyncpg
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.bulk import stage_records
+from app.db.engine import get_engine
+from app.db.tables import embeddings
+from app.services.metrics import EMBEDDING_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Hashes per SELECT (asyncpg allows at most 32767 bind parameters)
+_BATCH_ROWS = 5000
+
+
+def text_hash(text: str) -> str:
+    """Cache key of a text (equal to the chunk hash for normalized chunk text)."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embedding vectors by (model, text hash).
+
+    Lookups check a process-local LRU first, then fetch every remaining hash
+    from Postgres in a single query (when ``persistent``), so a large
+    ingest finds its already-embedded chunks in one round trip. Postgres
+    hits are promoted into the LRU. Database errors are logged and treated
+    as misses so the cache never fails an embed call.
+    """
+
+    def __init__(self, model: str, dimensions: int, max_memory_entries: int, persistent: bool):
+        self.model = model
+        self.dimensions = dimensions
+        self.max_memory_entries = max_memory_entries
+        self.persistent = persistent
+        # text hash -> vector; ordered from least to most recently used
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    async def get_many(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            hashes: Text hashes (see text_hash)
+
+        Returns:
+            Vectors for the hashes that were cached
+        """
+        found: dict[str, np.ndarray] = {}
+        missing: list[str] = []
+        for h in dict.fromkeys(hashes):
+            vector = self._memory.get(h)
+            if vector is None:
+                missing.append(h)
+            else:
+                self._memory.move_to_end(h)
+                found[h] = vector
+        EMBEDDING_CACHE_LOOKUPS.labels("memory", "hit").inc(len(found))
+        EMBEDDING_CACHE_LOOKUPS.labels("memory", "miss").inc(len(missing))
+
+        if missing and self.persistent:
+            stored = await self._fetch(missing)
+            EMBEDDING_CACHE_LOOKUPS.labels("postgres", "hit").inc(len(stored))
+            EMBEDDING_CACHE_LOOKUPS.labels("postgres", "miss").inc(len(missing) - len(stored))
+            self._remember(stored)
+            found.update(stored)
+        return found
+
+    async def put_many(self, vectors: dict[str, np.ndarray]) -> None:
+        """Store vectors in both tiers."""
+        self._remember(vectors)
+        if not self.persistent or not vectors:
+            return
+
+        columns = ["model", "text_hash", "dimensions", "vector"]
+        records = (
+            (self.model, h, self.dimensions, vector.astype(np.float32).tobytes())
+            for h, vector in vectors.items()
+        )
+        try:
+            async with get_engine().begin() as conn:
+                # Binary COPY into staging, then upsert (COPY alone can't resolve conflicts)
+                staging = await stage_records(conn, embeddings, columns, records)
+                statement = insert(embeddings).from_select(
+                    columns, select(*(staging.c[name] for name in columns))
+                )
+                await conn.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[embeddings.c.model, embeddings.c.text_hash],
+                        set_={
+                            "dimensions": statement.excluded.dimensions,
+                            "vector": statement.excluded.vector,
+                        },
+                    )
+                )
+        except (SQLAlchemyError, asyncpg.PostgresError, OSError):
+            logger.warning(
+                "Embedding cache write failed", extra={"vectors": len(vectors)}, exc_info=True
+            )
+
+    async def _fetch(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        try:
+            async with get_engine().connect() as conn:
+                for i in range(0, len(hashes), _BATCH_ROWS):
+                    result = await conn.execute(
+                        select(embeddings.c.text_hash, embeddings.c.vector).where(
+                            embeddings.c.model == self.model,
+                            embeddings.c.dimensions == self.dimensions,
+                            embeddings.c.text_hash.in_(hashes[i : i + _BATCH_ROWS]),
+                        )
+                    )
+                    for h, vector in result:
+                        found[h] = np.frombuffer(vector, dtype=np.float32)
+        except (SQLAlchemyError, OSError):
+            logger.warning(
+                "Embedding cache lookup failed", extra={"hashes": len(hashes)}, exc_info=True
+            )
+        return found
+
+    def _remember(self, vectors: dict[str, np.ndarray]) -> None:
+        for h, vector in vectors.items():
+            self._memory[h] = vector
+            self._memory.move_to_end(h)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
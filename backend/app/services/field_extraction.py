@@ -0,0 +1,519 @@
+"""
+Key field extraction: compiled rules first, the LLM only for what they miss.
+
+Runs over a document's chunks (whitespace-normalized text, tagged with
+pages), so "layout" here means position: labels next to values, the
+leading words of the first page, the last total on a receipt. Each rule
+carries a confidence; fields the rules miss, or find below
+FIELD_EXTRACTION_MIN_CONFIDENCE, are asked of the LLM in a single call,
+and only when the text contains a cue for them (an amount for a total, the
+word "warranty" for a warranty period). Most receipts never reach the LLM.
+"""
+
+import json
+import logging
+import re
+from collections.abc import Callable
+from datetime import date
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.documents import ExtractedField, FieldSource
+from app.services.chunking import Chunk
+from app.services.metrics import FIELD_EXTRACTION_DOCUMENTS, FIELDS_EXTRACTED, record_error
+from app.services.openai_service import OpenAIService, get_openai_service
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
+
+if TYPE_CHECKING:
+    import openai
+else:
+    openai = lazy_import("openai")
+
+logger = logging.getLogger(__name__)
+
+FIELD_NAMES = ("vendor", "date", "total", "warranty_period")
+
+# Confidence given to LLM answers that don't state one
+_LLM_DEFAULT_CONFIDENCE = 0.7
+_MAX_VALUE_CHARS = 200
+# Fewest letters in a letterhead for it to pass as a vendor name
+_MIN_NAME_LETTERS = 2
+_MAX_NAME_WORDS = 6
+_MONTHS_PER_YEAR = 12
+_CENTURY = 100
+
+_MONTHS = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
+_NUMBER_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "ten": 10,
+    "twelve": 12,
+    "eighteen": 18,
+    "twenty-four": 24,
+    "thirty-six": 36,
+}
+
+_AMOUNT = r"(?P<currency>[$€£])?\s?(?P<amount>\d{1,3}(?:[,.]\d{3})+[.,]\d{2}|\d+[.,]\d{2})(?!\d)"
+# Labels that name the amount paid, strongest first
+_TOTAL_RULES = (
+    (
+        re.compile(
+            r"\b(?:grand\s+total|total\s+due|amount\s+due|balance\s+due|total\s+amount"
+            r"|amount\s+paid|total\s+paid)\b\s*:?\s*(?:[A-Z]{3}\s?)?" + _AMOUNT,
+            re.IGNORECASE,
+        ),
+        0.95,
+    ),
+    (
+        re.compile(
+            r"\b(?:total|paid)\b(?!\s+(?:savings|discount|tax|items?)\b)\s*:?\s*(?:[A-Z]{3}\s?)?"
+            + _AMOUNT,
+            re.IGNORECASE,
+        ),
+        0.85,
+    ),
+)
+_CURRENCY_AMOUNT = re.compile(r"[$€£]\s?(?P<amount>\d{1,3}(?:[,.]\d{3})+[.,]\d{2}|\d+[.,]\d{2})")
+
+_DATE = re.compile(
+    r"\b(?:"
+    r"(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})"
+    r"|(?P<num_a>\d{1,2})(?P<sep>[/.])(?P<num_b>\d{1,2})(?P=sep)(?P<num_y>\d{4}|\d{2})"
+    r"|(?P<mdy_m>[A-Za-z]{3,9})\.?\s+(?P<mdy_d>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<mdy_y>\d{4})"
+    r"|(?P<dmy_d>\d{1,2})(?:st|nd|rd|th)?\s+(?P<dmy_m>[A-Za-z]{3,9})\.?,?\s+(?P<dmy_y>\d{4})"
+    r")\b"
+)
+_DATE_LABEL = re.compile(
+    r"\b(?:(?:invoice|order|purchase|receipt|transaction|issue|sale|billing)\s+)?date"
+    r"(?:\s+of\s+(?:purchase|issue))?\s*:?\s*",
+    re.IGNORECASE,
+)
+
+_PERIOD = (
+    r"(?P<count>\d{1,3}|" + "|".join(_NUMBER_WORDS) + r")[\s-]+(?P<unit>year|yr|month|mo)s?\.?"
+)
+_WARRANTY_RULES = (
+    (
+        re.compile(
+            _PERIOD + r"[\s-]+(?:limited\s+|full\s+|manufacturer'?s?\s+|parts\s+and\s+labou?r\s+)?"
+            r"(?:warranty|guarantee)",
+            re.IGNORECASE,
+        ),
+        0.9,
+    ),
+    (
+        re.compile(
+            r"\b(?:warranty|guarantee)(?:\s+period)?\s*(?:is|of|:|lasts|runs\s+for)?\s*"
+            r"(?:valid\s+for\s+|for\s+)?" + _PERIOD,
+            re.IGNORECASE,
+        ),
+        0.85,
+    ),
+)
+# The period mentioned soon after the word, e.g. "Warranty: covered for 18 months"
+_WARRANTY_NEARBY = re.compile(r"\b(?:warranty|guarantee)\b[^.]{0,80}?\b" + _PERIOD, re.IGNORECASE)
+_LIFETIME_WARRANTY = re.compile(r"\blifetime\s+(?:limited\s+)?warranty\b", re.IGNORECASE)
+
+_VENDOR_LABEL = re.compile(
+    r"\b(?:sold\s+by|vendor|merchant|seller|retailer|supplier|manufacturer|store)\s*:\s*",
+    re.IGNORECASE,
+)
+_COMPANY_SUFFIX = r"(?:Inc|LLC|Ltd|Limited|GmbH|Corp|Corporation|Company|Co|PLC|AG)"
+_COMPANY = re.compile(
+    r"(?P<name>(?:[A-Z][\w&'.-]*\s+){0,4}[A-Z][\w&'.-]*,?\s+" + _COMPANY_SUFFIX + r"\b\.?)"
+)
+_COMPANY_SUFFIX_WORD = re.compile(_COMPANY_SUFFIX + r"[.,]?")
+# Words that end a name or letterhead: what follows is the document's content
+_HEADER_STOP = re.compile(
+    r"^(?:receipt|invoice|order|date|tel|phone|www\.|http|total|bill|sales|tax|page|"
+    r"user|owner'?s|manual|guide|instructions?|warranty|model|\d)",
+    re.IGNORECASE,
+)
+
+# Words that make a first page a receipt or invoice, whose letterhead is the vendor
+# (a manual's opening words are more likely a product name)
+_TRANSACTION_CUE = re.compile(
+    r"\b(?:receipt|invoice|subtotal|total|order\s+(?:no|number|#))\b", re.IGNORECASE
+)
+
+# What must appear in the text before the LLM is asked for a field
+_CUES = {
+    "vendor": re.compile(r"[A-Za-z]{2}"),
+    "date": re.compile(
+        r"\d{1,4}[-/.]\d{1,2}[-/.]\d{2,4}"
+        r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b"
+        r"|\b\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)",
+        re.IGNORECASE,
+    ),
+    "total": re.compile(r"\d[.,]\d{2}(?!\d)"),
+    "warranty_period": re.compile(r"warrant|guarantee", re.IGNORECASE),
+}
+
+_FIELD_PROMPT = (
+    "You extract fields from receipts, invoices and product manuals. "
+    "Reply with a single JSON object and nothing else."
+)
+_FIELD_DESCRIPTIONS = {
+    "vendor": "seller or manufacturer name",
+    "date": "purchase or issue date as YYYY-MM-DD",
+    "total": "total amount paid, digits with two decimals, no currency symbol",
+    "warranty_period": "warranty length, e.g. '2 years' or '18 months'",
+}
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+_NON_DECIMAL = re.compile(r"[^\d.]")
+
+# A rule's result: normalized value, confidence and page
+_Finding = tuple[str, float, int]
+
+
+def extract_with_rules(chunks: list[Chunk]) -> dict[str, ExtractedField]:
+    """
+    Find key fields with compiled regex and position heuristics.
+
+    Args:
+        chunks: Document chunks, in document order
+
+    Returns:
+        The fields found, by name
+    """
+    rules: dict[str, Callable[[list[Chunk]], _Finding | None]] = {
+        "vendor": _find_vendor,
+        "date": _find_date,
+        "total": _find_total,
+        "warranty_period": _find_warranty,
+    }
+    fields = {}
+    for name, find in rules.items():
+        found = find(chunks)
+        if found is not None:
+            value, confidence, page = found
+            fields[name] = ExtractedField(
+                name=name, value=value, source=FieldSource.RULES, confidence=confidence, page=page
+            )
+    return fields
+
+
+class FieldExtractor:
+    """Extract key fields with rules, falling back to the LLM per field."""
+
+    def __init__(self, openai_service: OpenAIService, min_confidence: float, llm_max_chars: int):
+        """
+        Args:
+            openai_service: Service for LLM fallback calls
+            min_confidence: Rule results below this are checked with the LLM
+            llm_max_chars: Most document text sent with the LLM prompt
+        """
+        self._openai_service = openai_service
+        self.min_confidence = min_confidence
+        self.llm_max_chars = llm_max_chars
+
+    def needs_llm(self, chunks: list[Chunk], fields: dict[str, ExtractedField]) -> list[str]:
+        """Fields to ask the LLM for: missing or uncertain, with a cue in the text."""
+        uncertain = [
+            name
+            for name in FIELD_NAMES
+            if name not in fields or fields[name].confidence < self.min_confidence
+        ]
+        return [
+            name for name in uncertain if any(_CUES[name].search(chunk.text) for chunk in chunks)
+        ]
+
+    async def extract(self, chunks: list[Chunk]) -> list[ExtractedField]:
+        """
+        Extract key fields from a document.
+
+        LLM failures (unavailable, rate limited, unparseable reply) are
+        logged and leave the rule results in place.
+
+        Args:
+            chunks: Document chunks, in document order
+
+        Returns:
+            Fields found, in FIELD_NAMES order
+        """
+        fields = extract_with_rules(chunks)
+        wanted = self.needs_llm(chunks, fields) if self._openai_service.is_available else []
+        if not wanted:
+            FIELD_EXTRACTION_DOCUMENTS.labels("rules").inc()
+        else:
+            FIELD_EXTRACTION_DOCUMENTS.labels("llm").inc()
+            try:
+                answers = await self._ask_llm(chunks, wanted)
+            except (
+                openai.OpenAIError,
+                RateLimitExceededError,
+                PromptTooLongError,
+                ValueError,
+            ) as e:
+                record_error("field_extraction", e)
+                logger.warning(
+                    f"LLM field extraction failed, keeping rule results: {type(e).__name__}",
+                    extra={"fields": wanted},
+                )
+            else:
+                for name, answer in answers.items():
+                    current = fields.get(name)
+                    if current is None or answer.confidence >= current.confidence:
+                        fields[name] = answer
+
+        results = [fields[name] for name in FIELD_NAMES if name in fields]
+        for field in results:
+            FIELDS_EXTRACTED.labels(field.name, field.source).inc()
+        return results
+
+    async def _ask_llm(self, chunks: list[Chunk], wanted: list[str]) -> dict[str, ExtractedField]:
+        """
+        Ask the LLM for some fields in one call.
+
+        Raises:
+            ValueError: If the service is unavailable or the reply isn't JSON
+        """
+        wanted_list = "\n".join(f"- {name}: {_FIELD_DESCRIPTIONS[name]}" for name in wanted)
+        message = (
+            f"Extract these fields:\n{wanted_list}\n\n"
+            'Reply as {"<field>": {"value": "...", "confidence": 0.0-1.0}}, '
+            "with null for fields the document doesn't contain.\n\n"
+            f"Document:\n{self._excerpt(chunks, wanted)}"
+        )
+        content, _, _ = await self._openai_service.chat_completion(
+            message=message,
+            model=settings.FIELD_EXTRACTION_MODEL,
+            system_prompt=_FIELD_PROMPT,
+            max_tokens=300,
+        )
+        match = _JSON_OBJECT.search(content or "")
+        if match is None:
+            error_msg = "LLM reply contains no JSON object"
+            raise ValueError(error_msg)
+        reply = json.loads(match.group())
+
+        answers = {}
+        for name in wanted:
+            answer = _parse_answer(name, reply.get(name))
+            if answer is not None:
+                answers[name] = answer
+        return answers
+
+    def _excerpt(self, chunks: list[Chunk], wanted: list[str]) -> str:
+        """The document's opening, then chunks with cues for the wanted fields, within budget."""
+        cues = [_CUES[name] for name in wanted if name != "vendor"]
+        parts: list[str] = []
+        budget = self.llm_max_chars
+        for i, chunk in enumerate(chunks):
+            if budget <= 0:
+                break
+            if i == 0 or any(cue.search(chunk.text) for cue in cues):
+                parts.append(chunk.text[:budget])
+                budget -= len(parts[-1])
+        return "\n".join(parts)
+
+
+def _find_total(chunks: list[Chunk]) -> _Finding | None:
+    for pattern, confidence in _TOTAL_RULES:
+        # The last labelled total on a receipt is the one after tax and discounts
+        for chunk in reversed(chunks):
+            matches = list(pattern.finditer(chunk.text))
+            if matches:
+                return _normalize_amount(matches[-1]["amount"]), confidence, chunk.page
+    amounts = [
+        (float(_normalize_amount(match["amount"])), match["amount"], chunk.page)
+        for chunk in chunks
+        for match in _CURRENCY_AMOUNT.finditer(chunk.text)
+    ]
+    if amounts:
+        _, amount, page = max(amounts)
+        return _normalize_amount(amount), 0.5, page
+    return None
+
+
+def _find_date(chunks: list[Chunk]) -> _Finding | None:
+    for chunk in chunks:
+        for label in _DATE_LABEL.finditer(chunk.text):
+            match = _DATE.match(chunk.text, label.end())
+            parsed = _parse_date(match) if match else None
+            if parsed is not None:
+                day, ambiguous = parsed
+                return day.isoformat(), 0.7 if ambiguous else 0.9, chunk.page
+
+    # Unlabelled: the first date on the first page, trusted if it's a receipt's only date
+    found = [
+        (parsed, chunk.page)
+        for chunk in _first_page(chunks)
+        for match in _DATE.finditer(chunk.text)
+        if (parsed := _parse_date(match)) is not None
+    ]
+    if not found:
+        return None
+    (day, ambiguous), page = found[0]
+    if ambiguous:
+        return day.isoformat(), 0.5, page
+    only_date = len({parsed_day for (parsed_day, _), _ in found}) == 1
+    return day.isoformat(), 0.8 if only_date and _is_transaction(chunks) else 0.6, page
+
+
+def _find_warranty(chunks: list[Chunk]) -> _Finding | None:
+    for pattern, confidence in _WARRANTY_RULES:
+        for chunk in chunks:
+            match = pattern.search(chunk.text)
+            if match is not None:
+                return _normalize_period(match["count"], match["unit"]), confidence, chunk.page
+    for chunk in chunks:
+        if _LIFETIME_WARRANTY.search(chunk.text):
+            return "lifetime", 0.8, chunk.page
+    for chunk in chunks:
+        match = _WARRANTY_NEARBY.search(chunk.text)
+        if match is not None:
+            return _normalize_period(match["count"], match["unit"]), 0.7, chunk.page
+    return None
+
+
+def _find_vendor(chunks: list[Chunk]) -> _Finding | None:
+    if not chunks:
+        return None
+    for chunk in chunks:
+        for label in _VENDOR_LABEL.finditer(chunk.text):
+            name = _leading_name(chunk.text[label.end() :])
+            if name:
+                return name, 0.9, chunk.page
+    for chunk in chunks:
+        match = _COMPANY.search(chunk.text)
+        if match is not None:
+            # A company on the first page is the letterhead; later, it may be a distributor
+            return (
+                _clean_name(match["name"]),
+                0.85 if chunk.page == chunks[0].page else 0.7,
+                chunk.page,
+            )
+
+    # Letterhead: the capitalized words the document opens with
+    name = _leading_name(chunks[0].text)
+    if not name:
+        return None
+    return name, 0.8 if _is_transaction(chunks) else 0.6, chunks[0].page
+
+
+def _first_page(chunks: list[Chunk]) -> list[Chunk]:
+    return [chunk for chunk in chunks if chunk.page == chunks[0].page]
+
+
+def _is_transaction(chunks: list[Chunk]) -> bool:
+    """Whether the document opens like a receipt or invoice."""
+    return any(_TRANSACTION_CUE.search(chunk.text) for chunk in _first_page(chunks))
+
+
+def _leading_name(text: str) -> str:
+    """The run of capitalized words ``text`` starts with, up to a company suffix ('' if none)."""
+    words = []
+    for word in text.split()[:_MAX_NAME_WORDS]:
+        if _HEADER_STOP.match(word) or not (word[0].isupper() or word == "&"):
+            break
+        words.append(word)
+        if _COMPANY_SUFFIX_WORD.fullmatch(word):
+            break
+    name = _clean_name(" ".join(words))
+    return name if sum(c.isalpha() for c in name) >= _MIN_NAME_LETTERS else ""
+
+
+def _parse_date(match: re.Match[str]) -> tuple[date, bool] | None:
+    """Date of a _DATE match and whether its day/month order was a guess, or None if invalid."""
+    ambiguous = False
+    if match["iso_y"]:
+        year, month, day = int(match["iso_y"]), int(match["iso_m"]), int(match["iso_d"])
+    elif match["num_a"]:
+        first, second, year = int(match["num_a"]), int(match["num_b"]), int(match["num_y"])
+        if year < _CENTURY:
+            year += 2000  # Two-digit years on receipts are this century
+        if match["sep"] == "." or first > _MONTHS_PER_YEAR:
+            day, month = first, second  # 31.12.2024 and 31/12/2024 are day-first
+        else:
+            month, day = first, second
+            ambiguous = second <= _MONTHS_PER_YEAR and first != second
+    else:
+        month_name = (match["mdy_m"] or match["dmy_m"]).lower()
+        month = next((i for i, name in enumerate(_MONTHS, 1) if name.startswith(month_name)), 0)
+        day = int(match["mdy_d"] or match["dmy_d"])
+        year = int(match["mdy_y"] or match["dmy_y"])
+    try:
+        return date(year, month, day), ambiguous
+    except ValueError:
+        return None
+
+
+def _normalize_amount(amount: str) -> str:
+    """'1,234.50' or '1.234,50' -> '1234.50' (the last separator is the decimal point)."""
+    digits = re.sub(r"\D", "", amount)
+    return f"{int(digits[:-2] or 0)}.{digits[-2:]}"
+
+
+def _normalize_period(count: str, unit: str) -> str:
+    number = int(count) if count.isdigit() else _NUMBER_WORDS[count.lower()]
+    unit_name = "year" if unit.lower().startswith("y") else "month"
+    return f"{number} {unit_name}{'s' if number != 1 else ''}"
+
+
+def _clean_name(name: str) -> str:
+    return name.strip(" ,.:;-")[:_MAX_VALUE_CHARS]
+
+
+def _parse_answer(name: str, answer: object) -> ExtractedField | None:
+    """Validate and normalize one field of the LLM's reply."""
+    confidence = _LLM_DEFAULT_CONFIDENCE
+    if isinstance(answer, dict):
+        raw_confidence = answer.get("confidence")
+        if isinstance(raw_confidence, int | float):
+            confidence = min(max(float(raw_confidence), 0.0), 1.0)
+        answer = answer.get("value")
+    if answer is None or isinstance(answer, dict | list):
+        return None
+    value = str(answer).strip()[:_MAX_VALUE_CHARS]
+    if not value:
+        return None
+
+    if name == "date":
+        try:
+            value = date.fromisoformat(value).isoformat()
+        except ValueError:
+            return None
+    elif name == "total":
+        try:
+            amount = float(_NON_DECIMAL.sub("", value))
+        except ValueError:
+            return None
+        value = f"{amount:.2f}"
+    return ExtractedField(name=name, value=value, source=FieldSource.LLM, confidence=confidence)
+
+
+# Singleton instance
+_field_extractor: FieldExtractor | None = None
+
+
+def get_field_extractor() -> FieldExtractor:
+    """Get or create the field extractor."""
+    global _field_extractor
+    if _field_extractor is None:
+        _field_extractor = FieldExtractor(
+            get_openai_service(),
+            min_confidence=settings.FIELD_EXTRACTION_MIN_CONFIDENCE,
+            llm_max_chars=settings.FIELD_EXTRACTION_LLM_MAX_CHARS,
+        )
+    return _field_extractor
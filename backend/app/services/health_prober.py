@@ -0,0 +1,191 @@
+"""Background health checks for external dependencies."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.health import ServiceHealthStatus, ServiceHealthStatusEnum
+from app.services.openai_service import get_openai_service
+from app.services.vector_index import get_vector_index
+
+if TYPE_CHECKING:
+    import sqlalchemy
+    import sqlalchemy.exc
+
+    from app.db import engine as db_engine
+else:
+    # Only needed when a database is configured: defer SQLAlchemy to the first check
+    sqlalchemy = lazy_import("sqlalchemy")
+    db_engine = lazy_import("app.db.engine")
+
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], Awaitable[ServiceHealthStatus]]
+
+
+class HealthProber:
+    """
+    Periodically run dependency health checks and keep the latest results.
+
+    Health endpoints read the snapshot instead of calling dependencies, so
+    frequent polling doesn't turn into upstream traffic or slow responses.
+    """
+
+    def __init__(self, interval_seconds: float, timeout_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._checks: dict[str, HealthCheck] = {}
+        # name -> (result, monotonic time it was recorded)
+        self._results: dict[str, tuple[ServiceHealthStatus, float]] = {}
+        self._task: asyncio.Task | None = None
+        self._probe_lock = asyncio.Lock()
+
+    def register(self, name: str, check: HealthCheck) -> None:
+        """Register a dependency check."""
+        self._checks[name] = check
+
+    async def start(self) -> None:
+        """Start probing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-prober")
+            logger.info(
+                "Health prober started",
+                extra={"interval_seconds": self.interval_seconds, "checks": list(self._checks)},
+            )
+
+    async def stop(self) -> None:
+        """Stop background probing."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def probe_all(self) -> None:
+        """Run every check concurrently and record the results."""
+        async with self._probe_lock:
+            names = list(self._checks)
+            results = await asyncio.gather(*(self._probe(name) for name in names))
+            now = time.monotonic()
+            for name, result in zip(names, results, strict=True):
+                self._results[name] = (result, now)
+
+    async def snapshot(self) -> dict[str, ServiceHealthStatus]:
+        """
+        Latest result of every check, with its age.
+
+        Checks that have never run (e.g. right after startup) are probed once
+        on demand.
+        """
+        if any(name not in self._results for name in self._checks):
+            await self.probe_all()
+
+        now = time.monotonic()
+        return {
+            name: result.model_copy(update={"age_seconds": round(now - recorded_at, 3)})
+            for name, (result, recorded_at) in self._results.items()
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception:
+                logger.error("Health probe round failed", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _probe(self, name: str) -> ServiceHealthStatus:
+        try:
+            result = await asyncio.wait_for(self._checks[name](), timeout=self.timeout_seconds)
+        except TimeoutError:
+            logger.warning(f"Health check timed out: {name}")
+            result = ServiceHealthStatus(
+                status=ServiceHealthStatusEnum.ERROR,
+                message=f"Check timed out after {self.timeout_seconds:g}s",
+            )
+        except Exception as e:
+            logger.error(f"Health check failed: {name}", exc_info=True)
+            result = ServiceHealthStatus(
+                status=ServiceHealthStatusEnum.ERROR,
+                message=f"Unexpected error: {type(e).__name__}",
+            )
+        return result.model_copy(update={"checked_at": datetime.now(UTC)})
+
+
+async def check_openai() -> ServiceHealthStatus:
+    """Check OpenAI connectivity."""
+    openai_service = get_openai_service()
+    if not openai_service.is_available:
+        return ServiceHealthStatus(
+            status=ServiceHealthStatusEnum.NOT_CONFIGURED,
+            message="Service not configured",
+        )
+
+    success, message = await openai_service.test_connection()
+    return ServiceHealthStatus(
+        status=ServiceHealthStatusEnum.CONNECTED if success else ServiceHealthStatusEnum.ERROR,
+        message=message,
+    )
+
+
+async def check_database() -> ServiceHealthStatus:
+    """Check Postgres with a round trip, reporting its latency and pool usage."""
+    if not settings.DATABASE_URL:
+        return ServiceHealthStatus(
+            status=ServiceHealthStatusEnum.NOT_CONFIGURED,
+            message="DATABASE_URL not set",
+        )
+
+    engine = db_engine.get_engine()
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(sqlalchemy.text("SELECT 1"))
+    except (sqlalchemy.exc.SQLAlchemyError, OSError) as e:
+        return ServiceHealthStatus(
+            status=ServiceHealthStatusEnum.ERROR,
+            message=f"Connection failed: {type(e).__name__}",
+        )
+    latency_ms = (time.perf_counter() - start) * 1000
+    stats = db_engine.pool_stats(engine)
+    return ServiceHealthStatus(
+        status=ServiceHealthStatusEnum.CONNECTED,
+        message=(
+            f"Round trip {latency_ms:.1f} ms; "
+            f"{stats.checked_out}/{stats.capacity} pooled connections in use"
+        ),
+    )
+
+
+async def check_vector_index() -> ServiceHealthStatus:
+    """Report the in-process vector index size."""
+    vector_index = get_vector_index()
+    location = str(vector_index.directory) if vector_index.directory else "memory"
+    return ServiceHealthStatus(
+        status=ServiceHealthStatusEnum.CONNECTED,
+        message=f"{vector_index.size} chunks, {vector_index.dimensions} dimensions ({location})",
+    )
+
+
+# Singleton instance
+_health_prober: HealthProber | None = None
+
+
+def get_health_prober() -> HealthProber:
+    """Get or create the health prober with all dependency checks registered."""
+    global _health_prober
+    if _health_prober is None:
+        _health_prober = HealthProber(
+            interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            timeout_seconds=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+        )
+        _health_prober.register("openai", check_openai)
+        _health_prober.register("database", check_database)
+        _health_prober.register("vector_index", check_vector_index)
+    return _health_prober
@@ -0,0 +1,98 @@
+"""Shared HTTP connection pool for upstream AI calls."""
+
+import importlib.util
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.services.metrics import OPENAI_HTTP_CONNECTIONS, OPENAI_HTTP_POOL_WAIT
+from app.services.rate_limiter import observe_rate_limit_headers
+
+if TYPE_CHECKING:
+    import httpx
+else:
+    # Imported with the OpenAI SDK on first use, not at startup
+    httpx = lazy_import("httpx")
+
+logger = logging.getLogger(__name__)
+
+# httpcore trace events that end a request's wait for a pooled connection
+_CONNECTING = "connection.connect_tcp.started"
+_SENDING = ".send_request_headers.started"
+
+_http_client: "httpx.AsyncClient | None" = None
+
+
+def build_http_client() -> "httpx.AsyncClient":
+    """
+    Create an HTTP client with the OPENAI_HTTP_* pool, keep-alive and timeout settings.
+
+    Every request records how long it waited for a connection and whether
+    it reused a pooled one, and feeds rate limit headers from the response
+    into the rate limiter.
+    """
+    http2 = settings.OPENAI_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("OPENAI_HTTP2 needs the h2 package (httpx[http2]), using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.OPENAI_READ_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.OPENAI_POOL_TIMEOUT_SECONDS,
+        ),
+        http2=http2,
+        follow_redirects=True,
+        event_hooks={"request": [trace_pool_wait], "response": [observe_rate_limit_headers]},
+    )
+
+
+async def trace_pool_wait(request: "httpx.Request") -> None:
+    """
+    httpx request hook: measure the wait for a connection from the pool.
+
+    The wait ends when the request starts connecting (a new connection) or
+    sends its headers without connecting first (a reused connection).
+    """
+    start = time.perf_counter()
+    waiting = True
+
+    async def trace(event: str, _info: dict[str, Any]) -> None:
+        nonlocal waiting
+        if not waiting:
+            return
+        if event == _CONNECTING:
+            connection = "new"
+        elif event.endswith(_SENDING):
+            connection = "reused"
+        else:
+            return
+        waiting = False
+        OPENAI_HTTP_POOL_WAIT.observe(time.perf_counter() - start)
+        OPENAI_HTTP_CONNECTIONS.labels(connection).inc()
+
+    request.extensions["trace"] = trace
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get or create this process's shared HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = build_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,554 @@
+"""Document upload storage and text extraction pipeline."""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import multiprocessing
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import anyio
+import numpy as np
+
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.documents import DocumentStatus, DocumentStatusEnum
+from app.services.chunking import Chunk
+from app.services.embedding_batcher import EmbeddingPriority
+from app.services.field_extraction import get_field_extractor
+from app.services.openai_service import get_openai_service
+from app.services.pdf_text import extract_chunks
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.vector_index import IndexEntry, get_vector_index
+
+if TYPE_CHECKING:
+    from app.services import chunk_store as chunk_store_module
+    from app.services import job_queue as job_queue_module
+    from app.services.chunk_store import ChunkStore, StoredVersion
+    from app.services.job_queue import Job, JobQueue
+else:
+    # Both import SQLAlchemy: defer it until a database is used
+    chunk_store_module = lazy_import("app.services.chunk_store")
+    job_queue_module = lazy_import("app.services.job_queue")
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+
+# Oldest finished documents are forgotten beyond this many
+MAX_TRACKED_DOCUMENTS = 10_000
+
+# Chunks per embed() call; progress is reported after each
+EMBED_CHUNKS_PER_CALL = 500
+
+# Queued ingestion (INGEST_BACKEND=queue): worker processes extract, store and embed,
+# then hand the job to the API process, which owns the vector index, for indexing
+INGEST_JOB = "ingest_document"
+EXTRACT_QUEUE = "ingest"
+INDEX_QUEUE = "index"
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the size limit."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+
+
+class UnsupportedDocumentError(Exception):
+    """Raised when an upload is not a PDF."""
+
+
+class DocumentNotFoundError(Exception):
+    """Raised when uploading a new version of a document that doesn't exist."""
+
+
+class IngestionStageError(Exception):
+    """Raised when a pipeline stage fails; the cause is chained."""
+
+    def __init__(self, stage: str, cause: Exception):
+        self.stage = stage
+        super().__init__(f"{stage} failed: {type(cause).__name__}")
+
+
+@contextlib.contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Attribute errors raised in the block to a named pipeline stage."""
+    try:
+        yield
+    except Exception as e:
+        raise IngestionStageError(name, e) from e
+
+
+class IngestionService:
+    """
+    Store uploads on disk and extract their text in a process pool.
+
+    Uploads are streamed to disk chunk by chunk (hashing as they go), so
+    memory use doesn't grow with file size. Each document is split into page
+    ranges that run as separate pool tasks: a large manual is spread over
+    several cores, and many small documents keep every core busy.
+
+    With a chunk store, extracted text is stored as content-addressed chunks.
+    Files that were ingested before are not extracted again. Key fields
+    (vendor, date, total, warranty period) are extracted from the text, with
+    the LLM only consulted for fields the rules miss. Chunks are then
+    embedded at bulk priority (when the AI service is configured) and added
+    to the vector index; the embedding cache skips chunks embedded for
+    earlier versions.
+
+    With INGEST_BACKEND=queue, uploads become durable jobs instead (see
+    ``run_job``), and progress is read back from the job.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Path,
+        max_upload_bytes: int,
+        pages_per_task: int,
+        executor: Executor | None = None,
+        chunk_store: "ChunkStore | None" = None,
+    ):
+        self.storage_dir = storage_dir
+        self.max_upload_bytes = max_upload_bytes
+        self.pages_per_task = pages_per_task
+        self._executor = executor
+        self._chunk_store = chunk_store
+        self._openai_service = get_openai_service()
+        self._vector_index = get_vector_index()
+        self._field_extractor = get_field_extractor()
+        self._job_queue = (
+            job_queue_module.get_job_queue() if settings.INGEST_BACKEND == "queue" else None
+        )
+        if settings.INGEST_BACKEND == "queue" and self._job_queue is None:
+            logger.warning("INGEST_BACKEND=queue requires DATABASE_URL, ingesting inline")
+        self._documents: OrderedDict[str, DocumentStatus] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self, workers: int | None = None) -> None:
+        """
+        Create the storage directory and the extraction process pool.
+
+        Args:
+            workers: Worker processes (None for one per CPU core)
+        """
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        if self._executor is None:
+            # spawn: forking a process that already runs threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(
+                "Ingestion process pool started",
+                extra={"workers": workers or multiprocessing.cpu_count()},
+            )
+
+    async def stop(self) -> None:
+        """Cancel in-progress ingestion and shut down the process pool."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get(self, document_id: str) -> DocumentStatus | None:
+        """Current status of a document ingested in this process, if known."""
+        return self._documents.get(document_id)
+
+    async def get_status(self, document_id: str) -> DocumentStatus | None:
+        """Current status of a document, from its latest job when ingestion is queued."""
+        if self._job_queue is None:
+            return self.get(document_id)
+        job = await self._job_queue.latest_for_subject(document_id)
+        if job is None or job.progress is None:
+            return None
+        return DocumentStatus.model_validate({**job.progress, "job_id": job.id})
+
+    async def upload(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        document_id: str | None = None,
+        tags: list[str] | None = None,
+    ) -> DocumentStatus:
+        """
+        Store an uploaded PDF and start extracting its text in the background.
+
+        Args:
+            chunks: Raw file content, as received
+            filename: Original file name (metadata only; files are stored by hash)
+            document_id: Existing document this upload is a new version of
+            tags: Labels to filter search results by
+
+        Returns:
+            Status of the document (queued, with the job ID when ingestion is queued)
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds max_upload_bytes
+            UnsupportedDocumentError: If the upload is not a PDF
+            DocumentNotFoundError: If document_id is given but unknown
+            ValueError: If document_id is given but no database is configured
+        """
+        if document_id is not None:
+            if self._chunk_store is None:
+                error_msg = "Database not configured"
+                raise ValueError(error_msg)
+            if not await self._chunk_store.document_exists(document_id):
+                raise DocumentNotFoundError(document_id)
+
+        sha256, size, path = await self._store(chunks)
+
+        status = DocumentStatus(
+            id=document_id or str(uuid.uuid4()),
+            filename=filename,
+            sha256=sha256,
+            size_bytes=size,
+            tags=tags or [],
+            status=DocumentStatusEnum.QUEUED,
+            created_at=datetime.now(UTC),
+        )
+        logger.info(
+            f"Document uploaded: {filename}",
+            extra={"document_id": status.id, "sha256": sha256, "size_bytes": size},
+        )
+        if self._job_queue is not None:
+            status.job_id = await self._job_queue.enqueue(
+                INGEST_JOB,
+                EXTRACT_QUEUE,
+                {"path": str(path)},
+                subject_id=status.id,
+                progress=status.model_dump(mode="json"),
+            )
+            return status
+
+        self._track(status)
+        task = asyncio.create_task(self._ingest(status, path), name=f"ingest-{status.id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return status
+
+    async def _store(self, chunks: AsyncIterator[bytes]) -> tuple[str, int, Path]:
+        """Stream chunks to a content-addressed file, returning (sha256, size, path)."""
+        temp_path = anyio.Path(self.storage_dir / f".upload-{uuid.uuid4().hex}")
+        hasher = hashlib.sha256()
+        size = 0
+        header = b""
+        try:
+            async with await anyio.open_file(temp_path, "wb") as file:
+                async for chunk in chunks:
+                    if len(header) < len(PDF_MAGIC):
+                        header += chunk[: len(PDF_MAGIC) - len(header)]
+                        if not PDF_MAGIC.startswith(header):
+                            error_msg = "Only PDF documents are supported"
+                            raise UnsupportedDocumentError(error_msg)
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise UploadTooLargeError(self.max_upload_bytes)
+                    hasher.update(chunk)
+                    await file.write(chunk)
+
+            if header != PDF_MAGIC:
+                error_msg = "Only PDF documents are supported"
+                raise UnsupportedDocumentError(error_msg)
+
+            sha256 = hasher.hexdigest()
+            path = self.storage_dir / f"{sha256}.pdf"
+            # Identical re-uploads land on the same file
+            await temp_path.rename(path)
+        except BaseException:
+            await temp_path.unlink(missing_ok=True)
+            raise
+
+        return sha256, size, path
+
+    async def _ingest(self, status: DocumentStatus, path: Path) -> None:
+        """Extract, chunk, store, embed and index a document, recording progress and failures."""
+        try:
+            version_chunks = await self._prepare(status, path)
+            vectors = await self._embed(status, version_chunks)
+            if vectors is not None:
+                await self._index(status, version_chunks, vectors)
+        except IngestionStageError as e:
+            self._fail(status, e, final=True)
+            return
+        self._complete(status)
+
+    async def run_job(self, job: "Job", jobs: "JobQueue") -> None:
+        """
+        Run the current stage of a queued ingestion job.
+
+        On EXTRACT_QUEUE (worker processes) the document is extracted,
+        stored and embedded, with the stored version checkpointed so a retry
+        skips extraction; embeddings reach the index stage through the
+        embedding cache. The job is then handed to INDEX_QUEUE, run by the
+        API process, which adds the chunks to its vector index.
+
+        Args:
+            job: Claimed ingestion job
+            jobs: Queue the job was claimed from
+        """
+        status = DocumentStatus.model_validate({**(job.progress or {}), "job_id": job.id})
+
+        def progress() -> dict:
+            return status.model_dump(mode="json")
+
+        async with jobs.keep_alive(job, progress):
+            try:
+                if job.queue == INDEX_QUEUE:
+                    await self._index_job(status, job.checkpoint["version_id"])
+                    self._complete(status)
+                    await jobs.complete(job, progress())
+                    return
+
+                version_id = job.checkpoint.get("version_id")
+                if version_id is None:
+                    version_chunks = await self._prepare(status, Path(job.payload["path"]))
+                    await jobs.save_checkpoint(job, {"version_id": status.version_id}, progress())
+                else:
+                    version_chunks = await self._load_chunks(version_id)
+                if await self._embed(status, version_chunks) is None:
+                    self._complete(status)  # Nothing to index without embeddings
+                    await jobs.complete(job, progress())
+                    return
+            except IngestionStageError as e:
+                self._fail(status, e, final=job.final_attempt)
+                await jobs.fail(job, str(e), progress())
+                return
+
+            status.status = DocumentStatusEnum.INDEXING
+            await jobs.handoff(job, INDEX_QUEUE, {}, progress())
+
+    async def _prepare(self, status: DocumentStatus, path: Path) -> list[Chunk]:
+        """Extract and store a document's chunks, or reuse those of an identical earlier file."""
+        status.status = DocumentStatusEnum.EXTRACTING
+        with _stage("Text extraction"):
+            stored = await self._reuse_version(status)
+            if stored is None:
+                version_chunks = await self._extract(status, path)
+        reused = stored is not None
+        if stored is None:
+            with _stage("Storing chunks"):
+                stored = await self._store_version(status, version_chunks)
+        else:
+            version_chunks = await self._load_chunks(stored.version_id)
+
+        if stored.version_id:
+            status.version_id = stored.version_id
+            status.chunks_new = len(stored.new_chunk_hashes)
+        status.chunks_total = stored.chunks_total
+        if settings.FIELD_EXTRACTION_ENABLED:
+            await self._extract_fields(status, version_chunks, reused)
+        return version_chunks
+
+    async def _extract_fields(
+        self, status: DocumentStatus, version_chunks: list[Chunk], reused: bool
+    ) -> None:
+        """Find the document's key fields, or load those stored for an identical file."""
+        chunk_store, version_id = self._chunk_store, status.version_id
+        if chunk_store is not None and version_id and reused:
+            with _stage("Loading fields"):
+                status.fields = await chunk_store.get_fields(version_id)
+            if status.fields:
+                return
+        with _stage("Field extraction"):
+            status.fields = await self._field_extractor.extract(version_chunks)
+        if chunk_store is not None and version_id:
+            with _stage("Storing fields"):
+                await chunk_store.save_fields(version_id, status.fields)
+
+    async def _load_chunks(self, version_id: str) -> list[Chunk]:
+        with _stage("Loading chunks"):
+            return await self._chunk_store.get_version_chunks(version_id)  # type: ignore[union-attr]
+
+    async def _index_job(self, status: DocumentStatus, version_id: str) -> None:
+        """Index a stored, embedded version (vectors come from the embedding cache)."""
+        version_chunks = await self._load_chunks(version_id)
+        vectors = await self._embed(status, version_chunks)
+        if vectors is None:
+            with _stage("Indexing"):
+                error_msg = "AI service not available"
+                raise ValueError(error_msg)
+        await self._index(status, version_chunks, vectors)
+
+    def _complete(self, status: DocumentStatus) -> None:
+        status.status = DocumentStatusEnum.COMPLETED
+        status.error = None
+        status.completed_at = datetime.now(UTC)
+        logger.info(
+            f"Document ingested: {status.filename}",
+            extra={
+                "document_id": status.id,
+                "version_id": status.version_id,
+                "pages": status.pages_total,
+                "chunks_total": status.chunks_total,
+                "chunks_new": status.chunks_new,
+                "seconds": (status.completed_at - status.created_at).total_seconds(),
+            },
+        )
+
+    def _fail(self, status: DocumentStatus, error: IngestionStageError, final: bool) -> None:
+        status.error = str(error)
+        if final:
+            status.status = DocumentStatusEnum.FAILED
+            status.completed_at = datetime.now(UTC)
+        logger.error(
+            f"Document ingestion failed: {status.filename}",
+            extra={"document_id": status.id, "retrying": not final},
+            exc_info=error.__cause__,
+        )
+
+    async def _reuse_version(self, status: DocumentStatus) -> "StoredVersion | None":
+        """Reuse the stored chunks of an identical, previously ingested file."""
+        if self._chunk_store is None:
+            return None
+        stored = await self._chunk_store.reuse_version(status.id, status.filename, status.sha256)
+        if stored is not None:
+            status.pages_total = status.pages_processed = stored.page_count
+            logger.info(
+                f"Document already ingested, reusing chunks: {status.filename}",
+                extra={"document_id": status.id, "sha256": status.sha256},
+            )
+        return stored
+
+    async def _extract(self, status: DocumentStatus, path: Path) -> list[Chunk]:
+        """Extract and chunk page ranges in the process pool, updating progress."""
+        loop = asyncio.get_running_loop()
+
+        async def extract(start: int) -> list[Chunk]:
+            total_pages, pages, range_chunks = await loop.run_in_executor(
+                self._executor,
+                extract_chunks,
+                str(path),
+                start,
+                start + self.pages_per_task,
+                settings.CHUNK_TARGET_CHARS,
+                settings.CHUNK_MAX_CHARS,
+            )
+            status.pages_total = total_pages
+            status.pages_processed += pages
+            return range_chunks
+
+        # The first range also reports the page count, so a one-page
+        # receipt takes a single round trip to the pool
+        first_chunks = await extract(0)
+        remaining = await asyncio.gather(
+            *(
+                extract(start)
+                for start in range(
+                    self.pages_per_task, status.pages_total or 0, self.pages_per_task
+                )
+            )
+        )
+        return first_chunks + [chunk for range_chunks in remaining for chunk in range_chunks]
+
+    async def _embed(
+        self, status: DocumentStatus, version_chunks: list[Chunk]
+    ) -> dict[str, np.ndarray] | None:
+        """
+        Embed the distinct chunk texts, waiting out rate limits rather than failing.
+
+        Returns:
+            Vectors by chunk hash, or None if the AI service isn't configured
+        """
+        if not self._openai_service.is_available:
+            return None
+        with _stage("Embedding"):
+            return await self._embed_chunks(status, version_chunks)
+
+    async def _embed_chunks(
+        self, status: DocumentStatus, version_chunks: list[Chunk]
+    ) -> dict[str, np.ndarray]:
+        if status.status != DocumentStatusEnum.INDEXING:
+            status.status = DocumentStatusEnum.EMBEDDING
+        status.chunks_embedded = 0
+        texts = {chunk.hash: chunk.text for chunk in version_chunks}
+        hashes = list(texts)
+        vectors: dict[str, np.ndarray] = {}
+        for start in range(0, len(hashes), EMBED_CHUNKS_PER_CALL):
+            batch = hashes[start : start + EMBED_CHUNKS_PER_CALL]
+            while True:
+                try:
+                    embedded = await self._openai_service.embed(
+                        [texts[h] for h in batch], EmbeddingPriority.BULK
+                    )
+                    break
+                except RateLimitExceededError as e:
+                    # Bulk work can wait; live requests are the ones that should get 429s
+                    await asyncio.sleep(e.retry_after)
+            vectors.update(zip(batch, embedded, strict=True))
+            status.chunks_embedded += len(batch)
+        return vectors
+
+    async def _index(
+        self, status: DocumentStatus, version_chunks: list[Chunk], vectors: dict[str, np.ndarray]
+    ) -> None:
+        """Make the version's chunks the document's searchable chunks."""
+        status.status = DocumentStatusEnum.INDEXING
+        with _stage("Indexing"):
+            await self._replace_in_index(status, version_chunks, vectors)
+
+    async def _replace_in_index(
+        self, status: DocumentStatus, version_chunks: list[Chunk], vectors: dict[str, np.ndarray]
+    ) -> None:
+        first_pages: dict[str, int] = {}
+        for chunk in version_chunks:
+            first_pages.setdefault(chunk.hash, chunk.page)
+        matrix = (
+            np.stack([vectors[h] for h in first_pages])
+            if first_pages
+            else np.empty((0, self._vector_index.dimensions), dtype=np.float32)
+        )
+        # Off the event loop: persisting the index writes files
+        await asyncio.to_thread(
+            self._vector_index.replace_document,
+            status.id,
+            [IndexEntry(h, page) for h, page in first_pages.items()],
+            matrix,
+            tuple(status.tags),
+            status.created_at,
+        )
+
+    async def _store_version(
+        self, status: DocumentStatus, version_chunks: list[Chunk]
+    ) -> "StoredVersion":
+        """Store the chunks as a new version (when a chunk store is configured)."""
+        if self._chunk_store is None:
+            return chunk_store_module.StoredVersion(
+                "", status.pages_total or 0, len(version_chunks), []
+            )
+        return await self._chunk_store.add_version(
+            status.id, status.filename, status.sha256, status.pages_total or 0, version_chunks
+        )
+
+    def _track(self, status: DocumentStatus) -> None:
+        self._documents[status.id] = status
+        while len(self._documents) > MAX_TRACKED_DOCUMENTS:
+            oldest = next(iter(self._documents.values()))
+            if oldest.completed_at is None:
+                break
+            self._documents.popitem(last=False)
+
+
+# Singleton instance
+_ingestion_service: IngestionService | None = None
+
+
+def get_ingestion_service() -> IngestionService:
+    """Get or create the ingestion service."""
+    global _ingestion_service
+    if _ingestion_service is None:
+        _ingestion_service = IngestionService(
+            storage_dir=Path(settings.DOCUMENT_STORAGE_DIR),
+            max_upload_bytes=settings.DOCUMENT_MAX_UPLOAD_BYTES,
+            pages_per_task=settings.INGEST_PAGES_PER_TASK,
+            chunk_store=chunk_store_module.get_chunk_store(),
+        )
+    return _ingestion_service
@@ -0,0 +1,468 @@
+"""Durable Postgres job queue, and the worker loop that drains it."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import socket
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import ColumnElement
+
+from app.config import settings
+from app.db.engine import get_engine
+from app.db.tables import jobs
+from app.models.jobs import JobStatus, JobStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Stored error messages are truncated to this length
+_MAX_ERROR_CHARS = 500
+
+
+@dataclass(slots=True)
+class Job:
+    """A claimed job."""
+
+    id: str
+    kind: str
+    queue: str
+    subject_id: str | None
+    payload: dict[str, Any]
+    checkpoint: dict[str, Any]
+    progress: dict[str, Any] | None
+    attempts: int  # Including the current one
+    max_attempts: int
+
+    @property
+    def final_attempt(self) -> bool:
+        """Whether failing now fails the job for good."""
+        return self.attempts >= self.max_attempts
+
+
+class LeaseLostError(Exception):
+    """Raised when a job's lease expired, so another worker may have claimed it."""
+
+
+JobHandler = Callable[[Job, "JobQueue"], Awaitable[None]]
+
+
+class JobQueue:
+    """
+    Jobs stored in Postgres, claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``.
+
+    Any number of worker processes can claim from the same table: each
+    claim locks one due job and skips rows other workers hold, so workers
+    never wait on each other or run the same job twice. A claimed job is
+    leased to its worker for ``lease_seconds`` and kept alive by heartbeats
+    (see ``keep_alive``); if the worker dies, the lease runs out and another
+    worker retries the job.
+
+    Jobs move through stages by changing queue (``handoff``), so a stage
+    can be run by a different kind of process than the one before it. Each
+    stage records a checkpoint, letting a retry skip work already done.
+    Failed attempts are retried with exponential backoff until
+    ``max_attempts``; state changes only apply while the worker still holds
+    the lease.
+    """
+
+    def __init__(self, worker_id: str, lease_seconds: float):
+        """
+        Args:
+            worker_id: Identifies this worker in job rows (e.g. host:pid)
+            lease_seconds: How long a claim lasts without a heartbeat
+        """
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+
+    async def enqueue(
+        self,
+        kind: str,
+        queue: str,
+        payload: dict[str, Any],
+        subject_id: str | None = None,
+        progress: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Add a job, due now.
+
+        Args:
+            kind: What the job does
+            queue: Queue of its first stage
+            payload: Input for the handler (JSON-serializable)
+            subject_id: What the job works on, to look it up by (e.g. a document ID)
+            progress: Initial progress report
+
+        Returns:
+            Job ID
+        """
+        job_id = str(uuid.uuid4())
+        async with get_engine().begin() as conn:
+            await conn.execute(
+                insert(jobs).values(
+                    id=job_id,
+                    kind=kind,
+                    queue=queue,
+                    subject_id=subject_id,
+                    status=JobStatusEnum.QUEUED,
+                    payload=payload,
+                    progress=progress,
+                    max_attempts=settings.JOB_MAX_ATTEMPTS,
+                )
+            )
+        logger.info(f"Job enqueued: {kind}", extra={"job_id": job_id, "queue": queue})
+        return job_id
+
+    async def claim(self, queues: list[str]) -> Job | None:
+        """
+        Lease the next due job from the given queues.
+
+        Due jobs are queued ones whose ``run_at`` has passed, and running
+        ones whose lease expired (their worker stopped heartbeating).
+
+        Returns:
+            The job, with its attempt counted, or None if nothing is due
+        """
+        now = func.now()
+        due = (
+            select(jobs.c.id)
+            .where(
+                jobs.c.queue.in_(queues),
+                (
+                    (jobs.c.status == JobStatusEnum.QUEUED) & (jobs.c.run_at <= now)
+                    | (jobs.c.status == JobStatusEnum.RUNNING) & (jobs.c.locked_until < now)
+                ),
+            )
+            .order_by(jobs.c.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with get_engine().begin() as conn:
+            row = (
+                await conn.execute(
+                    update(jobs)
+                    .where(jobs.c.id == due)
+                    .values(
+                        status=JobStatusEnum.RUNNING,
+                        attempts=jobs.c.attempts + 1,
+                        locked_by=self.worker_id,
+                        locked_until=self._lease_end(),
+                        updated_at=now,
+                    )
+                    .returning(
+                        jobs.c.id,
+                        jobs.c.kind,
+                        jobs.c.queue,
+                        jobs.c.subject_id,
+                        jobs.c.payload,
+                        jobs.c.checkpoint,
+                        jobs.c.progress,
+                        jobs.c.attempts,
+                        jobs.c.max_attempts,
+                    )
+                )
+            ).first()
+        return Job(*row) if row is not None else None
+
+    async def heartbeat(self, job: Job, progress: dict[str, Any] | None) -> bool:
+        """
+        Extend a job's lease and record its progress.
+
+        Returns:
+            Whether this worker still holds the lease
+        """
+        if progress is None:
+            return await self._update(job, locked_until=self._lease_end())
+        return await self._update(job, locked_until=self._lease_end(), progress=progress)
+
+    @contextlib.asynccontextmanager
+    async def keep_alive(
+        self, job: Job, progress: Callable[[], dict[str, Any] | None]
+    ) -> AsyncIterator[None]:
+        """
+        Heartbeat in the background while the body runs.
+
+        The body is cancelled (and LeaseLostError raised) if the lease is
+        lost, so a worker stops working on a job another worker may have
+        picked up.
+
+        Args:
+            job: Claimed job
+            progress: Returns the progress report to record with each heartbeat
+        """
+        body = asyncio.current_task()
+        lost = False
+
+        async def beat() -> None:
+            nonlocal lost
+            while True:
+                await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+                try:
+                    if not await self.heartbeat(job, progress()):
+                        lost = True
+                        body.cancel()  # type: ignore[union-attr]
+                        return
+                except (SQLAlchemyError, OSError):
+                    logger.warning("Job heartbeat failed", extra={"job_id": job.id}, exc_info=True)
+
+        heartbeat = asyncio.create_task(beat(), name=f"job-heartbeat-{job.id}")
+        try:
+            yield
+        except asyncio.CancelledError:
+            if lost:
+                body.uncancel()  # type: ignore[union-attr]
+                error_msg = f"Lease on job {job.id} lost"
+                raise LeaseLostError(error_msg) from None
+            raise
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def save_checkpoint(
+        self, job: Job, checkpoint: dict[str, Any], progress: dict[str, Any] | None
+    ) -> None:
+        """
+        Record the results of a finished stage, merged into the job's checkpoint.
+
+        Raises:
+            LeaseLostError: If this worker no longer holds the lease
+        """
+        job.checkpoint = {**job.checkpoint, **checkpoint}
+        await self._transition(
+            job, checkpoint=job.checkpoint, progress=progress, locked_until=self._lease_end()
+        )
+
+    async def handoff(
+        self, job: Job, queue: str, checkpoint: dict[str, Any], progress: dict[str, Any] | None
+    ) -> None:
+        """
+        Queue the job's next stage, on another queue; the stage gets a fresh set of attempts.
+
+        Raises:
+            LeaseLostError: If this worker no longer holds the lease
+        """
+        job.checkpoint = {**job.checkpoint, **checkpoint}
+        await self._transition(
+            job,
+            queue=queue,
+            status=JobStatusEnum.QUEUED,
+            checkpoint=job.checkpoint,
+            progress=progress,
+            attempts=0,
+            error=None,
+            run_at=func.now(),
+            locked_by=None,
+            locked_until=None,
+        )
+
+    async def complete(self, job: Job, progress: dict[str, Any] | None) -> None:
+        """
+        Mark the job completed.
+
+        Raises:
+            LeaseLostError: If this worker no longer holds the lease
+        """
+        await self._transition(
+            job,
+            status=JobStatusEnum.COMPLETED,
+            progress=progress,
+            error=None,
+            finished_at=func.now(),
+            locked_by=None,
+            locked_until=None,
+        )
+        logger.info(f"Job completed: {job.kind}", extra={"job_id": job.id})
+
+    async def fail(self, job: Job, error: str, progress: dict[str, Any] | None) -> None:
+        """
+        Record a failed attempt: retry after a backoff delay, or fail on the final attempt.
+
+        Raises:
+            LeaseLostError: If this worker no longer holds the lease
+        """
+        error = error[:_MAX_ERROR_CHARS]
+        if job.final_attempt:
+            await self._transition(
+                job,
+                status=JobStatusEnum.FAILED,
+                progress=progress,
+                error=error,
+                finished_at=func.now(),
+                locked_by=None,
+                locked_until=None,
+            )
+            logger.error(
+                f"Job failed: {job.kind}",
+                extra={"job_id": job.id, "attempts": job.attempts, "error": error},
+            )
+            return
+
+        delay = _retry_delay(job.attempts)
+        await self._transition(
+            job,
+            status=JobStatusEnum.QUEUED,
+            progress=progress,
+            error=error,
+            run_at=func.now() + timedelta(seconds=delay),
+            locked_by=None,
+            locked_until=None,
+        )
+        logger.warning(
+            f"Job attempt failed, retrying: {job.kind}",
+            extra={"job_id": job.id, "attempts": job.attempts, "retry_in_seconds": delay},
+        )
+
+    async def release(self, job: Job) -> None:
+        """Put a job back, due now, without counting the attempt (e.g. on shutdown)."""
+        await self._update(
+            job,
+            status=JobStatusEnum.QUEUED,
+            attempts=jobs.c.attempts - 1,
+            run_at=func.now(),
+            locked_by=None,
+            locked_until=None,
+        )
+
+    async def get(self, job_id: str) -> JobStatus | None:
+        """Status of a job, if it exists."""
+        return await self._find(jobs.c.id == job_id)
+
+    async def latest_for_subject(self, subject_id: str) -> JobStatus | None:
+        """Status of the most recent job working on ``subject_id``, if any."""
+        return await self._find(jobs.c.subject_id == subject_id)
+
+    async def _find(self, condition: ColumnElement[bool]) -> JobStatus | None:
+        columns = [jobs.c[name] for name in JobStatus.model_fields]
+        query = select(*columns).where(condition).order_by(jobs.c.created_at.desc()).limit(1)
+        async with get_engine().connect() as conn:
+            row = (await conn.execute(query)).mappings().first()
+        return JobStatus(**row) if row is not None else None
+
+    async def _transition(self, job: Job, **values: Any) -> None:
+        if not await self._update(job, **values):
+            error_msg = f"Lease on job {job.id} lost"
+            raise LeaseLostError(error_msg)
+
+    async def _update(self, job: Job, **values: Any) -> bool:
+        """Update the job if this worker still holds it, returning whether it did."""
+        async with get_engine().begin() as conn:
+            result = await conn.execute(
+                update(jobs)
+                .where(
+                    jobs.c.id == job.id,
+                    jobs.c.locked_by == self.worker_id,
+                    jobs.c.status == JobStatusEnum.RUNNING,
+                )
+                .values(updated_at=func.now(), **values)
+            )
+        return result.rowcount > 0
+
+    def _lease_end(self) -> ColumnElement[Any]:
+        return func.now() + timedelta(seconds=self.lease_seconds)
+
+
+class JobWorker:
+    """
+    Claim jobs from some queues and run them one at a time.
+
+    The handler owns a job's outcome (checkpoint, handoff, complete or
+    fail). Exceptions it lets escape are recorded as failed attempts; on
+    shutdown, the job in progress is released for another worker.
+    """
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        queues: list[str],
+        handler: JobHandler,
+        poll_interval_seconds: float,
+    ):
+        self._job_queue = job_queue
+        self.queues = queues
+        self._handler = handler
+        self.poll_interval_seconds = poll_interval_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Run in the background (for use inside another service's event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name=f"job-worker-{'-'.join(self.queues)}")
+
+    async def stop(self) -> None:
+        """Stop a background worker, releasing its current job."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self) -> None:
+        """Claim and run jobs until cancelled."""
+        logger.info(
+            "Job worker started",
+            extra={"queues": self.queues, "worker_id": self._job_queue.worker_id},
+        )
+        while True:
+            try:
+                job = await self._job_queue.claim(self.queues)
+            except (SQLAlchemyError, OSError):
+                logger.warning("Claiming a job failed", exc_info=True)
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval_seconds)
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        if job.attempts > job.max_attempts:
+            # Its lease ran out on every attempt (e.g. the job keeps crashing its worker)
+            await self._job_queue.fail(job, "Attempts exhausted by expired leases", job.progress)
+            return
+
+        try:
+            await self._handler(job, self._job_queue)
+        except asyncio.CancelledError:
+            with contextlib.suppress(SQLAlchemyError, OSError):
+                await asyncio.shield(self._job_queue.release(job))
+            raise
+        except LeaseLostError:
+            logger.warning("Lost the lease on a job, abandoning it", extra={"job_id": job.id})
+        except Exception as e:
+            logger.error(f"Job handler failed: {job.kind}", extra={"job_id": job.id}, exc_info=True)
+            with contextlib.suppress(LeaseLostError, SQLAlchemyError, OSError):
+                await self._job_queue.fail(job, f"{type(e).__name__}: {e}", job.progress)
+
+
+def worker_id() -> str:
+    """Identity of this process in job rows."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, capped at JOB_RETRY_MAX_DELAY_SECONDS."""
+    ceiling = min(
+        settings.JOB_RETRY_MAX_DELAY_SECONDS,
+        settings.JOB_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, ceiling)
+
+
+# Singleton instance
+_job_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue | None:
+    """Get or create the job queue (None when no database is configured)."""
+    global _job_queue
+    if _job_queue is None and settings.DATABASE_URL:
+        _job_queue = JobQueue(worker_id(), settings.JOB_LEASE_SECONDS)
+    return _job_queue
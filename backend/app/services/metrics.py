@@ -0,0 +1,157 @@
+"""Prometheus metrics for HTTP traffic, OpenAI usage and the database pool."""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.config import settings
+
+# Label for requests that didn't match any route (404s), to keep label cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "openai_request_duration_seconds",
+    "Upstream OpenAI call latency per attempt (streams: until the response starts)",
+    ["model", "operation"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens",
+    "Tokens consumed by OpenAI calls",
+    ["model"],
+)
+OPENAI_CACHED_PROMPT_TOKENS = Counter(
+    "openai_cached_prompt_tokens",
+    "Prompt tokens the provider served from its prompt prefix cache",
+    ["model"],
+)
+OPENAI_COST = Counter(
+    "openai_cost_dollars",
+    "Estimated cost of OpenAI chat calls at list prices (per user: /api/v1/ai/usage)",
+    ["model"],
+)
+OPENAI_HTTP_POOL_WAIT = Histogram(
+    "openai_http_pool_wait_seconds",
+    "Time OpenAI HTTP requests waited for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+OPENAI_HTTP_CONNECTIONS = Counter(
+    "openai_http_requests",
+    "OpenAI HTTP requests by connection (reuse rate: reused / (reused + new))",
+    ["connection"],
+)
+PROMPT_PREFLIGHT = Counter(
+    "prompt_preflight_overflows",
+    "Prompts too long for the model's context window, by action (rejected or truncated)",
+    ["action"],
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Texts per upstream embeddings request",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048),
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "embedding_cache_lookups",
+    "Embedding cache lookups per tier (hit ratio: hit / (hit + miss))",
+    ["tier", "result"],
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a connection from the database pool (waiting for a free one, or connecting)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up waiting for a free database connection",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled database connections by state (saturation: checked_out / db_pool_capacity)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Most database connections the pool will open (pool size + max overflow)",
+    multiprocess_mode="livesum",
+)
+SEARCH_LEG_FAILURES = Counter(
+    "search_leg_failures",
+    "Hybrid search legs left out of a response (reason: timeout or error)",
+    ["leg", "reason"],
+)
+FIELD_EXTRACTION_DOCUMENTS = Counter(
+    "field_extraction_documents",
+    "Documents by how their fields were extracted (LLM calls avoided: rules / total)",
+    ["path"],
+)
+FIELDS_EXTRACTED = Counter(
+    "fields_extracted",
+    "Extracted fields by name and source (rules or llm)",
+    ["field", "source"],
+)
+ERRORS = Counter(
+    "errors",
+    "Errors by component and exception type",
+    ["component", "type"],
+)
+
+
+def record_openai_tokens(model: str, tokens: int, cached_prompt_tokens: int = 0) -> None:
+    """Count tokens consumed by a completed OpenAI call, and how many were prefix-cached."""
+    if tokens:
+        OPENAI_TOKENS.labels(model).inc(tokens)
+    if cached_prompt_tokens:
+        OPENAI_CACHED_PROMPT_TOKENS.labels(model).inc(cached_prompt_tokens)
+
+
+def record_error(component: str, error: BaseException | str) -> None:
+    """Count an error, labelled by exception class name (or the given string)."""
+    error_type = error if isinstance(error, str) else type(error).__name__
+    ERRORS.labels(component, error_type).inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set (multiple uvicorn workers), each
+    worker writes its samples to memory-mapped files in that directory and
+    this aggregates them, so any worker can serve the scrape.
+
+    Returns:
+        Tuple of (body, content_type)
+    """
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=settings.PROMETHEUS_MULTIPROC_DIR)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the shared metrics directory."""
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid(), path=settings.PROMETHEUS_MULTIPROC_DIR)
@@ -1,45 +1,153 @@
 """OpenAI service for handling AI operations."""
 
+import asyncio
+import base64
 import logging
+import random
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import TYPE_CHECKING, TypeVar
 
-from openai import AsyncOpenAI, OpenAIError
+import numpy as np
 
 from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.ai import AIStats, ChatStreamDone, ChatStreamToken
+from app.services.embedding_batcher import EmbeddingBatcher, EmbeddingPriority
+from app.services.http_client import get_http_client
+from app.services.metrics import (
+    OPENAI_REQUEST_DURATION,
+    PROMPT_PREFLIGHT,
+    record_error,
+    record_openai_tokens,
+)
+from app.services.rate_limiter import (
+    RateLimitExceededError,
+    get_rate_limiter,
+    retry_after_from_headers,
+)
+from app.services.single_flight import SingleFlight
+from app.services.tokenizer import PromptTooLongError, context_window, get_tokenizer
+from app.services.usage import get_usage_ledger
+
+if TYPE_CHECKING:
+    import openai
+    from openai.types import CompletionUsage
+
+    from app.services import embedding_cache, response_cache
+    from app.services.embedding_cache import EmbeddingCache
+    from app.services.response_cache import ResponseCache
+else:
+    # The SDK takes a few hundred milliseconds to import: defer it to the first call
+    openai = lazy_import("openai")
+    # Likewise SQLAlchemy, used by the caches' Postgres tiers: defer it to service creation
+    embedding_cache = lazy_import("app.services.embedding_cache")
+    response_cache = lazy_import("app.services.response_cache")
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Retryable besides 429s, 5xx and connection errors (same set the SDK retries)
+_RETRYABLE_STATUS_CODES = frozenset({408, 409})
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant for the Mnemos document management system."
+
 
 class OpenAIService:
     """Service for OpenAI API operations."""
 
     def __init__(self):
-        """Initialize OpenAI client if API key is available."""
-        self._client: AsyncOpenAI | None = None
-        if settings.OPENAI_API_KEY:
-            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        """Set up the service if an API key is configured (the client is created on first use)."""
+        self._api_key = settings.OPENAI_API_KEY
+        self._openai_client: openai.AsyncOpenAI | None = None
+        self._response_cache: ResponseCache | None = None
+        self._single_flight = SingleFlight()
+        self._rate_limiter = get_rate_limiter()
+        self._tokenizer = get_tokenizer()
+        self._usage = get_usage_ledger()
+        self._embedding_batcher: EmbeddingBatcher | None = None
+        self._embedding_cache: EmbeddingCache | None = None
+        if self._api_key:
+            self._response_cache = response_cache.build_response_cache()
+            self._embedding_batcher = EmbeddingBatcher(
+                self._create_embeddings,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_seconds=settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+                max_concurrent_batches=settings.EMBEDDING_MAX_CONCURRENT_BATCHES,
+            )
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self._embedding_cache = embedding_cache.EmbeddingCache(
+                    model=settings.EMBEDDING_MODEL,
+                    dimensions=settings.EMBEDDING_DIMENSIONS,
+                    max_memory_entries=settings.EMBEDDING_CACHE_MEMORY_MAX_ENTRIES,
+                    persistent=bool(settings.DATABASE_URL),
+                )
         else:
             logger.warning("OpenAI API key not configured")
 
     @property
     def is_available(self) -> bool:
         """Check if OpenAI service is available."""
-        return self._client is not None
+        return bool(self._api_key)
+
+    @property
+    def _client(self) -> "openai.AsyncOpenAI":
+        """The OpenAI client, created (and the SDK imported) on first use."""
+        if self._openai_client is None:
+            http_client = get_http_client()
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=settings.OPENAI_BASE_URL,
+                # Otherwise the SDK's own default (10 minutes) applies to every request
+                timeout=http_client.timeout,
+                # Retries go through _call_with_retries so they respect the rate limiter
+                max_retries=0,
+                http_client=http_client,
+            )
+        return self._openai_client
+
+    def warm_up(self) -> None:
+        """Import the SDK and create the client now rather than on the first request."""
+        if self.is_available:
+            _ = self._client
+
+    def stats(self) -> AIStats:
+        """Response cache and request coalescing counters."""
+        return AIStats(
+            cache=self._response_cache.stats() if self._response_cache else None,
+            coalescing=self._single_flight.stats(),
+            embeddings=self._embedding_batcher.stats() if self._embedding_batcher else None,
+        )
+
+    async def close(self) -> None:
+        """Stop background work (pending embedding batches) and drop the client."""
+        if self._embedding_batcher is not None:
+            await self._embedding_batcher.close()
+        # The client sends through the shared HTTP client, which is closed on shutdown:
+        # if the service is used again (a later lifespan), it creates a new one
+        self._openai_client = None
 
     async def chat_completion(
         self,
         message: str,
-        model: str = "gpt-4o-mini",
-        system_prompt: str = "You are a helpful assistant for the Mnemos document management system.",
+        model: str = settings.CHAT_MODEL,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
         max_tokens: int = 500,
+        use_cache: bool = True,
     ) -> tuple[str | None, str, int]:
         """
         Send a chat completion request to OpenAI.
 
+        Identical requests are answered from the response cache when enabled.
+        The prompt is sized before sending (see ``_preflight``).
+
         Args:
             message: User message
             model: OpenAI model to use
             system_prompt: System prompt for context
-            max_tokens: Maximum tokens in response
+            max_tokens: Maximum tokens in response (less if the context window is short)
+            use_cache: Read from and write to the response cache
 
         Returns:
             Tuple of (response_text, model_used, tokens_used)
@@ -47,22 +155,63 @@ class OpenAIService:
 
         Raises:
             ValueError: If service is not available
+            PromptTooLongError: If the prompt doesn't fit the model's context window
         """
         if not self.is_available:
             error_msg = "AI service not available"
             logger.error("Attempted to use OpenAI service without API key")
             raise ValueError(error_msg)
 
+        cache_key = response_cache.make_cache_key(model, system_prompt, message, max_tokens)
+        if use_cache and self._response_cache is not None:
+            cached = await self._response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    f"Chat completion served from cache - model: {cached.model}",
+                    extra={"model": cached.model, "message_length": len(message)},
+                )
+                return cached.content, cached.model, cached.tokens_used
+
+        # Concurrent identical requests share a single upstream call
+        return await self._single_flight.do(
+            cache_key,
+            lambda: self._create_chat_completion(
+                message, model, system_prompt, max_tokens, cache_key if use_cache else None
+            ),
+        )
+
+    async def _create_chat_completion(
+        self,
+        message: str,
+        model: str,
+        system_prompt: str,
+        max_tokens: int,
+        cache_key: str | None,
+    ) -> tuple[str, str, int]:
+        """Call OpenAI, storing the result under cache_key (if given)."""
+        await self._tokenizer.prepare(model)
+        message, max_tokens, prompt_tokens = self._preflight(
+            model, system_prompt, message, max_tokens
+        )
+        estimated_tokens = prompt_tokens + max_tokens
         try:
-            response = await self._client.chat.completions.create(  # type: ignore[union-attr]
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message},
-                ],
-                max_tokens=max_tokens,
+            response = await self._call_with_retries(
+                model,
+                "chat",
+                estimated_tokens,
+                lambda: self._client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": message},
+                    ],
+                    max_tokens=max_tokens,
+                ),
             )
-        except OpenAIError as e:
+        except RateLimitExceededError:
+            # Already logged by the rate limiter / retry loop
+            raise
+        except openai.OpenAIError as e:
             logger.error(
                 f"OpenAI API error: {type(e).__name__} - {str(e)[:100]}",
                 extra={"error": str(e), "model": model},
@@ -79,6 +228,11 @@ class OpenAIService:
         else:
             content = response.choices[0].message.content or ""
             tokens = response.usage.total_tokens if response.usage else 0
+            billed_prompt, completion, cached = _billed_tokens(response.usage, prompt_tokens)
+            record_openai_tokens(model, tokens, cached)
+            self._usage.record(model, billed_prompt, completion, cached)
+            if tokens:
+                self._rate_limiter.release(model, estimated_tokens - tokens)
 
             logger.info(
                 f"Chat completion successful - model: {response.model}, tokens: {tokens}",
@@ -89,8 +243,292 @@ class OpenAIService:
                 },
             )
 
+            if cache_key is not None and self._response_cache is not None:
+                await self._response_cache.set(
+                    cache_key, response_cache.CachedCompletion(content, response.model, tokens)
+                )
+
             return content, response.model, tokens
 
+    def _preflight(
+        self, model: str, system_prompt: str, message: str, max_tokens: int
+    ) -> tuple[str, int, int]:
+        """
+        Size a chat prompt before sending it, instead of paying for a 400.
+
+        Prompt tokens are counted locally. A prompt that leaves less than
+        OPENAI_MIN_OUTPUT_TOKENS of the model's context window is rejected, or
+        with PROMPT_OVERFLOW=truncate has the end of its message cut off.
+
+        Returns:
+            Tuple of (message, max_tokens, prompt_tokens): the message to send,
+            max_tokens reduced to what is left of the context window, and the
+            prompt's token count
+
+        Raises:
+            PromptTooLongError: If the prompt doesn't fit (and can't be truncated to fit)
+        """
+        window = context_window(model)
+        max_prompt_tokens = window - settings.OPENAI_MIN_OUTPUT_TOKENS
+        prompt_tokens = self._tokenizer.count_chat(model, system_prompt, message)
+        if prompt_tokens > max_prompt_tokens:
+            message_tokens = max_prompt_tokens - (
+                prompt_tokens - self._tokenizer.count(message, model)
+            )
+            if settings.PROMPT_OVERFLOW == "reject" or message_tokens <= 0:
+                PROMPT_PREFLIGHT.labels("rejected").inc()
+                logger.warning(
+                    f"Prompt rejected before sending: {prompt_tokens} tokens",
+                    extra={"model": model, "prompt_tokens": prompt_tokens},
+                )
+                raise PromptTooLongError(prompt_tokens, max_prompt_tokens)
+
+            message = self._tokenizer.truncate(message, model, message_tokens)
+            PROMPT_PREFLIGHT.labels("truncated").inc()
+            logger.warning(
+                f"Message truncated before sending: {prompt_tokens} prompt tokens",
+                extra={"model": model, "prompt_tokens": prompt_tokens},
+            )
+            prompt_tokens = self._tokenizer.count_chat(model, system_prompt, message)
+        return message, max(min(max_tokens, window - prompt_tokens), 1), prompt_tokens
+
+    async def chat_completion_stream(
+        self,
+        message: str,
+        model: str = settings.CHAT_MODEL,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_tokens: int = 500,
+    ) -> AsyncGenerator[ChatStreamToken | ChatStreamDone, None]:
+        """
+        Stream a chat completion from OpenAI.
+
+        The upstream request is sent when the generator is first advanced, so
+        connection and API errors surface before any event is yielded.
+        Closing the generator closes the upstream stream, which stops
+        generation (and billing) for tokens nobody will read.
+
+        Args:
+            message: User message
+            model: OpenAI model to use
+            system_prompt: System prompt for context
+            max_tokens: Maximum tokens in response (less if the context window is short)
+
+        Yields:
+            ChatStreamToken for each text delta, then a single ChatStreamDone
+
+        Raises:
+            ValueError: If service is not available
+            PromptTooLongError: If the prompt doesn't fit the model's context window
+        """
+        if not self.is_available:
+            error_msg = "AI service not available"
+            logger.error("Attempted to use OpenAI service without API key")
+            raise ValueError(error_msg)
+
+        start_time = time.perf_counter()
+        await self._tokenizer.prepare(model)
+        message, max_tokens, prompt_tokens = self._preflight(
+            model, system_prompt, message, max_tokens
+        )
+        estimated_tokens = prompt_tokens + max_tokens
+        try:
+            stream = await self._call_with_retries(
+                model,
+                "chat_stream",
+                estimated_tokens,
+                lambda: self._client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": message},
+                    ],
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ),
+            )
+        except openai.OpenAIError as e:
+            logger.error(
+                f"OpenAI API error: {type(e).__name__} - {str(e)[:100]}",
+                extra={"error": str(e), "model": model},
+                exc_info=True,
+            )
+            raise
+
+        model_used = model
+        tokens = 0
+        usage: CompletionUsage | None = None
+        first_token_time: float | None = None
+        try:
+            async for chunk in stream:
+                model_used = chunk.model or model_used
+                if chunk.usage:
+                    usage = chunk.usage
+                    tokens = usage.total_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter()
+                    yield ChatStreamToken(content=chunk.choices[0].delta.content)
+        except (GeneratorExit, asyncio.CancelledError):
+            logger.info(
+                "Chat stream cancelled before completion",
+                extra={"model": model_used, "message_length": len(message)},
+            )
+            raise
+        finally:
+            await stream.close()
+
+        billed_prompt, completion, cached = _billed_tokens(usage, prompt_tokens)
+        record_openai_tokens(model, tokens, cached)
+        self._usage.record(model, billed_prompt, completion, cached)
+        if tokens:
+            self._rate_limiter.release(model, estimated_tokens - tokens)
+
+        total_time = time.perf_counter() - start_time
+        time_to_first_token_ms = (
+            (first_token_time - start_time) * 1000 if first_token_time is not None else None
+        )
+
+        logger.info(
+            f"Chat stream successful - model: {model_used}, tokens: {tokens}",
+            extra={
+                "model": model_used,
+                "tokens": tokens,
+                "message_length": len(message),
+                "time_to_first_token_ms": time_to_first_token_ms,
+                "total_time_ms": total_time * 1000,
+            },
+        )
+
+        yield ChatStreamDone(
+            model=model_used,
+            tokens_used=tokens,
+            time_to_first_token_ms=time_to_first_token_ms,
+            total_time_ms=total_time * 1000,
+        )
+
+    async def embed(
+        self, texts: list[str], priority: EmbeddingPriority = EmbeddingPriority.QUERY
+    ) -> np.ndarray:
+        """
+        Embed texts with the configured embedding model.
+
+        Texts embedded before are served from the embedding cache. The rest
+        (deduplicated) go through the micro-batcher, which gathers concurrent
+        calls (live queries and ingestion alike) into shared upstream
+        requests; query traffic is batched ahead of bulk.
+
+        Args:
+            texts: Non-empty texts to embed
+            priority: QUERY for latency-sensitive callers, BULK for ingestion
+
+        Returns:
+            float32 array of shape (len(texts), EMBEDDING_DIMENSIONS)
+
+        Raises:
+            ValueError: If service is not available or a text is blank
+        """
+        if not self.is_available or self._embedding_batcher is None:
+            error_msg = "AI service not available"
+            logger.error("Attempted to use OpenAI service without API key")
+            raise ValueError(error_msg)
+        if not texts:
+            return np.empty((0, settings.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        # A blank input fails the whole upstream batch, including other callers' texts
+        if not all(text.strip() for text in texts):
+            error_msg = "Cannot embed blank text"
+            raise ValueError(error_msg)
+
+        if self._embedding_cache is None:
+            return await self._embedding_batcher.embed(texts, priority)
+
+        hashes = [embedding_cache.text_hash(text) for text in texts]
+        vectors = await self._embedding_cache.get_many(hashes)
+        missing = {h: text for h, text in zip(hashes, texts, strict=True) if h not in vectors}
+        if missing:
+            embedded = await self._embedding_batcher.embed(list(missing.values()), priority)
+            new_vectors = dict(zip(missing, embedded, strict=True))
+            await self._embedding_cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+        return np.stack([vectors[h] for h in hashes])
+
+    async def _create_embeddings(self, texts: list[str]) -> np.ndarray:
+        """Embed one batch of texts in a single upstream request."""
+        model = settings.EMBEDDING_MODEL
+        await self._tokenizer.prepare(model)
+        estimated_tokens = sum(self._tokenizer.count(text, model) for text in texts)
+        response = await self._call_with_retries(
+            model,
+            "embeddings",
+            estimated_tokens,
+            lambda: self._client.embeddings.create(
+                model=model,
+                input=texts,
+                dimensions=settings.EMBEDDING_DIMENSIONS,
+                # Raw float32 bytes: smaller responses and no float parsing
+                encoding_format="base64",
+            ),
+        )
+
+        tokens = response.usage.total_tokens if response.usage else 0
+        record_openai_tokens(model, tokens)
+        if tokens:
+            self._rate_limiter.release(model, estimated_tokens - tokens)
+        logger.debug(
+            f"Embeddings successful - model: {model}, texts: {len(texts)}, tokens: {tokens}",
+            extra={"model": model, "texts": len(texts), "tokens": tokens},
+        )
+
+        vectors = np.empty((len(texts), settings.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        for item in response.data:
+            vectors[item.index] = np.frombuffer(
+                base64.b64decode(item.embedding),  # type: ignore[arg-type]
+                dtype=np.float32,
+            )
+        return vectors
+
+    async def _call_with_retries(
+        self, model: str, operation: str, estimated_tokens: int, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Make an OpenAI call within the rate limit budget, retrying transient failures.
+
+        Each attempt first reserves budget from the rate limiter. 429s pause
+        every caller of the model for the server-suggested delay; other
+        retryable errors back off only this call. Each attempt's latency is
+        recorded under ``operation``.
+
+        Raises:
+            RateLimitExceededError: If budget is not available in time or 429s persist
+            OpenAIError: If the error is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            await self._rate_limiter.acquire(model, estimated_tokens)
+            try:
+                with OPENAI_REQUEST_DURATION.labels(model, operation).time():
+                    return await call()
+            except openai.OpenAIError as e:
+                record_error("openai", e)
+                # Tokens aren't counted for failed requests
+                self._rate_limiter.release(model, estimated_tokens)
+                delay = _retry_delay(e, attempt)
+                if not _is_retryable(e) or attempt >= settings.OPENAI_MAX_RETRIES:
+                    if isinstance(e, openai.RateLimitError) and _is_retryable(e):
+                        raise RateLimitExceededError(retry_after=delay) from e
+                    raise
+
+                logger.warning(
+                    f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.2f}s",
+                    extra={"model": model, "attempt": attempt + 1, "retry_after": delay},
+                )
+                if isinstance(e, openai.RateLimitError):
+                    # Hold back every caller for this model, not just this one
+                    self._rate_limiter.pause(model, delay)
+                else:
+                    await asyncio.sleep(delay)
+                attempt += 1
+
     async def test_connection(self) -> tuple[bool, str]:
         """
         Test OpenAI API connection.
@@ -102,8 +540,8 @@ class OpenAIService:
             return False, "Service not configured"
 
         try:
-            await self._client.models.list()  # type: ignore[union-attr]
-        except OpenAIError as e:
+            await self._client.models.list()
+        except openai.OpenAIError as e:
             logger.error(f"❌ OpenAI connection test failed: {type(e).__name__}", exc_info=True)
             return False, f"Connection failed: {type(e).__name__}"
         except Exception as e:
@@ -116,6 +554,49 @@ class OpenAIService:
             return True, "Connected successfully"
 
 
+def _is_retryable(error: "openai.OpenAIError") -> bool:
+    """Whether a failed call is worth retrying."""
+    if isinstance(error, openai.RateLimitError):
+        # Exhausted billing quota also comes back as a 429, but won't recover
+        return error.code != "insufficient_quota"
+    if isinstance(error, openai.APIStatusError):
+        return (
+            isinstance(error, openai.InternalServerError)
+            or error.status_code in _RETRYABLE_STATUS_CODES
+        )
+    return isinstance(error, openai.APIConnectionError)
+
+
+def _retry_delay(error: "openai.OpenAIError", attempt: int) -> float:
+    """Server-suggested delay when given, else exponential backoff with full jitter."""
+    base_delay = settings.OPENAI_RETRY_BASE_DELAY_SECONDS
+    if isinstance(error, openai.APIStatusError):
+        retry_after = retry_after_from_headers(error.response.headers)
+        if retry_after is not None:
+            # Jitter so waiting callers don't all retry at the same instant
+            return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, base_delay * 2**attempt)
+
+
+def _billed_tokens(usage: "CompletionUsage | None", prompt_tokens: int) -> tuple[int, int, int]:
+    """
+    Prompt, completion and cached prompt tokens of a completed call.
+
+    Compatible servers may leave out parts of the usage breakdown (or send
+    something else entirely); the prompt then counts as sized before sending.
+    """
+    if usage is None:
+        return prompt_tokens, 0, 0
+    prompt = _as_int(usage.prompt_tokens, prompt_tokens)
+    completion = _as_int(usage.completion_tokens, max(usage.total_tokens - prompt, 0))
+    details = usage.prompt_tokens_details
+    return prompt, completion, _as_int(details.cached_tokens, 0) if details else 0
+
+
+def _as_int(value: object, default: int) -> int:
+    return value if isinstance(value, int) else default
+
+
 # Singleton instance
 _openai_service: OpenAIService | None = None
 
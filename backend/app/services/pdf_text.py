@@ -0,0 +1,48 @@
+"""
+PDF text extraction, run in ingestion worker processes.
+
+Kept free of app imports (other than the dependency-free chunker) so worker
+processes start quickly. pypdf is only imported in the processes that use
+it, not in the API process that hands out the work.
+"""
+
+from typing import TYPE_CHECKING
+
+from app.lazy_imports import lazy_import
+from app.services.chunking import Chunk, chunk_pages
+
+if TYPE_CHECKING:
+    import pypdf
+else:
+    pypdf = lazy_import("pypdf")
+
+
+def extract_page_range(path: str, start: int, end: int | None) -> tuple[int, list[str]]:
+    """
+    Extract text from pages ``start`` to ``end`` (exclusive) of a PDF.
+
+    Args:
+        path: PDF file path
+        start: First page index (0-based)
+        end: Page index to stop at, or None for the end of the document
+
+    Returns:
+        Tuple of (total_pages_in_document, page_texts)
+    """
+    reader = pypdf.PdfReader(path)
+    total_pages = len(reader.pages)
+    stop = total_pages if end is None else min(end, total_pages)
+    return total_pages, [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_chunks(
+    path: str, start: int, end: int | None, target_chars: int, max_chars: int
+) -> tuple[int, int, list[Chunk]]:
+    """
+    Extract and chunk a page range, so only chunks travel back to the parent process.
+
+    Returns:
+        Tuple of (total_pages_in_document, pages_extracted, chunks)
+    """
+    total_pages, texts = extract_page_range(path, start, end)
+    return total_pages, len(texts), chunk_pages(texts, start, target_chars, max_chars)
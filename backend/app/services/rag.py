@@ -0,0 +1,196 @@
+"""Chat answered from ingested documents (retrieval-augmented generation)."""
+
+import logging
+import re
+from collections.abc import Callable
+
+from app.config import settings
+from app.models.ai import ChatResponse, Citation
+from app.models.search import SearchResult
+from app.responses import trusted_model
+from app.services.openai_service import OpenAIService, get_openai_service
+from app.services.search import SearchService, get_search_service
+from app.services.tokenizer import Tokenizer, context_window, get_tokenizer
+from app.services.vector_index import SearchFilters
+
+logger = logging.getLogger(__name__)
+
+RAG_SYSTEM_PROMPT = (
+    "You are a helpful assistant for the Mnemos document management system. "
+    "Answer the user's question using only the numbered document excerpts below. "
+    "Cite the excerpts you use with their numbers in square brackets, e.g. [1] or [2][3]. "
+    "If the excerpts don't contain the answer, say so instead of guessing."
+)
+
+# Tokens for each excerpt's "[n] (document ..., page ...)" header and separators
+_SOURCE_OVERHEAD_TOKENS = 20
+_CITATION = re.compile(r"\[(\d+)\]")
+
+
+class RAGService:
+    """
+    Answer chat messages from the best matching document chunks.
+
+    The message is run through hybrid search, and as many of the top-ranked
+    results as fit the model's token budget are packed into the prompt as
+    numbered excerpts, skipping chunks without text and duplicates (the same
+    chunk in several documents, or identical text). The answer cites
+    excerpts by number and the response lists them as citations.
+
+    The prompt is laid out for the provider's prompt prefix caching: fixed
+    instructions first, then the excerpts in document order rather than rank
+    order, then the question. A follow-up question that retrieves mostly the
+    same chunks then shares a long prefix with the previous prompt, which
+    the provider serves from its cache at lower latency and cost.
+    """
+
+    def __init__(
+        self, openai_service: OpenAIService, search_service: SearchService, tokenizer: Tokenizer
+    ):
+        self._openai_service = openai_service
+        self._search_service = search_service
+        self._tokenizer = tokenizer
+
+    async def chat(
+        self,
+        message: str,
+        model: str,
+        filters: SearchFilters | None = None,
+        use_cache: bool = True,
+    ) -> ChatResponse:
+        """
+        Answer a message from the user's documents.
+
+        Args:
+            message: User message, also used as the search query
+            model: OpenAI model to use
+            filters: Restrictions on the documents searched
+            use_cache: Read from and write to the response cache
+
+        Returns:
+            The answer with the excerpts given as context as citations
+
+        Raises:
+            ValueError: If the AI service is not available
+            RateLimitExceededError, OpenAIError: From searching or the completion
+            PromptTooLongError: If the message alone doesn't fit the model's context window
+        """
+        search = await self._search_service.search(message, settings.RAG_SEARCH_K, filters)
+        await self._tokenizer.prepare(model)
+        sources = pack_context(
+            search.results,
+            context_budget(self._tokenizer, model, message),
+            lambda text: self._tokenizer.count(text, model),
+        )
+        content, model_used, tokens = await self._openai_service.chat_completion(
+            message=message,
+            model=model,
+            system_prompt=build_system_prompt(sources),
+            max_tokens=settings.RAG_MAX_OUTPUT_TOKENS,
+            use_cache=use_cache,
+        )
+
+        cited = {int(number) for number in _CITATION.findall(content or "")}
+        citations = [
+            trusted_model(
+                Citation,
+                index=index,
+                document_id=source.document_id,
+                page=source.page,
+                chunk_hash=source.chunk_hash,
+                score=source.score,
+                cited=index in cited,
+            )
+            for index, source in enumerate(sources, start=1)
+        ]
+        logger.info(
+            f"Document chat answered from {len(sources)} excerpts",
+            extra={
+                "model": model_used,
+                "candidates": len(search.results),
+                "sources": len(sources),
+                "cited": sum(citation.cited for citation in citations),
+                "degraded": search.degraded,
+            },
+        )
+        return trusted_model(
+            ChatResponse,
+            response=content or "",
+            model=model_used,
+            tokens_used=tokens,
+            citations=citations,
+        )
+
+
+def context_budget(tokenizer: Tokenizer, model: str, message: str) -> int:
+    """
+    Tokens available for document excerpts in a prompt for this model.
+
+    RAG_CONTEXT_MAX_TOKENS, reduced if the instructions, message and output
+    allowance would otherwise overflow the model's context window.
+    """
+    fixed = tokenizer.count_chat(model, RAG_SYSTEM_PROMPT, message)
+    available = context_window(model) - fixed - settings.RAG_MAX_OUTPUT_TOKENS
+    return max(0, min(settings.RAG_CONTEXT_MAX_TOKENS, available))
+
+
+def pack_context(
+    results: list[SearchResult], budget: int, count_tokens: Callable[[str], int]
+) -> list[SearchResult]:
+    """
+    Choose the search results to give the model as context.
+
+    Results are taken best first while they fit the budget; one that doesn't
+    fit is skipped in favour of smaller, lower-ranked ones. Results without
+    text and repeats of an already chosen chunk or text are dropped.
+
+    Args:
+        results: Search results, best first
+        budget: Tokens available for the excerpts
+        count_tokens: Token count of a text (memoized, as chunks come up again and again)
+
+    Returns:
+        The chosen results in document order (document, page, chunk)
+    """
+    chosen: list[SearchResult] = []
+    seen_hashes: set[str] = set()
+    seen_texts: set[str] = set()
+    remaining = budget
+    for result in results:
+        if result.text is None or result.chunk_hash in seen_hashes:
+            continue
+        normalized = " ".join(result.text.split()).lower()
+        if normalized in seen_texts:
+            continue
+        cost = count_tokens(result.text) + _SOURCE_OVERHEAD_TOKENS
+        if cost > remaining:
+            continue
+        chosen.append(result)
+        seen_hashes.add(result.chunk_hash)
+        seen_texts.add(normalized)
+        remaining -= cost
+    # Deterministic order keeps the prompt prefix stable across related questions
+    return sorted(chosen, key=lambda result: (result.document_id, result.page, result.chunk_hash))
+
+
+def build_system_prompt(sources: list[SearchResult]) -> str:
+    """The instructions followed by the numbered excerpts."""
+    if not sources:
+        return f"{RAG_SYSTEM_PROMPT}\n\nNo document excerpts matched the question."
+    excerpts = "\n\n".join(
+        f"[{index}] (document {source.document_id}, page {source.page + 1})\n{source.text}"
+        for index, source in enumerate(sources, start=1)
+    )
+    return f"{RAG_SYSTEM_PROMPT}\n\nDocument excerpts:\n\n{excerpts}"
+
+
+# Singleton instance
+_rag_service: RAGService | None = None
+
+
+def get_rag_service() -> RAGService:
+    """Get or create the document chat service."""
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService(get_openai_service(), get_search_service(), get_tokenizer())
+    return _rag_service
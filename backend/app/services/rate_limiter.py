@@ -0,0 +1,227 @@
+"""Client-side rate limiting for OpenAI requests and tokens."""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.services.metrics import record_error
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Endpoints whose responses carry per-model rate limit headers
+_RATE_LIMITED_PATHS = ("/chat/completions", "/embeddings")
+
+
+class RateLimitExceededError(Exception):
+    """Raised when a call cannot be made within the allowed wait time."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit reached, retry after {retry_after:.1f}s")
+
+
+class TokenBucket:
+    """
+    Budget that refills continuously up to ``capacity`` per minute.
+
+    Consuming may drive the level negative: that is a reservation, and later
+    callers wait until the debt is repaid. This keeps waiting callers in
+    arrival order without a queue.
+    """
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = capacity_per_minute
+        self.level = capacity_per_minute
+        self._updated_at = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available."""
+        self._refill(now)
+        missing = amount - self.level
+        return max(missing, 0.0) / self._rate
+
+    def consume(self, amount: float, now: float) -> None:
+        """Take ``amount`` from the budget (possibly going into debt)."""
+        self._refill(now)
+        self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return unused budget (e.g. a call used fewer tokens than estimated)."""
+        self.level = min(self.level + amount, self.capacity)
+
+    def sync(self, limit: float | None, remaining: float | None) -> None:
+        """Adopt the server's view of the limit and what is left of it."""
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+    @property
+    def _rate(self) -> float:
+        return self.capacity / 60.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self.level = min(self.level + elapsed * self._rate, self.capacity)
+
+
+class _ModelBudget:
+    """Request and token budgets for one model."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+
+
+class RateLimiter:
+    """
+    Per-model request and token budgets shared by everything in this process.
+
+    Callers reserve budget before each upstream call and wait for it if
+    needed. Callers that would wait longer than ``max_wait_seconds`` are
+    rejected immediately with a retry-after hint. Budgets are corrected from
+    OpenAI's ``x-ratelimit-*`` response headers, so usage by other processes
+    sharing the same API key is taken into account.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait_seconds: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_seconds = max_wait_seconds
+        self._budgets: dict[str, _ModelBudget] = {}
+
+    async def acquire(self, model: str, tokens: int) -> None:
+        """
+        Reserve one request and ``tokens`` tokens for ``model``, waiting if needed.
+
+        Raises:
+            RateLimitExceededError: If the wait would exceed max_wait_seconds
+        """
+        budget = self._budget(model)
+        now = time.monotonic()
+        wait = max(
+            budget.requests.wait_time(1, now),
+            budget.tokens.wait_time(tokens, now),
+            budget.paused_until - now,
+        )
+        if wait > self.max_wait_seconds:
+            logger.warning(
+                f"Rate limit budget exhausted for {model}",
+                extra={"model": model, "tokens": tokens, "retry_after": wait},
+            )
+            record_error("rate_limiter", "budget_exhausted")
+            raise RateLimitExceededError(retry_after=wait)
+
+        budget.requests.consume(1, now)
+        budget.tokens.consume(tokens, now)
+        if wait > 0:
+            logger.debug(f"Waiting {wait:.2f}s for rate limit budget", extra={"model": model})
+            await asyncio.sleep(wait)
+
+    def release(self, model: str, tokens: int) -> None:
+        """Return reserved tokens that were not used."""
+        if tokens > 0:
+            self._budget(model).tokens.refund(tokens)
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Hold all calls for ``model`` (e.g. after a 429 with Retry-After)."""
+        budget = self._budget(model)
+        budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, model: str, headers: Mapping[str, str]) -> None:
+        """Sync budgets with OpenAI's x-ratelimit-* response headers."""
+        budget = self._budget(model)
+        budget.requests.sync(
+            _parse_float(headers.get("x-ratelimit-limit-requests")),
+            _parse_float(headers.get("x-ratelimit-remaining-requests")),
+        )
+        budget.tokens.sync(
+            _parse_float(headers.get("x-ratelimit-limit-tokens")),
+            _parse_float(headers.get("x-ratelimit-remaining-tokens")),
+        )
+
+    def _budget(self, model: str) -> _ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = _ModelBudget(self.requests_per_minute, self.tokens_per_minute)
+            self._budgets[model] = budget
+        return budget
+
+
+def retry_after_from_headers(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait before retrying, from Retry-After or x-ratelimit-reset-* headers."""
+    if retry_after_ms := _parse_float(headers.get("retry-after-ms")):
+        return retry_after_ms / 1000
+    if retry_after := _parse_float(headers.get("retry-after")):
+        return retry_after
+
+    resets = [
+        _parse_duration(headers.get("x-ratelimit-reset-requests")),
+        _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+    ]
+    known = [reset for reset in resets if reset is not None]
+    return max(known) if known else None
+
+
+async def observe_rate_limit_headers(response: "httpx.Response") -> None:
+    """httpx response hook: feed rate limit headers into the shared limiter."""
+    request = response.request
+    if request.method != "POST" or not request.url.path.endswith(_RATE_LIMITED_PATHS):
+        return
+    if "x-ratelimit-remaining-requests" not in response.headers:
+        return
+
+    try:
+        model = json.loads(request.content)["model"]
+    except (ValueError, KeyError, TypeError):
+        return
+
+    get_rate_limiter().update_from_headers(model, response.headers)
+
+
+def _parse_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """Parse OpenAI reset durations such as "20ms", "1s" or "6m0s"."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+# Singleton instance
+_rate_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the process-wide rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+            max_wait_seconds=settings.OPENAI_MAX_RATE_LIMIT_WAIT_SECONDS,
+        )
+    return _rate_limiter
@@ -0,0 +1,247 @@
+"""Chat completion response cache with pluggable backends."""
+
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timedelta
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.db.engine import get_engine
+from app.db.tables import response_cache
+from app.models.ai import CacheStats
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (dict slot, tuple, timestamps) on top of the strings
+_ENTRY_OVERHEAD_BYTES = 200
+
+# Prune expired / least recently used rows every N writes, not on every write
+_POSTGRES_PRUNE_EVERY = 100
+
+
+class CachedCompletion(NamedTuple):
+    """A cached chat completion."""
+
+    content: str
+    model: str
+    tokens_used: int
+
+
+def make_cache_key(model: str, system_prompt: str, message: str, max_tokens: int) -> str:
+    """Build a cache key from everything that affects the completion."""
+    payload = json.dumps([model, system_prompt, message, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base class for response cache backends. Tracks hit/miss counters."""
+
+    backend_name: str
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> CachedCompletion | None:
+        """Look up a cached completion, counting the hit or miss."""
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: CachedCompletion) -> None:
+        """Store a completion."""
+        await self._set(key, value)
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache counters."""
+        lookups = self.hits + self.misses
+        return CacheStats(
+            backend=self.backend_name,
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / lookups if lookups else 0.0,
+            evictions=self.evictions,
+            entries=self._entry_count(),
+        )
+
+    @abstractmethod
+    async def _get(self, key: str) -> CachedCompletion | None: ...
+
+    @abstractmethod
+    async def _set(self, key: str, value: CachedCompletion) -> None: ...
+
+    def _entry_count(self) -> int | None:
+        return None
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Process-local LRU cache bounded by entry count and approximate size, with TTL."""
+
+    backend_name = "memory"
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_bytes: int):
+        super().__init__(ttl_seconds, max_entries)
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        # key -> (value, expires_at, size); ordered from least to most recently used
+        self._entries: OrderedDict[str, tuple[CachedCompletion, float, int]] = OrderedDict()
+
+    async def _get(self, key: str) -> CachedCompletion | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: CachedCompletion) -> None:
+        size = _entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key, evicted=False)
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+        self.size_bytes += size
+
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def _remove(self, key: str, *, evicted: bool = True) -> None:
+        _, _, size = self._entries.pop(key)
+        self.size_bytes -= size
+        if evicted:
+            self.evictions += 1
+
+    def _entry_count(self) -> int | None:
+        return len(self._entries)
+
+
+class PostgresResponseCache(ResponseCache):
+    """
+    Response cache stored in Postgres, so it survives restarts and is shared by workers.
+
+    Lookups refresh ``last_accessed_at``; expired and least recently used rows
+    beyond ``max_entries`` are pruned periodically. Database errors (including
+    an unreachable server) are logged and treated as misses so the cache never
+    fails a chat request.
+    """
+
+    backend_name = "postgres"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self._writes = 0
+
+    async def _get(self, key: str) -> CachedCompletion | None:
+        statement = (
+            update(response_cache)
+            .where(response_cache.c.key == key, response_cache.c.expires_at > func.now())
+            .values(last_accessed_at=func.now())
+            .returning(
+                response_cache.c.content,
+                response_cache.c.model,
+                response_cache.c.tokens_used,
+            )
+        )
+        try:
+            async with get_engine().begin() as conn:
+                row = (await conn.execute(statement)).first()
+        except (SQLAlchemyError, OSError):
+            logger.warning("Response cache lookup failed", exc_info=True)
+            return None
+
+        return CachedCompletion(*row) if row else None
+
+    async def _set(self, key: str, value: CachedCompletion) -> None:
+        expires_at = func.now() + timedelta(seconds=self.ttl_seconds)
+        statement = insert(response_cache).values(
+            key=key,
+            content=value.content,
+            model=value.model,
+            tokens_used=value.tokens_used,
+            expires_at=expires_at,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[response_cache.c.key],
+            set_={
+                "content": statement.excluded.content,
+                "model": statement.excluded.model,
+                "tokens_used": statement.excluded.tokens_used,
+                "expires_at": statement.excluded.expires_at,
+                "last_accessed_at": func.now(),
+            },
+        )
+        try:
+            async with get_engine().begin() as conn:
+                await conn.execute(statement)
+                self._writes += 1
+                if self._writes % _POSTGRES_PRUNE_EVERY == 0:
+                    await self._prune(conn)
+        except (SQLAlchemyError, OSError):
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def _prune(self, conn: AsyncConnection) -> None:
+        """Delete expired rows and rows beyond max_entries (least recently used first)."""
+        beyond_limit = (
+            select(response_cache.c.key)
+            .order_by(response_cache.c.last_accessed_at.desc())
+            .offset(self.max_entries)
+        )
+        result = await conn.execute(
+            delete(response_cache).where(
+                (response_cache.c.expires_at <= func.now())
+                | response_cache.c.key.in_(beyond_limit.scalar_subquery())
+            )
+        )
+        self.evictions += result.rowcount
+
+
+def _entry_size(key: str, value: CachedCompletion) -> int:
+    """Approximate memory footprint of a cache entry."""
+    return (
+        len(key) + len(value.content.encode()) + len(value.model.encode()) + _ENTRY_OVERHEAD_BYTES
+    )
+
+
+def build_response_cache() -> ResponseCache | None:
+    """Create the configured response cache backend, or None if caching is disabled."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+
+    if settings.RESPONSE_CACHE_BACKEND == "postgres":
+        if not settings.DATABASE_URL:
+            error_msg = "RESPONSE_CACHE_BACKEND=postgres requires DATABASE_URL"
+            raise ValueError(error_msg)
+        return PostgresResponseCache(
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        )
+
+    return InMemoryResponseCache(
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    )
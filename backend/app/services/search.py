@@ -0,0 +1,181 @@
+"""Hybrid (vector + full-text) search over ingested documents."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.lazy_imports import lazy_import
+from app.models.search import SearchResponse, SearchResult
+from app.services.embedding_batcher import EmbeddingPriority
+from app.services.metrics import SEARCH_LEG_FAILURES
+from app.services.openai_service import OpenAIService, get_openai_service
+from app.services.vector_index import SearchFilters, SearchHit, VectorIndex, get_vector_index
+
+if TYPE_CHECKING:
+    from app.services import chunk_store as chunk_store_module
+    from app.services.chunk_store import ChunkStore
+else:
+    # Imports SQLAlchemy: defer it to the first search
+    chunk_store_module = lazy_import("app.services.chunk_store")
+
+logger = logging.getLogger(__name__)
+
+VECTOR = "vector"
+LEXICAL = "lexical"
+
+
+class SearchService:
+    """
+    Run vector and full-text search concurrently and fuse their rankings.
+
+    Embeddings match meaning but are poor at exact tokens such as order
+    numbers, SKUs and policy IDs, which full-text search matches precisely.
+    Each leg returns its best candidates and the two rankings are merged by
+    reciprocal rank fusion, so a chunk ranked highly by either leg (or
+    moderately by both) comes out on top without comparing raw scores.
+
+    Each leg has its own timeout. A leg that times out or fails is left out
+    of the response (and listed in ``degraded``) instead of failing or
+    stalling the search. Full-text search needs a database; without one only
+    the vector leg runs.
+    """
+
+    def __init__(
+        self,
+        openai_service: OpenAIService,
+        vector_index: VectorIndex,
+        chunk_store: "ChunkStore | None",
+    ):
+        self._openai_service = openai_service
+        self._vector_index = vector_index
+        self._chunk_store = chunk_store
+
+    async def search(
+        self, query: str, k: int, filters: SearchFilters | None = None
+    ) -> SearchResponse:
+        """
+        Find the chunks best matching a query.
+
+        Args:
+            query: Search text
+            k: Results to return
+            filters: Restrictions on candidate chunks
+
+        Returns:
+            Matching chunks, best first, with their text when a database is configured
+
+        Raises:
+            ValueError: If the AI service is not available and no other leg succeeded
+            RateLimitExceededError, OpenAIError: Likewise, from embedding the query
+        """
+        depth = max(k, settings.SEARCH_CANDIDATES)
+        legs: dict[str, tuple[Awaitable[list[SearchHit]], float]] = {
+            VECTOR: (self._vector_hits(query, depth, filters), settings.SEARCH_VECTOR_TIMEOUT_MS)
+        }
+        if self._chunk_store is not None:
+            legs[LEXICAL] = (
+                self._lexical_hits(self._chunk_store, query, depth, filters),
+                settings.SEARCH_LEXICAL_TIMEOUT_MS,
+            )
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(leg, timeout_ms / 1000) for leg, timeout_ms in legs.values()),
+            return_exceptions=True,
+        )
+
+        rankings: dict[str, list[SearchHit]] = {}
+        failures: dict[str, Exception] = {}
+        for name, outcome in zip(legs, outcomes, strict=True):
+            if isinstance(outcome, Exception):
+                failures[name] = outcome
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                rankings[name] = outcome
+
+        if not rankings and not isinstance(failures[VECTOR], TimeoutError):
+            raise failures[VECTOR]
+        for name, error in failures.items():
+            reason = "timeout" if isinstance(error, TimeoutError) else "error"
+            SEARCH_LEG_FAILURES.labels(name, reason).inc()
+            logger.warning(
+                f"Search leg {name} left out ({reason}): {type(error).__name__}",
+                extra={"leg": name, "reason": reason},
+            )
+
+        results = fuse(rankings, settings.SEARCH_RRF_K)[:k]
+        texts = (
+            await self._chunk_store.get_texts([result.chunk_hash for result in results])
+            if self._chunk_store is not None and results
+            else {}
+        )
+        for result in results:
+            result.text = texts.get(result.chunk_hash)
+        logger.debug(
+            "Search completed",
+            extra={"results": len(results), "k": k, "degraded": list(failures)},
+        )
+        return SearchResponse(query=query, results=results, degraded=list(failures))
+
+    async def _vector_hits(
+        self, query: str, depth: int, filters: SearchFilters | None
+    ) -> list[SearchHit]:
+        vectors = await self._openai_service.embed([query], EmbeddingPriority.QUERY)
+        # The scan holds the GIL only briefly (NumPy releases it during matmul)
+        return await asyncio.to_thread(self._vector_index.search, vectors[0], depth, filters)
+
+    async def _lexical_hits(
+        self, chunk_store: "ChunkStore", query: str, depth: int, filters: SearchFilters | None
+    ) -> list[SearchHit]:
+        ranks = await chunk_store.search_text(query, depth)
+        # Only indexed chunks (current versions) are returned, filtered like vector hits
+        return await asyncio.to_thread(self._vector_index.locate, ranks, filters)
+
+
+def fuse(rankings: dict[str, list[SearchHit]], rrf_k: int) -> list[SearchResult]:
+    """
+    Merge rankings by reciprocal rank fusion.
+
+    A chunk occurrence scores ``1 / (rrf_k + rank)`` (rank starting at 1) in
+    each ranking it appears in, summed across rankings.
+
+    Args:
+        rankings: Hits of each search leg, best first
+        rrf_k: Rank offset; larger values flatten the advantage of top ranks
+
+    Returns:
+        Fused results, best first, without text
+    """
+    fused: dict[tuple[str, str], SearchResult] = {}
+    for name, hits in rankings.items():
+        for rank, hit in enumerate(hits, start=1):
+            key = (hit.document_id, hit.chunk_hash)
+            result = fused.get(key)
+            if result is None:
+                result = fused[key] = SearchResult(
+                    document_id=hit.document_id,
+                    page=hit.page,
+                    score=0.0,
+                    chunk_hash=hit.chunk_hash,
+                )
+            result.score += 1 / (rrf_k + rank)
+            if name == VECTOR:
+                result.vector_score = hit.score
+            else:
+                result.lexical_score = hit.score
+    return sorted(fused.values(), key=lambda result: result.score, reverse=True)
+
+
+# Singleton instance
+_search_service: SearchService | None = None
+
+
+def get_search_service() -> SearchService:
+    """Get or create the search service."""
+    global _search_service
+    if _search_service is None:
+        _search_service = SearchService(
+            get_openai_service(), get_vector_index(), chunk_store_module.get_chunk_store()
+        )
+    return _search_service
@@ -0,0 +1,78 @@
+"""Single-flight coalescing of identical concurrent calls."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.models.ai import SingleFlightStats
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """An in-flight call and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers share its result.
+
+    The shared call runs in its own task, so a waiter that is cancelled (e.g.
+    its client disconnected) does not cancel the call for everyone else. The
+    call is only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()``, or join an identical call already in flight.
+
+        Args:
+            key: Identity of the call; callers with equal keys share one execution
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The result of the shared call (exceptions are re-raised to every waiter)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Joined in-flight call", extra={"key": key, "waiters": call.waiters})
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is left to receive the result. Forget the call first: it
+                # takes a few awaits to unwind, and a caller arriving meanwhile must
+                # start a fresh execution rather than join one being cancelled
+                self._forget(key, call)
+                call.task.cancel()
+
+    def stats(self) -> SingleFlightStats:
+        """Snapshot of the coalescing counters."""
+        return SingleFlightStats(
+            executions=self.executions,
+            coalesced=self.coalesced,
+            in_flight=len(self._calls),
+        )
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,152 @@
+"""Local token counting, so prompts can be sized before they are sent."""
+
+import asyncio
+import functools
+import logging
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.lazy_imports import lazy_import, preload
+
+if TYPE_CHECKING:
+    import tiktoken
+else:
+    try:
+        tiktoken = lazy_import("tiktoken")
+    except ModuleNotFoundError:
+        tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Context windows (tokens) by model name prefix, most specific first
+_CONTEXT_WINDOWS = (
+    ("gpt-4o-mini", 128_000),
+    ("gpt-4o", 128_000),
+    ("gpt-4.1", 1_047_576),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-3.5-turbo", 16_385),
+    ("gpt-4", 8_192),
+)
+_DEFAULT_CONTEXT_WINDOW = 8_192
+# Chat format overhead: each message is wrapped in a few tokens, and the reply is primed
+_TOKENS_PER_MESSAGE = 3
+_TOKENS_PER_REPLY = 3
+_CHARS_PER_TOKEN = 4
+_ESTIMATE = "estimate"  # Encoding name when counting by characters
+
+
+class PromptTooLongError(Exception):
+    """Raised when a prompt leaves too little of the context window for the answer."""
+
+    def __init__(self, prompt_tokens: int, max_prompt_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        super().__init__(f"Prompt is {prompt_tokens} tokens, the limit is {max_prompt_tokens}")
+
+
+class Tokenizer:
+    """
+    Count tokens the way the model will, memoizing repeated texts.
+
+    Uses the model's tiktoken encoding. Without tiktoken, or when its
+    encoding files can't be loaded (they're downloaded on first use), counts
+    fall back to the ~4 characters per token estimate.
+
+    Counts are memoized per (text, encoding), so system prompts and document
+    chunks that are sent again and again are only tokenized once.
+    """
+
+    def __init__(self, cache_size: int):
+        self._encodings: dict[str, tiktoken.Encoding | None] = {}
+        self._count = functools.lru_cache(maxsize=cache_size)(self._count_uncached)
+
+    def count(self, text: str, model: str) -> int:
+        """Tokens in ``text`` for ``model``."""
+        encoding = self._encoding(model)
+        return self._count(text, encoding.name if encoding else _ESTIMATE)
+
+    def count_chat(self, model: str, system_prompt: str, message: str) -> int:
+        """Prompt tokens of a system + user message chat request."""
+        return (
+            self.count(system_prompt, model)
+            + self.count(message, model)
+            + 2 * _TOKENS_PER_MESSAGE
+            + _TOKENS_PER_REPLY
+        )
+
+    def truncate(self, text: str, model: str, max_tokens: int) -> str:
+        """The start of ``text``, cut to at most ``max_tokens`` tokens."""
+        encoding = self._encoding(model)
+        if encoding is None:
+            return text[: max_tokens * _CHARS_PER_TOKEN]
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+    async def prepare(self, model: str) -> None:
+        """
+        Load the model's encoding in a worker thread, if it isn't loaded yet.
+
+        Loading parses several MB of BPE ranks (downloading them the first
+        time), which would stall the event loop. Async code calls this before
+        counting for a model; the counts themselves are then quick.
+        """
+        if model not in self._encodings:
+            encoding = await asyncio.to_thread(_load_encoding, model)
+            self._encodings.setdefault(model, encoding)
+
+    def warm_up(self) -> None:
+        """Import tiktoken and load the configured models' encodings now, before serving."""
+        if tiktoken is not None:
+            preload(tiktoken)
+            for model in (
+                settings.CHAT_MODEL,
+                settings.EMBEDDING_MODEL,
+                settings.FIELD_EXTRACTION_MODEL,
+            ):
+                self._encoding(model)
+
+    def _encoding(self, model: str) -> "tiktoken.Encoding | None":
+        if model not in self._encodings:
+            self._encodings[model] = _load_encoding(model)
+        return self._encodings[model]
+
+    def _count_uncached(self, text: str, encoding_name: str) -> int:
+        if encoding_name == _ESTIMATE:
+            return len(text) // _CHARS_PER_TOKEN
+        return len(tiktoken.get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def _load_encoding(model: str) -> "tiktoken.Encoding | None":
+    """The model's encoding (o200k_base for unknown models), or None to estimate."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        logger.warning(
+            f"Could not load tiktoken encoding for {model}, estimating token counts",
+            extra={"model": model},
+            exc_info=True,
+        )
+        return None
+
+
+def context_window(model: str) -> int:
+    """Context window (prompt + output tokens) of a model, by name prefix."""
+    return next(
+        (tokens for prefix, tokens in _CONTEXT_WINDOWS if model.startswith(prefix)),
+        _DEFAULT_CONTEXT_WINDOW,
+    )
+
+
+# Singleton instance
+_tokenizer: Tokenizer | None = None
+
+
+def get_tokenizer() -> Tokenizer:
+    """Get or create the tokenizer."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer(settings.TOKEN_COUNT_CACHE_SIZE)
+    return _tokenizer
@@ -0,0 +1,101 @@
+"""Per-user accounting of OpenAI chat usage and cost."""
+
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from app.config import settings
+from app.models.ai import UsageReport, UserUsage
+from app.services.metrics import OPENAI_COST
+
+ANONYMOUS_USER = "anonymous"
+
+# User the current request is made for (X-User-ID), set by the request context middleware
+current_user: ContextVar[str] = ContextVar("current_user", default=ANONYMOUS_USER)
+
+# List prices in USD per million tokens (input, cached input, output), by model name prefix,
+# most specific first. Unknown models are counted at zero cost.
+_PRICES = (
+    ("gpt-4o-mini", (0.15, 0.075, 0.60)),
+    ("gpt-4o", (2.50, 1.25, 10.00)),
+    ("gpt-4.1-nano", (0.10, 0.025, 0.40)),
+    ("gpt-4.1-mini", (0.40, 0.10, 1.60)),
+    ("gpt-4.1", (2.00, 0.50, 8.00)),
+    ("gpt-3.5-turbo", (0.50, 0.50, 1.50)),
+)
+_TOKENS_PER_PRICE_UNIT = 1_000_000
+
+
+def cost_usd(
+    model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+) -> float:
+    """Estimated cost of a call at list prices (0 for unknown models)."""
+    prices = next((prices for prefix, prices in _PRICES if model.startswith(prefix)), None)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    cached = min(cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached) * input_price
+        + cached * cached_price
+        + completion_tokens * output_price
+    ) / _TOKENS_PER_PRICE_UNIT
+
+
+class UsageLedger:
+    """
+    Chat tokens and cost per user, in memory.
+
+    Calls are attributed to ``current_user``. Requests coalesced onto
+    another caller's upstream call, or served from the response cache, cost
+    nothing and aren't counted. Only the ``max_users`` most recently active
+    users are kept, and each API process keeps its own ledger; the
+    ``openai_cost_dollars`` metric has the cost by model across processes.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users: OrderedDict[str, UserUsage] = OrderedDict()
+
+    def record(
+        self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+    ) -> float:
+        """
+        Add a completed call to the current user's usage.
+
+        Returns:
+            The call's estimated cost in USD
+        """
+        cost = cost_usd(model, prompt_tokens, completion_tokens, cached_tokens)
+        if cost:
+            OPENAI_COST.labels(model).inc(cost)
+
+        user = current_user.get()
+        usage = self._users.pop(user, None) or UserUsage(user=user)
+        usage.requests += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.cached_prompt_tokens += cached_tokens
+        usage.completion_tokens += completion_tokens
+        usage.cost_usd += cost
+        self._users[user] = usage
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return cost
+
+    def report(self, user: str | None = None) -> UsageReport:
+        """Usage of every tracked user (or just ``user``), most recently active first."""
+        if user is not None:
+            usage = self._users.get(user)
+            return UsageReport(users=[usage] if usage else [])
+        return UsageReport(users=list(reversed(self._users.values())))
+
+
+# Singleton instance
+_usage_ledger: UsageLedger | None = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get or create the usage ledger."""
+    global _usage_ledger
+    if _usage_ledger is None:
+        _usage_ledger = UsageLedger(settings.USAGE_MAX_USERS)
+    return _usage_ledger
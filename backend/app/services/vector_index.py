@@ -0,0 +1,481 @@
+"""In-process vector index over chunk embeddings, stored as a memory-mapped matrix."""
+
+import fcntl
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+METADATA_FILE = "metadata.npz"
+LOCK_FILE = ".lock"
+
+_MIN_CAPACITY = 1024
+# Compact once tombstoned rows outnumber live ones (and there are at least this many)
+_COMPACT_MIN_DEAD_ROWS = 1024
+# Score only the matching rows when a filter keeps less than this fraction of the index
+_GATHER_MAX_FRACTION = 0.25
+
+
+class IndexEntry(NamedTuple):
+    """Metadata of one indexed chunk."""
+
+    chunk_hash: str
+    page: int
+
+
+class SearchFilters(NamedTuple):
+    """Optional restrictions on which chunks a search may return."""
+
+    tags: tuple[str, ...] = ()  # Documents having all of these tags
+    date_from: datetime | None = None  # Indexed at or after
+    date_to: datetime | None = None  # Indexed at or before
+    document_id: str | None = None
+
+
+class SearchHit(NamedTuple):
+    """A search result."""
+
+    chunk_hash: str
+    document_id: str
+    page: int
+    score: float  # Cosine similarity (for locate(), the caller's score)
+
+
+class VectorIndex:
+    """
+    Top-k cosine search over normalized float32 vectors.
+
+    Vectors live in a memory-mapped file, so the OS page cache (not the
+    Python heap) holds them and a restart doesn't reload anything. A query
+    is one matrix-vector product plus ``argpartition``. Each document's
+    chunks are replaced as a unit when a new version is indexed; replaced
+    rows are tombstoned and reclaimed by compaction.
+
+    Filters are boolean masks over rows: one precomputed mask per tag,
+    combined with vectorized date and document comparisons. Selective
+    filters score only the matching rows.
+
+    Methods take a lock, so searches can run in worker threads while
+    ingestion indexes documents on the event loop.
+
+    Several processes (uvicorn workers, index job workers) can share one
+    persisted index: changes hold an exclusive file lock, searches a shared
+    one, and each process reloads the metadata when another one has saved
+    it since, so documents indexed anywhere are searchable everywhere.
+    """
+
+    def __init__(self, directory: Path | None, dimensions: int):
+        """
+        Args:
+            directory: Where to persist the index (None keeps it in memory)
+            dimensions: Embedding dimensions
+        """
+        self.directory = directory
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._size = 0
+        self._vectors: np.ndarray = np.zeros((0, dimensions), dtype=np.float32)
+        self._chunk_hashes = np.zeros(0, dtype="S64")
+        self._pages = np.zeros(0, dtype=np.int32)
+        self._doc_codes = np.zeros(0, dtype=np.int32)
+        self._dates = np.zeros(0, dtype="datetime64[s]")
+        self._alive = np.zeros(0, dtype=bool)
+        self._tag_masks: dict[str, np.ndarray] = {}
+        self._documents: list[str] = []
+        self._document_codes: dict[str, int] = {}
+        self._lock_fd: int | None = None
+        # Identity of the metadata file this process last read or wrote
+        self._metadata_version: tuple[int, int, int] | None = None
+
+    @property
+    def size(self) -> int:
+        """Live (searchable) rows."""
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return int(self._alive[: self._size].sum())
+
+    def load(self) -> None:
+        """Open a persisted index, if there is one with matching dimensions."""
+        if self.directory is None or not (path := self.directory / METADATA_FILE).exists():
+            return
+
+        with self._lock, self._file_lock(exclusive=False):
+            size = self._load_metadata(path)
+        if size is not None:
+            logger.info(
+                "Vector index loaded",
+                extra={"rows": size, "dimensions": self.dimensions, "path": str(self.directory)},
+            )
+
+    def _load_metadata(self, path: Path) -> int | None:
+        """Read the metadata file, returning the number of rows (None if not usable)."""
+        with path.open("rb") as file:
+            self._metadata_version = _version(os.fstat(file.fileno()))
+            metadata = np.load(file)
+            if int(metadata["dimensions"]) != self.dimensions:
+                logger.warning(
+                    "Vector index dimensions changed, starting empty",
+                    extra={"stored": int(metadata["dimensions"]), "expected": self.dimensions},
+                )
+                return None
+
+            size = int(metadata["size"])
+            self._chunk_hashes = metadata["chunk_hashes"]
+            self._pages = metadata["pages"]
+            self._doc_codes = metadata["doc_codes"]
+            self._dates = metadata["dates"]
+            self._alive = metadata["alive"]
+            self._tag_masks = {
+                str(tag): mask
+                for tag, mask in zip(metadata["tag_names"], metadata["tag_masks"], strict=True)
+            }
+            self._documents = [str(document) for document in metadata["documents"]]
+            self._document_codes = {document: i for i, document in enumerate(self._documents)}
+            self._size = size
+            self._grow(max(size, _MIN_CAPACITY))
+        return size
+
+    def _refresh(self) -> None:
+        """Reload the metadata if another process has saved the index since this one did."""
+        if self.directory is None:
+            return
+        path = self.directory / METADATA_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return
+        if _version(stat) != self._metadata_version:
+            self._load_metadata(path)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Lock the index files against other processes (shared for searches)."""
+        if self.directory is None:
+            yield
+            return
+        if self._lock_fd is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_fd = os.open(self.directory / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def replace_document(
+        self,
+        document_id: str,
+        entries: list[IndexEntry],
+        vectors: np.ndarray,
+        tags: tuple[str, ...] = (),
+        indexed_at: datetime | None = None,
+    ) -> None:
+        """
+        Make ``entries`` the document's searchable chunks, replacing earlier ones.
+
+        Args:
+            document_id: Document the chunks belong to
+            entries: Chunk metadata, one per row of ``vectors``
+            vectors: Embeddings, shape (len(entries), dimensions)
+            tags: Tags to filter the document by
+            indexed_at: Date to filter by (defaults to now)
+
+        Raises:
+            ValueError: If entries and vectors don't match up
+        """
+        if vectors.shape != (len(entries), self.dimensions):
+            error_msg = f"Expected vectors of shape ({len(entries)}, {self.dimensions})"
+            raise ValueError(error_msg)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        normalized = vectors / np.where(norms == 0, 1, norms)
+        date = _datetime64(indexed_at or datetime.now(UTC))
+
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self._remove(document_id)
+            start, end = self._size, self._size + len(entries)
+            if end > len(self._alive):
+                self._grow(max(2 * len(self._alive), end, _MIN_CAPACITY))
+
+            code = self._document_codes.setdefault(document_id, len(self._documents))
+            if code == len(self._documents):
+                self._documents.append(document_id)
+
+            self._vectors[start:end] = normalized
+            self._chunk_hashes[start:end] = [entry.chunk_hash for entry in entries]
+            self._pages[start:end] = [entry.page for entry in entries]
+            self._doc_codes[start:end] = code
+            self._dates[start:end] = date
+            self._alive[start:end] = True
+            for tag in tags:
+                if tag not in self._tag_masks:
+                    self._tag_masks[tag] = np.zeros(len(self._alive), dtype=bool)
+                self._tag_masks[tag][start:end] = True
+            self._size = end
+
+            dead = self._size - int(self._alive[: self._size].sum())
+            if dead > max(_COMPACT_MIN_DEAD_ROWS, self._size - dead):
+                self._compact()
+            self._save()
+
+    def remove_document(self, document_id: str) -> None:
+        """Stop returning a document's chunks."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if self._remove(document_id):
+                self._save()
+
+    def search(
+        self, query: np.ndarray, k: int, filters: SearchFilters | None = None
+    ) -> list[SearchHit]:
+        """
+        Find the k chunks most similar to a query embedding.
+
+        Args:
+            query: Query embedding, shape (dimensions,)
+            k: Results to return
+            filters: Restrictions on candidate chunks
+
+        Returns:
+            Hits ordered by descending cosine similarity
+        """
+        query = (query / (np.linalg.norm(query) or 1)).astype(np.float32)
+
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            n = self._size
+            mask = self._mask(filters or SearchFilters(), n)
+            if mask is None:
+                rows = np.arange(n)
+                scores = self._vectors[:n] @ query
+            else:
+                rows = np.flatnonzero(mask)
+                if len(rows) < _GATHER_MAX_FRACTION * n:
+                    scores = self._vectors[rows] @ query
+                else:
+                    # Cheaper to score every row than to copy most of them
+                    scores = (self._vectors[:n] @ query)[rows]
+
+            k = min(k, len(rows))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                SearchHit(
+                    chunk_hash=self._chunk_hashes[row].item().decode(),
+                    document_id=self._documents[self._doc_codes[row]],
+                    page=int(self._pages[row]),
+                    score=float(score),
+                )
+                for row, score in zip(rows[top], scores[top], strict=True)
+            ]
+
+    def locate(
+        self, scores: dict[str, float], filters: SearchFilters | None = None
+    ) -> list[SearchHit]:
+        """
+        Find where chunks ranked by another method are indexed.
+
+        Lets results of e.g. full-text search be resolved to documents and
+        pages, and filtered exactly like vector search results.
+
+        Args:
+            scores: Score of each chunk, by hash
+            filters: Restrictions on returned chunks
+
+        Returns:
+            A hit per indexed occurrence of the chunks, ordered by descending score
+        """
+        if not scores:
+            return []
+        wanted = np.array(list(scores), dtype="S64")
+
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            n = self._size
+            mask = self._mask(filters or SearchFilters(), n)
+            hashes = self._chunk_hashes[:n]
+            # Compare the first 8 bytes as integers, then confirm the full hash
+            candidates = np.flatnonzero(np.isin(_prefixes(hashes), _prefixes(wanted)))
+            rows = candidates[np.isin(hashes[candidates], wanted)]
+            rows = rows[(self._alive if mask is None else mask)[rows]]
+            hits = []
+            for row in rows:
+                chunk_hash = self._chunk_hashes[row].item().decode()
+                hits.append(
+                    SearchHit(
+                        chunk_hash=chunk_hash,
+                        document_id=self._documents[self._doc_codes[row]],
+                        page=int(self._pages[row]),
+                        score=scores[chunk_hash],
+                    )
+                )
+        return sorted(hits, key=lambda hit: hit.score, reverse=True)
+
+    def _mask(self, filters: SearchFilters, n: int) -> np.ndarray | None:
+        """Rows a search may return, or None for every row."""
+        alive = self._alive[:n]
+        if filters == SearchFilters() and alive.all():
+            return None
+
+        mask = alive.copy()
+        for tag in filters.tags:
+            tag_mask = self._tag_masks.get(tag)
+            if tag_mask is None:
+                return np.zeros(n, dtype=bool)
+            mask &= tag_mask[:n]
+        if filters.document_id is not None:
+            code = self._document_codes.get(filters.document_id)
+            if code is None:
+                return np.zeros(n, dtype=bool)
+            mask &= self._doc_codes[:n] == code
+        if filters.date_from is not None:
+            mask &= self._dates[:n] >= _datetime64(filters.date_from)
+        if filters.date_to is not None:
+            mask &= self._dates[:n] <= _datetime64(filters.date_to)
+        return mask
+
+    def _remove(self, document_id: str) -> bool:
+        """Tombstone a document's rows, returning whether any were live."""
+        code = self._document_codes.get(document_id)
+        if code is None:
+            return False
+        rows = np.flatnonzero((self._doc_codes[: self._size] == code) & self._alive[: self._size])
+        self._alive[rows] = False
+        return len(rows) > 0
+
+    def _compact(self) -> None:
+        """Move live rows to the front, in place, dropping tombstoned ones."""
+        keep = np.flatnonzero(self._alive[: self._size])
+        n = len(keep)
+        # Fancy indexing copies before assigning, so overlapping ranges are safe
+        self._vectors[:n] = self._vectors[keep]
+        for column in (self._chunk_hashes, self._pages, self._doc_codes, self._dates):
+            column[:n] = column[keep]
+        self._alive[:n] = True
+        self._alive[n:] = False
+        for tag in list(self._tag_masks):
+            mask = self._tag_masks[tag]
+            mask[:n] = mask[keep]
+            mask[n:] = False
+            if not mask.any():
+                del self._tag_masks[tag]
+        logger.info("Vector index compacted", extra={"rows": n, "dropped_rows": self._size - n})
+        self._size = n
+
+    def _grow(self, capacity: int) -> None:
+        """Resize storage to ``capacity`` rows, keeping the first ``_size`` rows."""
+        n = self._size
+        row_bytes = self.dimensions * np.dtype(np.float32).itemsize
+        if self.directory is not None:
+            # Never shrink the vectors file: other processes may have mapped all of it
+            path = self.directory / VECTORS_FILE
+            file_rows = path.stat().st_size // row_bytes if path.exists() else 0
+            capacity = max(capacity, file_rows)
+        self._chunk_hashes = _resized(self._chunk_hashes, n, capacity)
+        self._pages = _resized(self._pages, n, capacity)
+        self._doc_codes = _resized(self._doc_codes, n, capacity)
+        self._dates = _resized(self._dates, n, capacity)
+        self._alive = _resized(self._alive, n, capacity)
+        self._tag_masks = {
+            tag: _resized(mask, n, capacity) for tag, mask in self._tag_masks.items()
+        }
+
+        shape = (capacity, self.dimensions)
+        if self.directory is None:
+            vectors = np.zeros(shape, dtype=np.float32)
+            vectors[:n] = self._vectors[:n]
+            self._vectors = vectors
+            return
+
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Extending the file keeps its existing rows; new rows read as zeros
+        if capacity > file_rows:
+            with path.open("ab") as file:
+                file.truncate(capacity * row_bytes)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=shape)
+
+    def _save(self) -> None:
+        """Flush vectors and atomically replace the metadata file."""
+        if self.directory is None:
+            return
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+
+        n = self._size
+        tags = list(self._tag_masks)
+        temp_path = self.directory / f".{METADATA_FILE}.tmp"
+        with temp_path.open("wb") as file:
+            np.savez(
+                file,
+                dimensions=self.dimensions,
+                size=n,
+                chunk_hashes=self._chunk_hashes[:n],
+                pages=self._pages[:n],
+                doc_codes=self._doc_codes[:n],
+                dates=self._dates[:n],
+                alive=self._alive[:n],
+                documents=np.array(self._documents, dtype=str),
+                tag_names=np.array(tags, dtype=str),
+                tag_masks=(
+                    np.stack([self._tag_masks[tag][:n] for tag in tags])
+                    if tags
+                    else np.zeros((0, n), dtype=bool)
+                ),
+            )
+        temp_path.replace(self.directory / METADATA_FILE)
+        self._metadata_version = _version((self.directory / METADATA_FILE).stat())
+
+
+def _version(stat: os.stat_result) -> tuple[int, int, int]:
+    """Changes whenever the metadata file is replaced (a new file, usually a new inode)."""
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _resized(array: np.ndarray, keep: int, capacity: int) -> np.ndarray:
+    resized = np.zeros(capacity, dtype=array.dtype)
+    resized[:keep] = array[:keep]
+    return resized
+
+
+def _prefixes(hashes: np.ndarray) -> np.ndarray:
+    """First 8 bytes of each fixed-width hash as an integer (a strided view, no copy)."""
+    return hashes.view(np.uint64).reshape(len(hashes), hashes.itemsize // 8)[:, 0]
+
+
+def _datetime64(value: datetime) -> np.datetime64:
+    """UTC seconds (naive datetimes are taken as UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return np.datetime64(value, "s")
+
+
+# Singleton instance
+_vector_index: VectorIndex | None = None
+
+
+def get_vector_index() -> VectorIndex:
+    """Get or create the vector index, loading it from VECTOR_INDEX_DIR."""
+    global _vector_index
+    if _vector_index is None:
+        _vector_index = VectorIndex(
+            Path(settings.VECTOR_INDEX_DIR) if settings.VECTOR_INDEX_DIR else None,
+            settings.EMBEDDING_DIMENSIONS,
+        )
+        _vector_index.load()
+    return _vector_index
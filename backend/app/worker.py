@@ -0,0 +1,93 @@
+"""
+Ingestion worker processes for INGEST_BACKEND=queue.
+
+Each process claims ingestion jobs from Postgres and extracts, stores and
+embeds documents; the API process indexes them afterwards. Workers need
+the same DATABASE_URL (migrated with `just migrate`) and DOCUMENT_STORAGE_DIR
+as the API. Run as many as the machine (or cluster) has cores for: jobs are
+claimed with SKIP LOCKED, so workers on any host share the queue without
+coordination.
+
+Usage:
+    python -m app.worker [--processes 2]
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+
+from app.config import settings
+from app.db.engine import dispose_engine, init_engine
+from app.logging_config import setup_logging
+from app.services.http_client import close_http_client
+from app.services.ingestion import EXTRACT_QUEUE, get_ingestion_service
+from app.services.job_queue import JobWorker, get_job_queue
+from app.services.openai_service import get_openai_service
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    """Claim and run ingestion jobs until SIGTERM or SIGINT."""
+    init_engine()
+    ingestion_service = get_ingestion_service()
+    # One extraction process per worker: scale with --processes instead
+    ingestion_service.start(workers=1)
+    worker = JobWorker(
+        get_job_queue(),  # type: ignore[arg-type]
+        [EXTRACT_QUEUE],
+        ingestion_service.run_job,
+        settings.JOB_POLL_INTERVAL_SECONDS,
+    )
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, task.cancel)  # type: ignore[union-attr]
+    try:
+        await worker.run()
+    except asyncio.CancelledError:
+        logger.info("Job worker stopping")
+    finally:
+        await ingestion_service.stop()
+        await get_openai_service().close()
+        await close_http_client()
+        await dispose_engine()
+
+
+def _worker_main() -> None:
+    setup_logging(log_level="DEBUG" if settings.DEBUG else "INFO", json_logs=not settings.DEBUG)
+    asyncio.run(run_worker())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ingestion worker processes for INGEST_BACKEND=queue."
+    )
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    if not settings.DATABASE_URL:
+        parser.error("DATABASE_URL must be set")
+    if args.processes <= 1:
+        _worker_main()
+        return
+
+    # Spawned rather than forked: each process builds its own event loop and engine
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_main, name=f"mnemos-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Ctrl-C reaches the whole process group; SIGTERM is passed on to the workers
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes])
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
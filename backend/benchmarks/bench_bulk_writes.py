@@ -0,0 +1,165 @@
+"""
+Benchmark writing a document's chunks and embeddings to Postgres.
+
+Stores the same shape of data (a new document version with ``--chunks``
+chunks, their version links and embedding vectors) three ways, each in one
+transaction with fresh chunk text:
+
+- row-at-a-time: one INSERT per row
+- multi-row INSERT: batches of 5000 rows per statement
+- COPY: ChunkStore.add_version and EmbeddingCache.put_many (binary COPY)
+
+Rows written by the benchmark are deleted afterwards. Requires DATABASE_URL.
+
+Usage:
+    python -m benchmarks.bench_bulk_writes [--chunks 10000] [--dimensions 256]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.db.engine import create_tables, dispose_engine, get_engine
+from app.db.tables import chunks, document_version_chunks, document_versions, documents, embeddings
+from app.services.chunk_store import ChunkStore
+from app.services.chunking import Chunk, chunk_hash
+from app.services.embedding_cache import EmbeddingCache
+
+BATCH_ROWS = 5000
+
+
+def make_chunks(count: int) -> list[Chunk]:
+    run = uuid.uuid4().hex
+    texts = [
+        f"Section {i} of manual {run}: torque the wheel nuts to {i % 200} Nm." for i in range(count)
+    ]
+    return [Chunk(chunk_hash(text), text, i // 4) for i, text in enumerate(texts)]
+
+
+def rows(
+    version_id: str, model: str, version_chunks: list[Chunk], vectors: np.ndarray
+) -> tuple[list[dict], list[dict], list[dict]]:
+    chunk_rows = [{"hash": chunk.hash, "text": chunk.text} for chunk in version_chunks]
+    link_rows = [
+        {"version_id": version_id, "position": i, "chunk_hash": chunk.hash, "page": chunk.page}
+        for i, chunk in enumerate(version_chunks)
+    ]
+    embedding_rows = [
+        {
+            "model": model,
+            "text_hash": chunk.hash,
+            "dimensions": vectors.shape[1],
+            "vector": vector.tobytes(),
+        }
+        for chunk, vector in zip(version_chunks, vectors, strict=True)
+    ]
+    return chunk_rows, link_rows, embedding_rows
+
+
+async def start_version(
+    conn: AsyncConnection, document_id: str, version_id: str, pages: int
+) -> None:
+    await conn.execute(insert(documents).values(id=document_id, filename="bench.pdf"))
+    await conn.execute(
+        insert(document_versions).values(
+            id=version_id, document_id=document_id, sha256=uuid.uuid4().hex, page_count=pages
+        )
+    )
+
+
+async def row_at_a_time(model: str, version_chunks: list[Chunk], vectors: np.ndarray) -> str:
+    document_id, version_id = str(uuid.uuid4()), str(uuid.uuid4())
+    all_rows = rows(version_id, model, version_chunks, vectors)
+    async with get_engine().begin() as conn:
+        await start_version(conn, document_id, version_id, version_chunks[-1].page + 1)
+        for target, table_rows in zip(
+            (chunks, document_version_chunks, embeddings), all_rows, strict=True
+        ):
+            for row in table_rows:
+                await conn.execute(insert(target).values(row))
+    return document_id
+
+
+async def multi_row_insert(model: str, version_chunks: list[Chunk], vectors: np.ndarray) -> str:
+    document_id, version_id = str(uuid.uuid4()), str(uuid.uuid4())
+    all_rows = rows(version_id, model, version_chunks, vectors)
+    async with get_engine().begin() as conn:
+        await start_version(conn, document_id, version_id, version_chunks[-1].page + 1)
+        for target, table_rows in zip(
+            (chunks, document_version_chunks, embeddings), all_rows, strict=True
+        ):
+            for i in range(0, len(table_rows), BATCH_ROWS):
+                await conn.execute(insert(target).values(table_rows[i : i + BATCH_ROWS]))
+    return document_id
+
+
+async def copy(model: str, version_chunks: list[Chunk], vectors: np.ndarray) -> str:
+    document_id = str(uuid.uuid4())
+    await ChunkStore().add_version(
+        document_id, "bench.pdf", uuid.uuid4().hex, version_chunks[-1].page + 1, version_chunks
+    )
+    cache = EmbeddingCache(model, vectors.shape[1], max_memory_entries=0, persistent=True)
+    await cache.put_many(
+        {chunk.hash: vector for chunk, vector in zip(version_chunks, vectors, strict=True)}
+    )
+    return document_id
+
+
+async def cleanup(document_ids: list[str], model: str, hashes: list[str]) -> None:
+    async with get_engine().begin() as conn:
+        await conn.execute(delete(documents).where(documents.c.id.in_(document_ids)))
+        await conn.execute(delete(embeddings).where(embeddings.c.model == model))
+        for i in range(0, len(hashes), BATCH_ROWS):
+            await conn.execute(delete(chunks).where(chunks.c.hash.in_(hashes[i : i + BATCH_ROWS])))
+
+
+async def run(count: int, dimensions: int) -> None:
+    await create_tables()
+    model = f"bench-{uuid.uuid4().hex[:8]}"
+    rng = np.random.default_rng(0)
+    document_ids: list[str] = []
+    hashes: list[str] = []
+    baseline = None
+    try:
+        for name, write in (
+            ("row-at-a-time", row_at_a_time),
+            ("multi-row INSERT", multi_row_insert),
+            ("COPY", copy),
+        ):
+            version_chunks = make_chunks(count)
+            vectors = rng.standard_normal((count, dimensions), dtype=np.float32)
+            hashes.extend(chunk.hash for chunk in version_chunks)
+
+            start = time.perf_counter()
+            document_ids.append(await write(model, version_chunks, vectors))
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            print(
+                f"{name:<18} {elapsed:7.2f}s  {count / elapsed:9.0f} chunks/s  "
+                f"{baseline / elapsed:5.1f}x"
+            )
+    finally:
+        await cleanup(document_ids, model, hashes)
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dimensions", type=int, default=settings.EMBEDDING_DIMENSIONS)
+    args = parser.parse_args()
+
+    if not settings.DATABASE_URL:
+        parser.error("DATABASE_URL must be set")
+    asyncio.run(run(args.chunks, args.dimensions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark embedding micro-batching against one request per text.
+
+Embeds the same texts twice through the local fake OpenAI server: once with
+one upstream request per text (at most ``--concurrency`` in flight), and once
+with every text submitted concurrently through ``OpenAIService.embed``,
+which batches them. Reports upstream requests, wall time and mean per-text
+latency for each.
+
+Usage:
+    python -m benchmarks.bench_embeddings [--texts 2000] [--concurrency 16]
+        [--fake-latency-ms 100]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import uvicorn
+
+from app.config import settings
+from app.services.openai_service import OpenAIService
+from benchmarks.fake_openai import FakeOpenAIConfig, create_app
+
+
+def start_fake_server(latency_ms: float) -> tuple[uvicorn.Server, str]:
+    """Serve the fake OpenAI app in a background thread, returning its base URL."""
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(FakeOpenAIConfig(latency_ms=latency_ms, jitter_ms=0)),
+            host="127.0.0.1",
+            port=0,
+            log_level="warning",
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/v1"
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def unbatched(service: OpenAIService, texts: list[str], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_one(text: str) -> float:
+        start = time.perf_counter()
+        async with semaphore:
+            await service._create_embeddings([text])
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(embed_one(text) for text in texts))
+
+
+async def batched(service: OpenAIService, texts: list[str]) -> list[float]:
+    return await asyncio.gather(*(timed(service.embed([text])) for text in texts))
+
+
+def report(name: str, requests: int, wall: float, latencies: list[float]) -> None:
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    print(
+        f"{name:<12} requests={requests:>6}  wall={wall:6.2f}s  "
+        f"texts/s={len(latencies) / wall:8.0f}  mean latency={mean_ms:8.1f}ms"
+    )
+
+
+async def run(texts: list[str], concurrency: int) -> None:
+    service = OpenAIService()
+
+    start = time.perf_counter()
+    latencies = await unbatched(service, texts, concurrency)
+    report("unbatched", len(texts), time.perf_counter() - start, latencies)
+
+    start = time.perf_counter()
+    latencies = await batched(service, texts)
+    report("batched", service.stats().embeddings.batches, time.perf_counter() - start, latencies)
+    await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Unbatched requests in flight")
+    parser.add_argument("--fake-latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(args.fake_latency_ms)
+    settings.OPENAI_API_KEY = "fake-key"
+    settings.OPENAI_BASE_URL = base_url
+    # Measure batching, not the client-side rate limiter
+    settings.OPENAI_REQUESTS_PER_MINUTE = 10_000_000
+    settings.OPENAI_TOKENS_PER_MINUTE = 10_000_000_000
+
+    texts = [f"Chunk {i}: the warranty for item {i} runs until 2027." for i in range(args.texts)]
+    try:
+        asyncio.run(run(texts, args.concurrency))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
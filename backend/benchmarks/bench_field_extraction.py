@@ -0,0 +1,156 @@
+"""
+Benchmark rule-first key field extraction against asking the LLM for every document.
+
+Generates a synthetic corpus of receipts, invoices and manuals in varied
+layouts (labelled and unlabelled values, US and European formats, manuals
+with and without a warranty), then runs:
+
+- rules: ``extract_with_rules`` alone, reporting docs/s and how many
+  documents and fields need no LLM call
+- llm-always / rules-first: ``FieldExtractor`` end to end against the local
+  fake OpenAI server, with at most ``--concurrency`` documents in flight.
+  The fake server's replies aren't JSON, so only the timings are meaningful.
+
+Usage:
+    python -m benchmarks.bench_field_extraction [--docs 2000] [--concurrency 16]
+        [--fake-latency-ms 300]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from app.config import settings
+from app.services.chunking import Chunk, chunk_pages
+from app.services.field_extraction import FIELD_NAMES, FieldExtractor, extract_with_rules
+from app.services.openai_service import OpenAIService
+from benchmarks.bench_embeddings import start_fake_server
+
+VENDORS = ("ACME Hardware", "Fresh Foods Market", "Best Electronics Ltd", "Contoso Appliances Inc")
+MONTHS = ("January", "March", "June", "September", "December")
+RECEIPT_SHARE = 0.7  # The rest of the corpus is manuals
+ITEMS = ("Hammer", "Milk", "HDMI cable", "Batteries", "Coffee beans", "Light bulbs")
+
+
+def make_receipt(rng: random.Random) -> list[str]:
+    vendor = rng.choice(VENDORS)
+    day, month, year = rng.randint(1, 28), rng.randint(1, 12), rng.choice((2023, 2024, 2025))
+    date = rng.choice(
+        (
+            f"Date: {year}-{month:02}-{day:02}",
+            f"Purchase date {month}/{day}/{year}",
+            f"{day:02}.{month:02}.{year}",
+            f"{rng.choice(MONTHS)} {day}, {year}",
+        )
+    )
+    lines = [
+        f"{item} ${rng.randint(1, 99)}.{rng.randint(0, 99):02}" for item in rng.sample(ITEMS, 3)
+    ]
+    total = f"{rng.randint(10, 2000)}.{rng.randint(0, 99):02}"
+    total_line = rng.choice(
+        (f"Total ${total}", f"Amount due: {total}", f"Grand total EUR {total}", f"Paid {total}")
+    )
+    header = rng.choice((f"{vendor} 12 Main St Receipt", f"Sold by: {vendor} Invoice", "Receipt"))
+    return [f"{header} {date} {' '.join(lines)} Subtotal {total} {total_line} Thank you"]
+
+
+def make_manual(rng: random.Random) -> list[str]:
+    warranty = rng.choice(
+        (
+            f"This product comes with a {rng.choice(('two', '3', 'one'))}-year limited warranty.",
+            f"Warranty period: {rng.choice((6, 12, 24))} months.",
+            "The warranty covers defects in materials for a reasonable period.",
+            "",
+        )
+    )
+    pages = [f"{rng.choice(VENDORS)} Model X-{rng.randint(100, 999)} Owner's Manual"]
+    pages += [f"Section {i}: operating instructions and safety notes." for i in range(6)]
+    pages.append(f"Customer service. {warranty}")
+    return pages
+
+
+def make_corpus(count: int) -> list[list[Chunk]]:
+    rng = random.Random(0)
+    documents = [
+        make_receipt(rng) if rng.random() < RECEIPT_SHARE else make_manual(rng)
+        for _ in range(count)
+    ]
+    return [
+        chunk_pages(pages, 0, settings.CHUNK_TARGET_CHARS, settings.CHUNK_MAX_CHARS)
+        for pages in documents
+    ]
+
+
+def bench_rules(corpus: list[list[Chunk]], extractor: FieldExtractor) -> None:
+    start = time.perf_counter()
+    results = [extract_with_rules(chunks) for chunks in corpus]
+    elapsed = time.perf_counter() - start
+
+    asked = [
+        extractor.needs_llm(chunks, fields) for chunks, fields in zip(corpus, results, strict=True)
+    ]
+    documents_avoided = sum(not fields for fields in asked) / len(corpus)
+    fields_avoided = 1 - sum(map(len, asked)) / (len(corpus) * len(FIELD_NAMES))
+    print(
+        f"{'rules':<12} {len(corpus) / elapsed:9.0f} docs/s  "
+        f"LLM calls avoided: {documents_avoided:6.1%} of documents, {fields_avoided:6.1%} of fields"
+    )
+
+
+async def bench_end_to_end(
+    name: str, corpus: list[list[Chunk]], extractor: FieldExtractor, concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract(chunks: list[Chunk]) -> None:
+        async with semaphore:
+            await extractor.extract(chunks)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(extract(chunks) for chunks in corpus))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {len(corpus) / elapsed:9.0f} docs/s  wall={elapsed:6.2f}s")
+
+
+async def run(count: int, concurrency: int) -> None:
+    corpus = make_corpus(count)
+    service = OpenAIService()
+    rules_first = FieldExtractor(
+        service, settings.FIELD_EXTRACTION_MIN_CONFIDENCE, settings.FIELD_EXTRACTION_LLM_MAX_CHARS
+    )
+    # Above any confidence: every field of every document goes to the LLM
+    llm_always = FieldExtractor(service, 1.1, settings.FIELD_EXTRACTION_LLM_MAX_CHARS)
+
+    bench_rules(corpus, rules_first)
+    await bench_end_to_end("llm-always", corpus, llm_always, concurrency)
+    await bench_end_to_end("rules-first", corpus, rules_first, concurrency)
+    await service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Documents in flight")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(args.fake_latency_ms)
+    settings.OPENAI_API_KEY = "fake-key"
+    settings.OPENAI_BASE_URL = base_url
+    # Every document's prompt is distinct, but don't let the cache flatter either run
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.OPENAI_REQUESTS_PER_MINUTE = 10_000_000
+    settings.OPENAI_TOKENS_PER_MINUTE = 10_000_000_000
+    # Each unparseable fake reply logs a warning
+    logging.disable(logging.WARNING)
+
+    try:
+        asyncio.run(run(args.docs, args.concurrency))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
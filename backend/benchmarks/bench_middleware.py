@@ -0,0 +1,138 @@
+"""
+Benchmark middleware overhead on GET /api/v1/health.
+
+Compares the previous stack of three ``BaseHTTPMiddleware`` classes
+(request ID, logging, security headers) with the fused pure-ASGI
+``RequestContextMiddleware``. Requests are served in-process through
+httpx's ASGI transport, so the numbers measure framework + middleware
+cost only (no sockets).
+
+Usage:
+    python -m benchmarks.bench_middleware [--requests 5000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.request_context import RequestContextMiddleware
+from app.routes import health
+
+logger = logging.getLogger(__name__)
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    """Previous request ID middleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous logging middleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = getattr(request.state, "request_id", "unknown")
+        start_time = time.time()
+        logger.info(
+            f"{request.method} {request.url.path}",
+            extra={
+                "request_id": request_id,
+                "query_params": str(request.query_params),
+            },
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"{request.method} {request.url.path} - {response.status_code}",
+            extra={"request_id": request_id, "process_time": f"{process_time:.3f}s"},
+        )
+        response.headers["X-Process-Time"] = f"{process_time:.3f}"
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Previous security headers middleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        return response
+
+
+def build_legacy_app() -> FastAPI:
+    """App with the previous three BaseHTTPMiddleware layers."""
+    app = FastAPI()
+    app.add_middleware(LegacySecurityHeadersMiddleware)
+    app.add_middleware(LegacyLoggingMiddleware)
+    app.add_middleware(LegacyRequestIDMiddleware)
+    app.include_router(health.router)
+    return app
+
+
+def build_fused_app() -> FastAPI:
+    """App with the fused pure-ASGI middleware."""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+    app.include_router(health.router)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    """Return requests/sec for GET /api/v1/health."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and validation caches
+        for _ in range(50):
+            await client.get("/api/v1/health")
+
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/api/v1/health")
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return requests / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    # Log at INFO like production, but discard output so stderr isn't measured
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    legacy = await measure(build_legacy_app(), args.requests, args.concurrency)
+    fused = await measure(build_fused_app(), args.requests, args.concurrency)
+
+    print(f"GET /api/v1/health  requests={args.requests}  concurrency={args.concurrency}")
+    print(f"  before (3x BaseHTTPMiddleware): {legacy:8.0f} req/s")
+    print(f"  after  (fused ASGI middleware): {fused:8.0f} req/s")
+    print(f"  speedup: {fused / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
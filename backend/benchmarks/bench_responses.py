@@ -0,0 +1,177 @@
+"""
+Benchmark JSON response serialization on the health and chat endpoints.
+
+Compares the default path (models validated in the handler, serialized by
+FastAPI and the standard library's json) with FAST_JSON_RESPONSES (trusted
+models built without validation, rendered by orjson). OpenAI and document
+search are replaced by stubs returning canned answers, and requests are
+passed straight to the ASGI app (no sockets or HTTP client), so the numbers
+measure framework and serialization cost only.
+
+Usage:
+    python -m benchmarks.bench_responses [--requests 5000] [--concurrency 16] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from http import HTTPStatus
+from unittest.mock import patch
+
+from fastapi import FastAPI
+
+from app.config import settings
+from app.models.ai import ChatResponse, Citation
+from app.responses import json_response_class, trusted_model
+from app.routes import ai, health
+from app.services import openai_service, rag
+
+ANSWER = "Your warranty covers parts and labour for two years from purchase. " * 4
+CITATIONS = 12
+
+ENDPOINTS = {
+    "GET /api/v1/health": ("GET", "/api/v1/health", None),
+    "POST /api/v1/ai/chat": ("POST", "/api/v1/ai/chat", {"message": "How long is the warranty?"}),
+    "POST /api/v1/ai/chat (documents)": (
+        "POST",
+        "/api/v1/ai/chat",
+        {"message": "How long is the warranty?", "use_documents": True},
+    ),
+}
+
+
+class StubOpenAIService:
+    """Chat completions answered instantly."""
+
+    is_available = True
+
+    async def chat_completion(self, **_kwargs) -> tuple[str, str, int]:
+        return ANSWER, "gpt-4o-mini", 120
+
+
+class StubRAGService:
+    """Document chat answered instantly, citing a dozen chunks."""
+
+    async def chat(self, *_args, **_kwargs) -> ChatResponse:
+        citations = [
+            trusted_model(
+                Citation,
+                index=index,
+                document_id=f"doc-{index % 3}",
+                page=index,
+                chunk_hash=f"{index:064x}",
+                score=1 / index,
+                cited=index % 2 == 0,
+            )
+            for index in range(1, CITATIONS + 1)
+        ]
+        return trusted_model(
+            ChatResponse,
+            response=ANSWER,
+            model="gpt-4o-mini",
+            tokens_used=900,
+            citations=citations,
+        )
+
+
+def build_app() -> FastAPI:
+    """App with the health and AI routes, the upstream stubbed out."""
+    app = FastAPI(default_response_class=json_response_class())
+    app.include_router(health.router)
+    app.include_router(ai.router)
+    return app
+
+
+async def measure(app: FastAPI, endpoint: str, requests: int, concurrency: int) -> float:
+    """Return requests/sec for one endpoint, calling the ASGI app directly."""
+    method, path, body = ENDPOINTS[endpoint]
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def request() -> None:
+        async def receive() -> dict:
+            return {"type": "http.request", "body": payload, "more_body": False}
+
+        status = 0
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(dict(scope), receive, send)
+        if status != HTTPStatus.OK:
+            error_msg = f"{endpoint} returned {status}"
+            raise RuntimeError(error_msg)
+
+    # Warm up routing and validation caches
+    for _ in range(50):
+        await request()
+
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3, help="Best of this many runs each")
+    args = parser.parse_args()
+
+    # Log at INFO like production, but discard output so stderr isn't measured
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    # Installed as the service singletons: dependency overrides are slower to resolve
+    openai_service._openai_service = StubOpenAIService()
+    rag._rag_service = StubRAGService()
+
+    print(f"requests={args.requests}  concurrency={args.concurrency}")
+    for endpoint in ENDPOINTS:
+        default = fast = 0.0
+        # Alternate the modes so drift (CPU frequency, other processes) affects both alike
+        for _ in range(args.rounds):
+            with patch.object(settings, "FAST_JSON_RESPONSES", False):
+                rate = await measure(build_app(), endpoint, args.requests, args.concurrency)
+                default = max(default, rate)
+            with patch.object(settings, "FAST_JSON_RESPONSES", True):
+                rate = await measure(build_app(), endpoint, args.requests, args.concurrency)
+                fast = max(fast, rate)
+
+        print(endpoint)
+        print(f"  default (validated, json):    {default:8.0f} req/s")
+        print(f"  FAST_JSON_RESPONSES (orjson): {fast:8.0f} req/s")
+        print(f"  speedup: {fast / default:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
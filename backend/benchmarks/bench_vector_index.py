@@ -0,0 +1,99 @@
+"""
+Benchmark top-k search latency of the in-process vector index.
+
+Builds a memory-mapped index of random unit vectors (in a temporary
+directory) spread over documents with tags and dates, then times searches
+with and without filters. Reported latencies cover the index only (the
+query embedding is precomputed).
+
+Usage:
+    python -m benchmarks.bench_vector_index [--chunks 100000] [--dimensions 256]
+        [--queries 200] [--k 10]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.services.vector_index import IndexEntry, SearchFilters, VectorIndex
+
+CHUNKS_PER_DOCUMENT = 100
+TARGET_MS = 10.0
+
+
+def build_index(directory: Path, chunks: int, dimensions: int) -> VectorIndex:
+    rng = np.random.default_rng(0)
+    index = VectorIndex(directory, dimensions)
+    start_date = datetime(2024, 1, 1, tzinfo=UTC)
+    for doc in range(chunks // CHUNKS_PER_DOCUMENT):
+        vectors = rng.standard_normal((CHUNKS_PER_DOCUMENT, dimensions), dtype=np.float32)
+        index.replace_document(
+            f"doc-{doc}",
+            [IndexEntry(f"{doc:032x}{i:032x}", i % 20) for i in range(CHUNKS_PER_DOCUMENT)],
+            vectors,
+            # Roughly one document in ten is a receipt and half are manuals
+            tags=("receipts",) if doc % 10 == 0 else ("manuals",) if doc % 2 else (),
+            indexed_at=start_date + timedelta(hours=doc),
+        )
+    return index
+
+
+def time_searches(
+    index: VectorIndex, queries: np.ndarray, k: int, filters: SearchFilters | None
+) -> list[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k, filters)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=settings.EMBEDDING_DIMENSIONS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        index = build_index(Path(directory), args.chunks, args.dimensions)
+        print(
+            f"Indexed {index.size} chunks x {args.dimensions} dims "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        queries = np.random.default_rng(1).standard_normal(
+            (args.queries, args.dimensions), dtype=np.float32
+        )
+        scenarios = {
+            "unfiltered": None,
+            "tag (10%)": SearchFilters(tags=("receipts",)),
+            "tag (50%)": SearchFilters(tags=("manuals",)),
+            "date range": SearchFilters(
+                date_from=datetime(2024, 1, 15, tzinfo=UTC),
+                date_to=datetime(2024, 1, 31, tzinfo=UTC),
+            ),
+            "document": SearchFilters(document_id="doc-7"),
+        }
+        time_searches(index, queries[:10], args.k, None)  # Warm up the page cache
+
+        print(f"{'scenario':<12} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, filters in scenarios.items():
+            latencies = time_searches(index, queries, args.k, filters)
+            p50 = statistics.median(latencies)
+            p99 = statistics.quantiles(latencies, n=100)[98]
+            verdict = "ok" if p50 < TARGET_MS else f"over {TARGET_MS:g} ms target"
+            print(f"{name:<12} {p50:8.2f} {p99:8.2f}  {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Local stand-in for the OpenAI API, for load tests and offline integration tests.
+
+Implements the subset of endpoints Mnemos uses (chat completions, streaming
+included; embeddings; model listing) with configurable latency and injected
+429s / 500s. Responses are synthetic but shaped like the real API, so the
+official SDK parses them unchanged.
+
+Usage:
+    python -m benchmarks.fake_openai [--port 9000] [--latency-ms 300]
+        [--token-interval-ms 20] [--rate-limit-rate 0.05] [--error-rate 0.01]
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import time
+import uuid
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+FAKE_MODELS = ("gpt-4o-mini", "gpt-4o", "text-embedding-3-small")
+REPLY_TEXT = "This is a synthetic reply from the local fake OpenAI server ."
+
+
+@dataclass
+class FakeOpenAIConfig:
+    """Behaviour of the fake server."""
+
+    latency_ms: float = 300.0  # Time to first byte
+    jitter_ms: float = 50.0  # Uniform +/- jitter added to latency_ms
+    token_interval_ms: float = 20.0  # Delay between streamed tokens
+    reply_tokens: int = 40  # Completion length (capped by max_tokens)
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with 429
+    error_rate: float = 0.0  # Fraction of requests answered with 500
+    retry_after_ms: int = 200  # Sent with injected 429s
+    seed: int | None = None
+
+
+def create_app(config: FakeOpenAIConfig | None = None) -> FastAPI:
+    """Build the fake OpenAI ASGI app."""
+    config = config or FakeOpenAIConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake OpenAI")
+
+    def injected_failure() -> Response | None:
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            return _error_response(
+                429,
+                "Rate limit reached (injected)",
+                "rate_limit_exceeded",
+                headers={
+                    "retry-after-ms": str(config.retry_after_ms),
+                    **_rate_limit_headers(remaining_requests=0),
+                },
+            )
+        if roll < config.rate_limit_rate + config.error_rate:
+            return _error_response(500, "Server error (injected)", "server_error")
+        return None
+
+    async def simulate_latency() -> None:
+        jitter = rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(config.latency_ms + jitter, 0.0) / 1000)
+
+    @app.get("/v1/models")
+    async def list_models() -> dict:
+        return {
+            "object": "list",
+            "data": [
+                {"id": model, "object": "model", "created": 0, "owned_by": "fake"}
+                for model in FAKE_MODELS
+            ],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        await simulate_latency()
+        if failure := injected_failure():
+            return failure
+
+        model = body.get("model", "gpt-4o-mini")
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 4096
+        words = _reply(min(config.reply_tokens, max_tokens))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream_chunks(model, words, usage if include_usage else None, config),
+                media_type="text/event-stream",
+                headers=_rate_limit_headers(),
+            )
+
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+            headers=_rate_limit_headers(),
+        )
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request) -> Response:
+        body = await request.json()
+        await simulate_latency()
+        if failure := injected_failure():
+            return failure
+
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        dimensions = body.get("dimensions") or 1536
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, text in enumerate(inputs):
+            vector = _embedding(str(text), dimensions)
+            encoded = (
+                base64.b64encode(struct.pack(f"<{dimensions}f", *vector)).decode()
+                if as_base64
+                else vector
+            )
+            data.append({"object": "embedding", "index": index, "embedding": encoded})
+
+        tokens = sum(len(str(text)) for text in inputs) // 4
+        return JSONResponse(
+            {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+            headers=_rate_limit_headers(),
+        )
+
+    return app
+
+
+async def _stream_chunks(
+    model: str,
+    words: list[str],
+    usage: dict[str, int] | None,
+    config: FakeOpenAIConfig,
+) -> AsyncGenerator[str, None]:
+    """Chat completion chunks in the SSE format the SDK expects."""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    def chunk(choices: list[dict], chunk_usage: dict[str, int] | None = None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": choices,
+            "usage": chunk_usage,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    for i, word in enumerate(words):
+        if i:
+            await asyncio.sleep(config.token_interval_ms / 1000)
+        content = word if i == 0 else f" {word}"
+        yield chunk([{"index": 0, "delta": {"content": content}, "finish_reason": None}])
+
+    yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if usage is not None:
+        yield chunk([], usage)
+    yield "data: [DONE]\n\n"
+
+
+def _reply(tokens: int) -> list[str]:
+    words = REPLY_TEXT.split()
+    return [words[i % len(words)] for i in range(max(tokens, 1))]
+
+
+def _embedding(text: str, dimensions: int) -> list[float]:
+    """Deterministic unit vector for ``text``."""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def _rate_limit_headers(remaining_requests: int = 9999) -> dict[str, str]:
+    return {
+        "x-ratelimit-limit-requests": "10000",
+        "x-ratelimit-remaining-requests": str(remaining_requests),
+        "x-ratelimit-reset-requests": "6ms",
+        "x-ratelimit-limit-tokens": "10000000",
+        "x-ratelimit-remaining-tokens": "9999000",
+        "x-ratelimit-reset-tokens": "0s",
+    }
+
+
+def _error_response(
+    status_code: int, message: str, code: str, headers: dict[str, str] | None = None
+) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": code, "param": None, "code": code}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--token-interval-ms", type=float, default=20.0)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_interval_ms=args.token_interval_ms,
+        reply_tokens=args.reply_tokens,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Load test API endpoints over HTTP and report throughput and latency percentiles.
+
+Each scenario runs a fixed number of requests at every concurrency level,
+after a short warm-up. Chat requests use seeded random messages and bypass
+the response cache, so runs are reproducible and exercise the upstream path.
+
+Usage:
+    # Against a running server (point it at benchmarks/fake_openai.py for chat)
+    python -m benchmarks.load_test --base-url http://localhost:8000
+
+    # Self-contained: spawn the fake OpenAI server and the API, then test them
+    python -m benchmarks.load_test --spawn [--scenarios health,chat]
+        [--concurrency 1,8,32] [--requests 500] [--fake-latency-ms 300]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+TOPICS = ["warranty", "receipt", "manual", "invoice", "insurance", "lease", "tax", "recipe"]
+
+# A scenario builds (method, path, request kwargs) for one request
+RequestFactory = Callable[[random.Random], tuple[str, str, dict[str, Any]]]
+
+
+def health_request(_rng: random.Random) -> tuple[str, str, dict[str, Any]]:
+    return "GET", "/api/v1/health", {}
+
+
+def chat_request(rng: random.Random) -> tuple[str, str, dict[str, Any]]:
+    message = f"When does my {rng.choice(TOPICS)} #{rng.randrange(1_000_000)} expire?"
+    return (
+        "POST",
+        "/api/v1/ai/chat",
+        {"json": {"message": message}, "headers": {"Cache-Control": "no-cache"}},
+    )
+
+
+def search_request(rng: random.Random) -> tuple[str, str, dict[str, Any]]:
+    return "GET", "/api/v1/search", {"params": {"q": f"{rng.choice(TOPICS)} expiry date"}}
+
+
+SCENARIOS: dict[str, RequestFactory] = {
+    "health": health_request,
+    "chat": chat_request,
+    "search": search_request,
+}
+
+
+@dataclass
+class LevelResult:
+    """Outcome of one scenario at one concurrency level."""
+
+    scenario: str
+    concurrency: int
+    elapsed: float
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[int | str] = field(default_factory=Counter)
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def errors(self) -> int:
+        return sum(n for status, n in self.statuses.items() if status != 200)  # noqa: PLR2004
+
+    def percentile(self, pct: int) -> float:
+        """Latency percentile in milliseconds."""
+        if len(self.latencies) < 2:  # noqa: PLR2004
+            return self.latencies[0] * 1000 if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[pct - 1] * 1000
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    scenario: str,
+    concurrency: int,
+    requests: int,
+    seed: int,
+) -> LevelResult:
+    """Run ``requests`` requests of a scenario with ``concurrency`` workers."""
+    factory = SCENARIOS[scenario]
+    rng = random.Random(f"{seed}-{scenario}-{concurrency}")
+    planned = [factory(rng) for _ in range(requests + concurrency * 2)]
+    warmup, planned = planned[: concurrency * 2], planned[concurrency * 2 :]
+
+    async def send(method: str, path: str, kwargs: dict[str, Any]) -> tuple[float, int | str]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status: int | str = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        return time.perf_counter() - start, status
+
+    await asyncio.gather(*(send(*request) for request in warmup))
+
+    result = LevelResult(scenario=scenario, concurrency=concurrency, elapsed=0.0)
+    queue = iter(planned)
+
+    async def worker() -> None:
+        for request in queue:
+            latency, status = await send(*request)
+            result.latencies.append(latency)
+            result.statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def print_result(result: LevelResult) -> None:
+    statuses = " ".join(f"{status}:{n}" for status, n in sorted(result.statuses.items(), key=str))
+    print(
+        f"{result.scenario:<8} {result.concurrency:>5} {result.throughput:>10.1f}"
+        f" {result.percentile(50):>9.1f} {result.percentile(95):>9.1f}"
+        f" {result.percentile(99):>9.1f} {result.errors:>7}  {statuses}"
+    )
+
+
+@contextmanager
+def spawned_servers(api_port: int, fake_port: int, fake_latency_ms: float):
+    """Run the fake OpenAI server and the API as subprocesses."""
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+    }
+    fake = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_openai",
+            "--port",
+            str(fake_port),
+            "--latency-ms",
+            str(fake_latency_ms),
+            "--seed",
+            "0",
+        ],
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+    api = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(api_port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+        # App logs go to stderr; keep them out of the report
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield
+    finally:
+        for process in (api, fake):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get("/api/v1/health")
+            if response.status_code == 200:  # noqa: PLR2004
+                return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def run(args: argparse.Namespace) -> None:
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        await wait_until_ready(client)
+        print(f"{args.base_url}  requests/level={args.requests}  seed={args.seed}")
+        print(
+            f"{'scenario':<8} {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9}"
+            f" {'p99 ms':>9} {'errors':>7}  statuses"
+        )
+        for scenario in scenarios:
+            for concurrency in levels:
+                result = await run_level(client, scenario, concurrency, args.requests, args.seed)
+                print_result(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenarios", default="health,chat", help=f"from {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=500, help="per concurrency level")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="start fake OpenAI + API locally")
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    for scenario in args.scenarios.split(","):
+        if scenario.strip() and scenario.strip() not in SCENARIOS:
+            parser.error(f"unknown scenario: {scenario}")
+
+    if args.spawn:
+        args.base_url = f"http://127.0.0.1:{args.api_port}"
+        with spawned_servers(args.api_port, args.fake_port, args.fake_latency_ms):
+            asyncio.run(run(args))
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,21 @@ from fastapi.testclient import TestClient
 
 from app.config import settings
 from app.main import app
-from app.services import openai_service
+from app.services import (
+    chunk_store,
+    field_extraction,
+    health_prober,
+    http_client,
+    ingestion,
+    job_queue,
+    openai_service,
+    rag,
+    rate_limiter,
+    search,
+    tokenizer,
+    usage,
+    vector_index,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -18,6 +32,78 @@ def clear_openai_singleton():
     openai_service._openai_service = None
 
 
+@pytest.fixture(autouse=True)
+def clear_tokenizer_and_usage_singletons():
+    """Automatically clear the tokenizer and usage ledger singletons."""
+    tokenizer._tokenizer = None
+    usage._usage_ledger = None
+    yield
+    tokenizer._tokenizer = None
+    usage._usage_ledger = None
+
+
+@pytest.fixture(autouse=True)
+def clear_health_prober_singleton():
+    """Automatically clear the health prober singleton before and after each test."""
+    health_prober._health_prober = None
+    yield
+    health_prober._health_prober = None
+
+
+@pytest.fixture(autouse=True)
+def clear_http_client_singleton():
+    """Automatically clear the shared HTTP client so pool settings apply per test."""
+    http_client._http_client = None
+    yield
+    http_client._http_client = None
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_limiter_singleton():
+    """Automatically clear the rate limiter singleton so budgets don't leak between tests."""
+    rate_limiter._rate_limiter = None
+    yield
+    rate_limiter._rate_limiter = None
+
+
+@pytest.fixture(autouse=True)
+def clear_ingestion_singleton():
+    """Automatically clear the ingestion service singleton before and after each test."""
+    ingestion._ingestion_service = None
+    yield
+    ingestion._ingestion_service = None
+
+
+@pytest.fixture(autouse=True)
+def clear_field_extractor_singleton():
+    """Automatically clear the field extractor singleton before and after each test."""
+    field_extraction._field_extractor = None
+    yield
+    field_extraction._field_extractor = None
+
+
+@pytest.fixture(autouse=True)
+def clear_job_queue_singleton():
+    """Automatically clear the job queue singleton before and after each test."""
+    job_queue._job_queue = None
+    yield
+    job_queue._job_queue = None
+
+
+@pytest.fixture(autouse=True)
+def clear_search_singletons():
+    """Automatically clear the document chat, search, vector index and chunk store singletons."""
+    rag._rag_service = None
+    search._search_service = None
+    vector_index._vector_index = None
+    chunk_store._chunk_store = None
+    yield
+    rag._rag_service = None
+    search._search_service = None
+    vector_index._vector_index = None
+    chunk_store._chunk_store = None
+
+
 @pytest.fixture
 def client():
     """Test client for API testing."""
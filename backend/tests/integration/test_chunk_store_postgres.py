@@ -0,0 +1,135 @@
+"""Integration tests for the Postgres chunk store - uses a real database."""
+
+import os
+import uuid
+
+import pytest
+
+from app.db.engine import create_tables, dispose_engine, get_engine
+from app.models.documents import ExtractedField, FieldSource
+from app.services.chunk_store import ChunkStore
+from app.services.chunking import chunk_pages
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+
+@pytest.fixture
+async def engine():
+    """Database engine with tables created, disposed after each test."""
+    await create_tables()
+    yield get_engine()
+    await dispose_engine()
+
+
+def make_chunks(pages: list[str]):
+    return chunk_pages(pages, first_page=0, target_chars=100, max_chars=200)
+
+
+async def test_new_version_only_adds_changed_chunks(engine):
+    """Test a second version references existing chunks and reports only new ones."""
+    store = ChunkStore()
+    document_id = str(uuid.uuid4())
+    marker = uuid.uuid4().hex
+    pages = [f"Page {i} of manual {marker}" for i in range(10)]
+
+    first = await store.add_version(document_id, "v1.pdf", uuid.uuid4().hex, 10, make_chunks(pages))
+    pages[4] = f"Page 4 of manual {marker}, revised"
+    second = await store.add_version(
+        document_id, "v2.pdf", uuid.uuid4().hex, 10, make_chunks(pages)
+    )
+
+    assert len(first.new_chunk_hashes) == 10
+    assert second.chunks_total == 10
+    assert second.new_chunk_hashes == [make_chunks(pages)[4].hash]
+    assert await store.document_exists(document_id)
+
+
+async def test_reuse_version_for_identical_file(engine):
+    """Test an identical file is recognized without re-extracting it."""
+    store = ChunkStore()
+    sha256 = uuid.uuid4().hex
+    original_id, copy_id = str(uuid.uuid4()), str(uuid.uuid4())
+    version_chunks = make_chunks([f"Receipt {sha256}"])
+
+    assert await store.reuse_version(original_id, "r.pdf", sha256) is None
+    original = await store.add_version(original_id, "r.pdf", sha256, 1, version_chunks)
+
+    same = await store.reuse_version(original_id, "r.pdf", sha256)
+    assert same.version_id == original.version_id
+
+    copy = await store.reuse_version(copy_id, "copy.pdf", sha256)
+    assert copy.version_id != original.version_id
+    assert copy.chunks_total == 1
+    assert copy.new_chunk_hashes == []
+    assert await store.document_exists(copy_id)
+
+
+async def test_version_chunks_and_texts(engine):
+    """Test a version's chunks come back in order, and texts can be looked up by hash."""
+    store = ChunkStore()
+    marker = uuid.uuid4().hex
+    version_chunks = make_chunks([f"First {marker}", f"Second {marker}"])
+    stored = await store.add_version(str(uuid.uuid4()), "a.pdf", marker, 2, version_chunks)
+
+    assert await store.get_version_chunks(stored.version_id) == version_chunks
+    texts = await store.get_texts([version_chunks[1].hash, "unknown"])
+    assert texts == {version_chunks[1].hash: f"Second {marker}"}
+
+
+async def test_search_text_matches_exact_tokens(engine):
+    """Test full-text search finds chunks by exact identifiers, best match first."""
+    store = ChunkStore()
+    order = f"ORD-{uuid.uuid4().hex[:10]}"
+    version_chunks = make_chunks(
+        [f"Receipt for order {order}", f"Order {order} shipped, order {order} delivered"]
+    )
+    await store.add_version(str(uuid.uuid4()), "r.pdf", uuid.uuid4().hex, 2, version_chunks)
+
+    ranks = await store.search_text(order, limit=10)
+
+    assert list(ranks) == [version_chunks[1].hash, version_chunks[0].hash]
+    excluded = await store.search_text(f"{order} -delivered", limit=10)
+    assert list(excluded) == [version_chunks[0].hash]
+
+
+async def test_large_version_is_copied(engine):
+    """Test a version with many chunks, some already stored, is written in one go."""
+    store = ChunkStore()
+    marker = uuid.uuid4().hex
+    known = make_chunks([f"Known {marker} {i}" for i in range(100)])
+    await store.add_version(str(uuid.uuid4()), "a.pdf", uuid.uuid4().hex, 100, known)
+    pages = [f"Known {marker} {i}" for i in range(100)]
+    pages += [f"Section {marker} {i}" for i in range(12_000)]
+    version_chunks = make_chunks(pages)
+
+    stored = await store.add_version(str(uuid.uuid4()), "b.pdf", marker, len(pages), version_chunks)
+
+    assert stored.chunks_total == len(version_chunks)
+    assert set(stored.new_chunk_hashes) == {chunk.hash for chunk in version_chunks[100:]}
+    assert await store.get_version_chunks(stored.version_id) == version_chunks
+
+
+async def test_fields_are_stored_and_copied_with_reused_file(engine):
+    """Test a version's fields can be replaced, and come along when its file is reused."""
+    store = ChunkStore()
+    sha256 = uuid.uuid4().hex
+    stored = await store.add_version(
+        str(uuid.uuid4()), "r.pdf", sha256, 1, make_chunks([f"Receipt {sha256}"])
+    )
+    total = ExtractedField(
+        name="total", value="17.81", source=FieldSource.RULES, confidence=0.95, page=0
+    )
+    vendor = ExtractedField(name="vendor", value="ACME", source=FieldSource.LLM, confidence=0.7)
+
+    await store.save_fields(stored.version_id, [vendor])
+    await store.save_fields(stored.version_id, [total, vendor])
+    copy = await store.reuse_version(str(uuid.uuid4()), "copy.pdf", sha256)
+
+    assert sorted(await store.get_fields(stored.version_id), key=lambda f: f.name) == [
+        total,
+        vendor,
+    ]
+    assert len(await store.get_fields(copy.version_id)) == 2
@@ -0,0 +1,56 @@
+"""Integration tests for the database engine and pool telemetry - uses a real database."""
+
+import os
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.db.engine import dispose_engine, get_session_factory, init_engine, pool_stats
+from app.models.health import ServiceHealthStatusEnum
+from app.services.health_prober import check_database
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+
+@pytest.fixture
+async def engine():
+    """Fresh engine, disposed after each test."""
+    await dispose_engine()
+    yield init_engine()
+    await dispose_engine()
+
+
+def sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+async def test_pool_usage_is_reported(engine):
+    """Test checkouts are timed and the usage gauges follow checkout and return."""
+    checkouts = sample("db_pool_checkout_duration_seconds_count")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert pool_stats(engine).checked_out == 1
+        assert sample("db_pool_connections", {"state": "checked_out"}) == 1
+
+    assert sample("db_pool_checkout_duration_seconds_count") == checkouts + 1
+    assert sample("db_pool_connections", {"state": "checked_out"}) == 0
+    assert sample("db_pool_connections", {"state": "idle"}) == 1
+
+
+async def test_session_factory_uses_engine(engine):
+    """Test sessions from the factory run on the pooled engine."""
+    async with get_session_factory()() as session:
+        assert await session.scalar(text("SELECT 1")) == 1
+
+
+async def test_database_health_check(engine):
+    """Test the health check reports a round trip and pool usage."""
+    result = await check_database()
+
+    assert result.status == ServiceHealthStatusEnum.CONNECTED
+    assert "pooled connections in use" in result.message
@@ -0,0 +1,62 @@
+"""Integration tests for the Postgres embedding cache tier - uses a real database."""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from app.db.engine import create_tables, dispose_engine, get_engine
+from app.services.embedding_cache import EmbeddingCache
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+
+@pytest.fixture
+async def engine():
+    """Database engine with tables created, disposed after each test."""
+    await create_tables()
+    yield get_engine()
+    await dispose_engine()
+
+
+async def test_vectors_survive_across_instances(engine):
+    """Test vectors written by one cache are found by another in one lookup."""
+    hashes = [uuid.uuid4().hex for _ in range(3)]
+    vectors = {
+        h: np.random.default_rng(i).random(8, dtype=np.float32) for i, h in enumerate(hashes)
+    }
+    await EmbeddingCache("test-model", 8, 100, persistent=True).put_many(vectors)
+
+    found = await EmbeddingCache("test-model", 8, 100, persistent=True).get_many(
+        [*hashes, "unknown"]
+    )
+
+    assert set(found) == set(hashes)
+    for h in hashes:
+        assert np.array_equal(found[h], vectors[h])
+
+
+async def test_other_model_or_dimensions_miss(engine):
+    """Test vectors are only reused for the same model and dimensions."""
+    h = uuid.uuid4().hex
+    await EmbeddingCache("test-model", 8, 100, persistent=True).put_many(
+        {h: np.ones(8, dtype=np.float32)}
+    )
+
+    assert await EmbeddingCache("other-model", 8, 100, persistent=True).get_many([h]) == {}
+    assert await EmbeddingCache("test-model", 4, 100, persistent=True).get_many([h]) == {}
+
+
+async def test_cache_follows_engine_recreation(engine):
+    """Test a cache created before dispose_engine() uses the new engine, not the disposed one."""
+    cache = EmbeddingCache("test-model", 8, 0, persistent=True)
+    await dispose_engine()
+
+    await cache.put_many({uuid.uuid4().hex: np.ones(8, dtype=np.float32)})
+
+    assert get_engine() is not engine
+    assert engine.sync_engine.pool.checkedin() == 0
@@ -0,0 +1,113 @@
+"""Integration tests for AI endpoints against the local fake OpenAI server (no API key needed)."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.openai_service import OpenAIService
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_openai import FakeOpenAIConfig, create_app
+
+
+@contextmanager
+def fake_openai_server(config: FakeOpenAIConfig) -> Iterator[str]:
+    """Serve the fake OpenAI app on a free port, yielding its base URL."""
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), host="127.0.0.1", port=0, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            pytest.fail("Fake OpenAI server did not start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+@contextmanager
+def api_client(config: FakeOpenAIConfig) -> Iterator[TestClient]:
+    """API test client whose OpenAI calls go to a fake server."""
+    with (
+        fake_openai_server(config) as base_url,
+        patch.object(settings, "OPENAI_API_KEY", "fake-key"),
+        patch.object(settings, "OPENAI_BASE_URL", base_url),
+        TestClient(app) as client,
+    ):
+        yield client
+
+
+@pytest.mark.integration
+def test_chat_through_fake_openai():
+    """Test the chat endpoint end to end through the SDK and HTTP."""
+    with api_client(FakeOpenAIConfig(latency_ms=5, jitter_ms=0)) as client:
+        response = client.post("/api/v1/ai/chat", json={"message": "Hello"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["response"].startswith("This is a synthetic reply")
+    assert data["tokens_used"] > 0
+    # Rate limit headers from the fake were fed into the limiter
+    assert get_rate_limiter()._budget("gpt-4o-mini").requests.capacity == 10000
+
+
+@pytest.mark.integration
+def test_chat_stream_through_fake_openai():
+    """Test SSE streaming end to end, including the usage summary."""
+    config = FakeOpenAIConfig(latency_ms=5, jitter_ms=0, token_interval_ms=1, reply_tokens=5)
+    with api_client(config) as client:
+        response = client.post("/api/v1/ai/chat/stream", json={"message": "Hello"})
+
+    assert response.status_code == 200
+    assert response.text.count("event: token") == 5
+    assert "event: done" in response.text
+
+
+@pytest.mark.integration
+@patch.object(settings, "OPENAI_MAX_RETRIES", 1)
+@patch.object(settings, "OPENAI_RETRY_BASE_DELAY_SECONDS", 0.01)
+def test_persistent_429s_return_retry_after():
+    """Test upstream 429s are retried, then surfaced as 429 with Retry-After."""
+    config = FakeOpenAIConfig(latency_ms=0, jitter_ms=0, rate_limit_rate=1.0, retry_after_ms=50)
+    with api_client(config) as client:
+        response = client.post("/api/v1/ai/chat", json={"message": "Hello"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.integration
+async def test_embeddings_through_fake_openai():
+    """Test batched embeddings decode to float32 rows in input order."""
+    with (
+        fake_openai_server(FakeOpenAIConfig(latency_ms=5, jitter_ms=0)) as base_url,
+        patch.object(settings, "OPENAI_API_KEY", "fake-key"),
+        patch.object(settings, "OPENAI_BASE_URL", base_url),
+        patch.object(settings, "EMBEDDING_CACHE_ENABLED", False),
+    ):
+        service = OpenAIService()
+        first, second = await asyncio.gather(
+            service.embed(["warranty", "receipt"]), service.embed(["warranty"])
+        )
+        await service.close()
+
+    assert first.shape == (2, settings.EMBEDDING_DIMENSIONS)
+    assert first.dtype == np.float32
+    assert np.array_equal(first[0], second[0])
+    assert not np.array_equal(first[0], first[1])
+    assert service.stats().embeddings.batches == 1
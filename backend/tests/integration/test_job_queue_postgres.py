@@ -0,0 +1,131 @@
+"""Integration tests for the Postgres job queue - uses a real database."""
+
+import asyncio
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.db.engine import create_tables, dispose_engine, get_engine
+from app.db.tables import jobs
+from app.models.jobs import JobStatusEnum
+from app.services.job_queue import JobQueue, LeaseLostError
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+
+@pytest.fixture
+async def engine():
+    """Database engine with tables created, disposed after each test."""
+    await create_tables()
+    yield get_engine()
+    await dispose_engine()
+
+
+@pytest.fixture
+def queue_name():
+    """A queue no other test uses."""
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+def worker(name: str = "worker-a", lease_seconds: float = 60) -> JobQueue:
+    return JobQueue(name, lease_seconds)
+
+
+async def test_concurrent_claims_never_share_a_job(engine, queue_name):
+    """Test workers claiming at the same time each get a different job."""
+    job_ids = {await worker().enqueue("test", queue_name, {"n": n}) for n in range(5)}
+    workers = [worker(f"worker-{i}") for i in range(8)]
+
+    claimed = await asyncio.gather(*(w.claim([queue_name]) for w in workers))
+
+    claimed_ids = [job.id for job in claimed if job is not None]
+    assert sorted(claimed_ids) == sorted(job_ids)
+    assert all(job.attempts == 1 for job in claimed if job is not None)
+
+
+@patch.object(settings, "JOB_MAX_ATTEMPTS", 2)
+async def test_failed_job_retried_with_backoff_then_failed(engine, queue_name):
+    """Test a failed attempt is rescheduled, and the final one fails the job."""
+    job_queue = worker()
+    job_id = await job_queue.enqueue("test", queue_name, {})
+
+    job = await job_queue.claim([queue_name])
+    await job_queue.fail(job, "first", None)
+    status = await job_queue.get(job_id)
+    assert status.status == JobStatusEnum.QUEUED
+    assert status.error == "first"
+    assert status.run_at >= status.updated_at
+
+    # Make the retry due now rather than after the backoff delay
+    async with engine.begin() as conn:
+        await conn.execute(update(jobs).where(jobs.c.id == job_id).values(run_at=jobs.c.created_at))
+    job = await job_queue.claim([queue_name])
+    assert job.attempts == 2
+    assert job.final_attempt
+    await job_queue.fail(job, "second", None)
+
+    status = await job_queue.get(job_id)
+    assert status.status == JobStatusEnum.FAILED
+    assert status.finished_at is not None
+    assert await job_queue.claim([queue_name]) is None
+
+
+async def test_expired_lease_is_reclaimed(engine, queue_name):
+    """Test a job whose worker stopped heartbeating is claimed by another worker."""
+    crashed = worker("crashed", lease_seconds=0)
+    job_id = await crashed.enqueue("test", queue_name, {})
+    job = await crashed.claim([queue_name])
+
+    survivor = worker("survivor")
+    reclaimed = await survivor.claim([queue_name])
+
+    assert reclaimed.id == job_id
+    assert reclaimed.attempts == 2
+    # The original worker can no longer change the job
+    assert not await crashed.heartbeat(job, None)
+    with pytest.raises(LeaseLostError):
+        await crashed.complete(job, None)
+
+
+async def test_handoff_keeps_checkpoint_for_next_stage(engine, queue_name):
+    """Test a handed-off job is claimed from the next queue with its checkpoint."""
+    job_queue = worker()
+    subject_id = str(uuid.uuid4())
+    job_id = await job_queue.enqueue(
+        "test", queue_name, {"path": "x"}, subject_id=subject_id, progress={"step": 0}
+    )
+    job = await job_queue.claim([queue_name])
+
+    await job_queue.save_checkpoint(job, {"version_id": "v-1"}, {"step": 1})
+    await job_queue.handoff(job, f"{queue_name}-next", {"embedded": True}, {"step": 2})
+
+    assert await job_queue.claim([queue_name]) is None
+    next_stage = await worker("worker-b").claim([f"{queue_name}-next"])
+    assert next_stage.id == job_id
+    assert next_stage.checkpoint == {"version_id": "v-1", "embedded": True}
+    assert next_stage.attempts == 1
+    assert next_stage.payload == {"path": "x"}
+
+    latest = await job_queue.latest_for_subject(subject_id)
+    assert latest.progress == {"step": 2}
+    assert latest.status == JobStatusEnum.RUNNING
+
+
+async def test_release_returns_job_without_counting_attempt(engine, queue_name):
+    """Test a released job is due again with its attempt not counted."""
+    job_queue = worker()
+    await job_queue.enqueue("test", queue_name, {})
+    job = await job_queue.claim([queue_name])
+
+    await job_queue.release(job)
+
+    again = await job_queue.claim([queue_name])
+    assert again.id == job.id
+    assert again.attempts == 1
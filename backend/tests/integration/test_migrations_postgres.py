@@ -0,0 +1,51 @@
+"""Integration tests for the Alembic migrations - uses a real database."""
+
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+
+@pytest.fixture
+async def empty_database_url():
+    """URL of a new, empty database on the DATABASE_URL server, dropped after the test."""
+    url = make_url(os.environ["DATABASE_URL"])
+    name = f"mnemos_migrations_{uuid.uuid4().hex[:8]}"
+    engine = create_async_engine(url, isolation_level="AUTOCOMMIT")
+    async with engine.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        yield url.set(database=name).render_as_string(hide_password=False)
+    finally:
+        async with engine.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        await engine.dispose()
+
+
+def alembic(url: str, *args: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "-x", f"url={url}", *args],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_migrations_match_table_definitions(empty_database_url):
+    """Test migrating an empty database yields the tables in app.db.tables, and reverts cleanly."""
+    alembic(empty_database_url, "upgrade", "head")
+    # Fails when app.db.tables has changes no migration covers
+    alembic(empty_database_url, "check")
+    alembic(empty_database_url, "downgrade", "base")
@@ -0,0 +1,53 @@
+"""Integration tests for the Postgres response cache - uses a real database."""
+
+import os
+
+import pytest
+
+from app.db.engine import create_tables, dispose_engine, get_engine
+from app.services.response_cache import CachedCompletion, PostgresResponseCache
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set"),
+]
+
+
+@pytest.fixture
+async def engine():
+    """Database engine with tables created, disposed after each test."""
+    await create_tables()
+    yield get_engine()
+    await dispose_engine()
+
+
+async def test_postgres_cache_round_trip(engine):
+    """Test values survive across cache instances (e.g. restarts)."""
+    key = "integration-test-round-trip"
+    await PostgresResponseCache(ttl_seconds=60, max_entries=100).set(
+        key, CachedCompletion("answer", "gpt-4o-mini", 10)
+    )
+
+    cache = PostgresResponseCache(ttl_seconds=60, max_entries=100)
+    assert await cache.get(key) == CachedCompletion("answer", "gpt-4o-mini", 10)
+    assert cache.stats().hits == 1
+
+
+async def test_postgres_cache_ignores_expired_entries(engine):
+    """Test expired rows are treated as misses."""
+    key = "integration-test-expired"
+    cache = PostgresResponseCache(ttl_seconds=-1, max_entries=100)
+    await cache.set(key, CachedCompletion("stale", "gpt-4o-mini", 10))
+
+    assert await cache.get(key) is None
+
+
+async def test_postgres_cache_follows_engine_recreation(engine):
+    """Test a cache created before dispose_engine() uses the new engine, not the disposed one."""
+    cache = PostgresResponseCache(ttl_seconds=60, max_entries=100)
+    await dispose_engine()
+
+    await cache.set("integration-test-recreated", CachedCompletion("answer", "gpt-4o-mini", 10))
+
+    assert get_engine() is not engine
+    assert engine.sync_engine.pool.checkedin() == 0
@@ -1,12 +1,17 @@
 """Unit tests for AI endpoints - mock OpenAI calls."""
 
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from openai import OpenAIError
 
+from app.config import settings
 from app.main import app
-from app.routes.ai import get_openai_service
+from app.models.ai import ChatResponse, ChatStreamDone, ChatStreamToken, Citation
+from app.routes.ai import get_openai_service, get_rag_service
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
 
 
 @pytest.fixture
@@ -23,7 +28,7 @@ def mock_openai_response():
     return mock_response
 
 
-@patch("app.services.openai_service.AsyncOpenAI")
+@patch("openai.AsyncOpenAI")
 def test_chat_success(mock_openai_class, client, mock_openai_key, mock_openai_response):
     """Test successful chat completion."""
     # Setup mock
@@ -65,7 +70,7 @@ def test_chat_without_api_key(client):
         app.dependency_overrides.clear()
 
 
-@patch("app.services.openai_service.AsyncOpenAI")
+@patch("openai.AsyncOpenAI")
 def test_chat_openai_error(mock_openai_class, client, mock_openai_key):
     """Test handling of OpenAI API errors."""
     # Setup mock to raise OpenAIError
@@ -99,3 +104,234 @@ def test_chat_request_validation(client, mock_openai_key):
     # Missing message field
     response = client.post("/api/v1/ai/chat", json={})
     assert response.status_code == 422
+
+
+@patch("openai.AsyncOpenAI")
+@patch.object(settings, "FAST_JSON_RESPONSES", True)
+def test_chat_fast_json(mock_openai_class, client, mock_openai_key, mock_openai_response):
+    """Test chat responses and validation errors are unchanged with fast JSON responses."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    response = client.post("/api/v1/ai/chat", json={"message": "Hello"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "response": "Hello! I'm here to help with Mnemos.",
+        "model": "gpt-4o-mini",
+        "tokens_used": 42,
+        "citations": [],
+    }
+
+    response = client.post("/api/v1/ai/chat", json={})
+    assert response.status_code == 422
+    assert response.json()["errors"][0]["field"] == "body.message"
+
+
+def test_chat_stream_success(client):
+    """Test chat stream relays tokens and a final summary as SSE."""
+    mock_service = MagicMock()
+    mock_service.is_available = True
+
+    async def fake_stream(**_kwargs):
+        yield ChatStreamToken(content="Hi")
+        yield ChatStreamToken(content=" there")
+        yield ChatStreamDone(
+            model="gpt-4o-mini", tokens_used=7, time_to_first_token_ms=12.5, total_time_ms=40.0
+        )
+
+    mock_service.chat_completion_stream = fake_stream
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+
+    try:
+        response = client.post("/api/v1/ai/chat/stream", json={"message": "Hello"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        messages = [m for m in response.text.split("\n\n") if m]
+        assert messages[0] == 'event: token\ndata: {"content":"Hi"}'
+        assert messages[1] == 'event: token\ndata: {"content":" there"}'
+        assert messages[2].startswith("event: done\n")
+        done = json.loads(messages[2].split("data: ", 1)[1])
+        assert done["tokens_used"] == 7
+        assert done["time_to_first_token_ms"] == 12.5
+    finally:
+        app.dependency_overrides.clear()
+
+
+@patch("openai.AsyncOpenAI")
+def test_chat_stream_openai_error(mock_openai_class, client, mock_openai_key):
+    """Test upstream errors before the first token return 502."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=OpenAIError("API Error"))
+    mock_openai_class.return_value = mock_client
+
+    response = client.post("/api/v1/ai/chat/stream", json={"message": "Hello"})
+
+    assert response.status_code == 502
+
+
+@patch("openai.AsyncOpenAI")
+def test_chat_cache_bypass_header(mock_openai_class, client, mock_openai_key, mock_openai_response):
+    """Test Cache-Control: no-cache skips the response cache."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    client.post("/api/v1/ai/chat", json={"message": "Hello"})
+    client.post("/api/v1/ai/chat", json={"message": "Hello"}, headers={"Cache-Control": "no-cache"})
+    cached = client.post("/api/v1/ai/chat", json={"message": "Hello"})
+
+    assert cached.status_code == 200
+    assert mock_client.chat.completions.create.await_count == 2
+
+    stats = client.get("/api/v1/ai/stats").json()
+    assert stats["cache"]["hits"] == 1
+    assert stats["cache"]["misses"] == 1
+
+
+def test_chat_rate_limited_returns_429(client):
+    """Test rate limit rejections map to 429 with Retry-After."""
+    mock_service = MagicMock()
+    mock_service.is_available = True
+    mock_service.chat_completion = AsyncMock(side_effect=RateLimitExceededError(retry_after=2.3))
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+
+    try:
+        response = client.post("/api/v1/ai/chat", json={"message": "Hello"})
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_chat_with_documents_returns_citations(client):
+    """Test use_documents answers through document chat with filters from the request."""
+    mock_service = MagicMock()
+    mock_service.is_available = True
+    rag_service = MagicMock()
+    rag_service.chat = AsyncMock(
+        return_value=ChatResponse(
+            response="Two years [1].",
+            model="gpt-4o-mini",
+            tokens_used=80,
+            citations=[
+                Citation(
+                    index=1, document_id="doc", page=2, chunk_hash="a" * 64, score=0.03, cited=True
+                )
+            ],
+        )
+    )
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+    app.dependency_overrides[get_rag_service] = lambda: rag_service
+
+    try:
+        response = client.post(
+            "/api/v1/ai/chat",
+            json={"message": "Warranty?", "use_documents": True, "tags": ["appliances"]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["citations"][0]["document_id"] == "doc"
+        message, model, filters = rag_service.chat.call_args.args
+        assert (message, model, filters.tags) == ("Warranty?", "gpt-4o-mini", ("appliances",))
+        mock_service.chat_completion.assert_not_called()
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_chat_prompt_too_long_returns_413(client):
+    """Test prompts rejected before sending map to 413."""
+    mock_service = MagicMock()
+    mock_service.is_available = True
+    mock_service.chat_completion = AsyncMock(side_effect=PromptTooLongError(9000, 7936))
+    app.dependency_overrides[get_openai_service] = lambda: mock_service
+
+    try:
+        response = client.post("/api/v1/ai/chat", json={"message": "Hello", "model": "gpt-4"})
+
+        assert response.status_code == 413
+        assert "7936" in response.json()["detail"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+@patch("openai.AsyncOpenAI")
+def test_usage_attributed_to_user_header(
+    mock_openai_class, client, mock_openai_key, mock_openai_response
+):
+    """Test chat usage is reported under the caller's X-User-ID."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    client.post("/api/v1/ai/chat", json={"message": "Hello"}, headers={"X-User-ID": "alice"})
+    response = client.get("/api/v1/ai/usage", params={"user": "alice"})
+
+    assert response.status_code == 200
+    (usage,) = response.json()["users"]
+    assert usage["user"] == "alice"
+    assert usage["requests"] == 1
+    assert usage["prompt_tokens"] + usage["completion_tokens"] == 42
+
+
+def make_batch_service() -> MagicMock:
+    """Mock service whose 'bad' messages fail with an OpenAI error."""
+    mock_service = MagicMock()
+    mock_service.is_available = True
+
+    async def chat_completion(message, model):
+        if message == "bad":
+            raise OpenAIError("API Error")
+        return f"re: {message}", model, 5
+
+    mock_service.chat_completion = chat_completion
+    return mock_service
+
+
+def test_chat_batch_returns_results_in_order(client):
+    """Test batch returns per-item results and errors in request order."""
+    app.dependency_overrides[get_openai_service] = make_batch_service
+
+    try:
+        response = client.post(
+            "/api/v1/ai/chat/batch",
+            json={"items": [{"message": "one"}, {"message": "bad"}, {"message": "three"}]},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["index"] for r in data["results"]] == [0, 1, 2]
+        assert data["results"][0]["result"]["response"] == "re: one"
+        assert data["results"][1]["error"]["status_code"] == 502
+        assert data["results"][2]["result"]["response"] == "re: three"
+        assert data["succeeded"] == 2
+        assert data["failed"] == 1
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_chat_batch_streams_ndjson(client):
+    """Test Accept: application/x-ndjson streams one line per item."""
+    app.dependency_overrides[get_openai_service] = make_batch_service
+
+    try:
+        response = client.post(
+            "/api/v1/ai/chat/batch",
+            json={"items": [{"message": "one"}, {"message": "bad"}]},
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_chat_batch_rejects_empty_batch(client):
+    """Test an empty batch fails validation."""
+    response = client.post("/api/v1/ai/chat/batch", json={"items": []})
+    assert response.status_code == 422
@@ -0,0 +1,79 @@
+"""Unit tests for batch chat fan-out."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from openai import OpenAIError
+
+from app.models.ai import ChatRequest
+from app.services.chat_batch import run_chat_batch
+
+
+def make_service(chat_completion) -> MagicMock:
+    service = MagicMock()
+    service.chat_completion = chat_completion
+    return service
+
+
+async def test_batch_respects_concurrency_limit():
+    """Test no more than `concurrency` items run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def chat_completion(message, model):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"re: {message}", model, 1
+
+    items = [ChatRequest(message=str(i)) for i in range(10)]
+    results = [r async for r in run_chat_batch(make_service(chat_completion), items, 3)]
+
+    assert len(results) == 10
+    assert peak == 3
+    assert sorted(r.index for r in results) == list(range(10))
+
+
+async def test_batch_item_failure_does_not_fail_batch():
+    """Test a failing item becomes an error result while others succeed."""
+
+    async def chat_completion(message, model):
+        if message == "bad":
+            raise OpenAIError("API Error")
+        return "ok", model, 1
+
+    items = [ChatRequest(message="good"), ChatRequest(message="bad")]
+    results = {r.index: r async for r in run_chat_batch(make_service(chat_completion), items, 2)}
+
+    assert results[0].result is not None
+    assert results[0].error is None
+    assert results[1].result is None
+    assert results[1].error is not None
+    assert results[1].error.status_code == 502
+
+
+async def test_closing_batch_cancels_pending_items():
+    """Test closing the result stream cancels items that haven't finished."""
+    cancelled = 0
+
+    async def chat_completion(message, model):
+        nonlocal cancelled
+        if message == "fast":
+            return "ok", model, 1
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return "late", model, 1
+
+    items = [ChatRequest(message="fast"), ChatRequest(message="slow"), ChatRequest(message="slow")]
+    results = run_chat_batch(make_service(chat_completion), items, 3)
+    first = await anext(results)
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert first.index == 0
+    assert cancelled == 2
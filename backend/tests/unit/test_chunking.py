@@ -0,0 +1,50 @@
+"""Unit tests for document chunking."""
+
+from app.services.chunking import chunk_hash, chunk_page, chunk_pages, normalize_text
+
+
+def test_normalization_makes_cosmetic_differences_hash_the_same():
+    """Test whitespace and Unicode compatibility forms don't change the hash."""
+    assert chunk_hash(normalize_text("Warranty  until\n2027")) == chunk_hash(
+        normalize_text(" Warranty until 2027 ")
+    )
+    assert normalize_text("ﬁle") == "file"
+
+
+def test_paragraphs_packed_up_to_target():
+    """Test short paragraphs are combined and a chunk starts when the target is reached."""
+    text = "First paragraph.\n\nSecond paragraph.\n\n" + "x" * 30
+
+    chunks = chunk_page(text, page=3, target_chars=40, max_chars=100)
+
+    assert [c.text for c in chunks] == ["First paragraph. Second paragraph.", "x" * 30]
+    assert all(c.page == 3 for c in chunks)
+    assert chunks[0].hash == chunk_hash(chunks[0].text)
+
+
+def test_long_paragraph_split_at_sentences():
+    """Test paragraphs over max_chars are split, preferring sentence boundaries."""
+    text = "One sentence here. Another sentence here. " + "word " * 30
+
+    chunks = chunk_page(text, page=0, target_chars=10, max_chars=45)
+
+    assert chunks[0].text == "One sentence here. Another sentence here."
+    assert all(len(c.text) <= 45 for c in chunks)
+    assert " ".join(c.text for c in chunks) == normalize_text(text)
+
+
+def test_chunks_never_cross_pages():
+    """Test each page is chunked on its own, numbered from first_page."""
+    chunks = chunk_pages(["Page a", "", "Page c"], first_page=4, target_chars=100, max_chars=200)
+
+    assert [(c.text, c.page) for c in chunks] == [("Page a", 4), ("Page c", 6)]
+
+
+def test_edit_only_changes_nearby_chunks():
+    """Test editing one paragraph leaves the other chunks' hashes unchanged."""
+    paragraphs = [f"Paragraph {i} " + "text " * 20 for i in range(4)]
+    before = chunk_page("\n\n".join(paragraphs), 0, target_chars=120, max_chars=400)
+    paragraphs[2] = "Paragraph 2 edited " + "text " * 20
+    after = chunk_page("\n\n".join(paragraphs), 0, target_chars=120, max_chars=400)
+
+    assert len({c.hash for c in before} & {c.hash for c in after}) == len(before) - 1
@@ -0,0 +1,36 @@
+"""Unit tests for the database engine factory."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.db.engine import dispose_engine, get_engine, get_session_factory, init_engine, pool_stats
+
+
+@pytest.fixture
+async def fresh_engine():
+    """No engine before or after the test."""
+    await dispose_engine()
+    yield
+    await dispose_engine()
+
+
+@patch.object(settings, "DATABASE_URL", "postgresql+asyncpg://postgres@127.0.0.1:1/none")
+@patch.object(settings, "DATABASE_POOL_SIZE", 3)
+@patch.object(settings, "DATABASE_MAX_OVERFLOW", 2)
+async def test_engine_uses_pool_settings(fresh_engine):
+    """Test the engine is created once, with the configured pool, and no connections yet."""
+    engine = init_engine()
+
+    assert get_engine() is engine
+    assert init_engine() is engine
+    assert pool_stats(engine) == (0, 0, 5)
+    assert get_session_factory().kw["bind"] is engine
+
+
+@patch.object(settings, "DATABASE_URL", None)
+async def test_engine_requires_database_url(fresh_engine):
+    """Test a clear error when no database is configured."""
+    with pytest.raises(ValueError, match="not configured"):
+        get_engine()
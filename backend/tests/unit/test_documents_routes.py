@@ -0,0 +1,79 @@
+"""Unit tests for document endpoints."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.main import app
+from app.services.ingestion import IngestionService, get_ingestion_service
+from tests.pdf_factory import make_pdf
+
+
+@pytest.fixture
+def ingestion_service(tmp_path):
+    """Ingestion service storing under tmp_path, used by the app."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        service = IngestionService(
+            storage_dir=tmp_path, max_upload_bytes=10_000, pages_per_task=4, executor=executor
+        )
+        service.start()
+        app.dependency_overrides[get_ingestion_service] = lambda: service
+        yield service
+        app.dependency_overrides.clear()
+
+
+def test_upload_document(client, ingestion_service):
+    """Test a raw PDF body is accepted and can be looked up."""
+    pdf = make_pdf(["Warranty until 2027"])
+
+    response = client.post(
+        "/api/v1/documents",
+        params={"filename": "warranty.pdf"},
+        content=pdf,
+        headers={"Content-Type": "application/pdf"},
+    )
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["filename"] == "warranty.pdf"
+    assert data["size_bytes"] == len(pdf)
+
+    lookup = client.get(f"/api/v1/documents/{data['id']}")
+    assert lookup.status_code == 200
+    assert lookup.json()["sha256"] == data["sha256"]
+
+
+def test_upload_rejects_non_pdf(client, ingestion_service):
+    """Test non-PDF bodies return 415."""
+    response = client.post(
+        "/api/v1/documents", params={"filename": "notes.txt"}, content=b"plain text"
+    )
+
+    assert response.status_code == 415
+
+
+def test_upload_rejects_declared_oversize(client, ingestion_service):
+    """Test a Content-Length over the limit is rejected before reading the body."""
+    response = client.post(
+        "/api/v1/documents", params={"filename": "big.pdf"}, content=b"%PDF-" + b"0" * 20_000
+    )
+
+    assert response.status_code == 413
+
+
+def test_get_unknown_document(client, ingestion_service):
+    """Test unknown document IDs return 404."""
+    response = client.get("/api/v1/documents/does-not-exist")
+
+    assert response.status_code == 404
+
+
+def test_upload_version_without_database(client, ingestion_service):
+    """Test uploading a new version returns 503 when no database is configured."""
+    response = client.post(
+        "/api/v1/documents",
+        params={"filename": "v2.pdf", "document_id": "doc-1"},
+        content=make_pdf(["v2"]),
+    )
+
+    assert response.status_code == 503
@@ -0,0 +1,97 @@
+"""Unit tests for embedding micro-batching."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher, EmbeddingPriority
+
+
+class FakeEmbedder:
+    """Records batches and embeds each text as [len(text)]."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.batches: list[list[str]] = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, texts: list[str]) -> np.ndarray:
+        self.batches.append(texts)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+
+def make_batcher(embedder, max_batch_size=100, max_wait_seconds=0.01, max_concurrent_batches=4):
+    return EmbeddingBatcher(embedder, max_batch_size, max_wait_seconds, max_concurrent_batches)
+
+
+async def test_concurrent_calls_batched_in_order():
+    """Test callers within the wait window share a batch and get their own rows back."""
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder)
+
+    results = await asyncio.gather(*(batcher.embed(["x" * i, "y" * (i + 10)]) for i in range(5)))
+
+    assert len(embedder.batches) == 1
+    for i, vectors in enumerate(results):
+        assert vectors[:, 0].tolist() == [i, i + 10]
+    await batcher.close()
+
+
+async def test_full_batch_sent_without_waiting():
+    """Test batches are capped at max_batch_size and full ones go out immediately."""
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch_size=4, max_wait_seconds=10)
+
+    vectors = await asyncio.wait_for(batcher.embed(["a"] * 8), timeout=1)
+
+    assert [len(batch) for batch in embedder.batches] == [4, 4]
+    assert vectors.shape == (8, 1)
+    await batcher.close()
+
+
+async def test_queries_batched_ahead_of_bulk():
+    """Test queued query texts jump ahead of bulk texts already waiting."""
+    embedder = FakeEmbedder(delay=0.05)
+    batcher = make_batcher(embedder, max_batch_size=2, max_concurrent_batches=1)
+
+    bulk = asyncio.create_task(batcher.embed(["bulk"] * 6, EmbeddingPriority.BULK))
+    await asyncio.sleep(0.02)  # First bulk batch is now in flight, holding the only slot
+    query = await batcher.embed(["query"], EmbeddingPriority.QUERY)
+    await bulk
+
+    assert query[:, 0].tolist() == [5]
+    assert embedder.batches[1][0] == "query"
+    await batcher.close()
+
+
+async def test_batch_error_raised_to_every_caller():
+    """Test an upstream failure is raised to all callers in the batch."""
+    batcher = make_batcher(FakeEmbedder(error=RuntimeError("upstream down")))
+
+    results = await asyncio.gather(
+        batcher.embed(["a"]), batcher.embed(["b", "c"]), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    await batcher.close()
+
+
+async def test_cancelled_caller_texts_skipped():
+    """Test texts of callers that gave up are not sent upstream."""
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_wait_seconds=0.05)
+
+    abandoned = asyncio.create_task(batcher.embed(["abandoned"]))
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    vectors = await batcher.embed(["kept"])
+
+    assert embedder.batches == [["kept"]]
+    assert vectors[:, 0].tolist() == [4]
+    with pytest.raises(asyncio.CancelledError):
+        await abandoned
+    await batcher.close()
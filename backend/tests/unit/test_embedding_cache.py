@@ -0,0 +1,67 @@
+"""Unit tests for the embedding cache."""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from app.config import settings
+from app.db.engine import dispose_engine
+from app.services.chunking import chunk_hash
+from app.services.embedding_cache import EmbeddingCache, text_hash
+from app.services.metrics import EMBEDDING_CACHE_LOOKUPS
+
+
+def make_cache(max_memory_entries: int = 10) -> EmbeddingCache:
+    return EmbeddingCache("test-model", 4, max_memory_entries, persistent=False)
+
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+
+def lookups(result: str) -> float:
+    return EMBEDDING_CACHE_LOOKUPS.labels("memory", result)._value.get()
+
+
+async def test_get_many_returns_only_cached():
+    """Test batch lookup returns the cached subset and counts hits and misses."""
+    cache = make_cache()
+    await cache.put_many({"a": vector(1), "b": vector(2)})
+    hits_before, misses_before = lookups("hit"), lookups("miss")
+
+    found = await cache.get_many(["a", "c", "b", "a"])
+
+    assert set(found) == {"a", "b"}
+    assert np.array_equal(found["b"], vector(2))
+    assert lookups("hit") - hits_before == 2
+    assert lookups("miss") - misses_before == 1
+
+
+async def test_memory_tier_evicts_least_recently_used():
+    """Test the LRU keeps recently looked-up vectors when full."""
+    cache = make_cache(max_memory_entries=2)
+    await cache.put_many({"a": vector(1), "b": vector(2)})
+    await cache.get_many(["a"])
+
+    await cache.put_many({"c": vector(3)})
+
+    assert set(await cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_text_hash_matches_chunk_hash():
+    """Test chunk hashes can be used directly as cache keys."""
+    assert text_hash("Warranty until 2027") == chunk_hash("Warranty until 2027")
+
+
+@patch.object(settings, "DATABASE_URL", "postgresql+asyncpg://postgres@127.0.0.1:1/none")
+async def test_unreachable_database_falls_back_to_memory():
+    """Test a database outage (OSError from the driver) leaves texts to be embedded uncached."""
+    await dispose_engine()
+    cache = EmbeddingCache("test-model", 4, 10, persistent=True)
+    try:
+        await cache.put_many({"a": vector(1)})
+        found = await cache.get_many(["a", "b"])
+    finally:
+        await dispose_engine()
+
+    assert set(found) == {"a"}
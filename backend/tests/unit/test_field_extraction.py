@@ -0,0 +1,146 @@
+"""Unit tests for rule-first key field extraction."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from openai import APIConnectionError
+
+from app.models.documents import FieldSource
+from app.services.chunking import chunk_pages
+from app.services.field_extraction import FieldExtractor, extract_with_rules
+
+RECEIPT = [
+    "ACME Hardware Store 123 Main St Receipt #4411 Date: 03/25/2024 "
+    "Hammer $12.99 Nails $3.50 Subtotal $16.49 Tax $1.32 Total $17.81 Thank you"
+]
+MANUAL = [
+    "Kitchen Mixer KM-200 Owner's Manual",
+    "Safety instructions. Keep away from water.",
+    "Limited warranty: this product is covered for 18 months from the date of purchase.",
+]
+
+
+def chunks_of(pages: list[str]):
+    return chunk_pages(pages, first_page=0, target_chars=200, max_chars=400)
+
+
+@pytest.fixture
+def openai_service():
+    """AI service answering with a vendor and a warranty period."""
+    return MagicMock(
+        is_available=True,
+        chat_completion=AsyncMock(
+            return_value=(
+                'Sure! {"vendor": {"value": "Contoso Appliances", "confidence": 0.9}, '
+                '"warranty_period": "18 months"}',
+                "gpt-4o-mini",
+                42,
+            )
+        ),
+    )
+
+
+@pytest.fixture
+def extractor(openai_service):
+    return FieldExtractor(openai_service, min_confidence=0.8, llm_max_chars=1000)
+
+
+def test_rules_find_receipt_fields():
+    """Test labelled values are found and normalized, with their page."""
+    fields = extract_with_rules(chunks_of(RECEIPT))
+
+    assert fields["total"].value == "17.81"
+    assert fields["date"].value == "2024-03-25"
+    assert fields["date"].confidence >= 0.8
+    assert fields["vendor"].value == "ACME Hardware Store"
+    assert fields["total"].source == FieldSource.RULES
+    assert fields["total"].page == 0
+    assert "warranty_period" not in fields
+
+
+@pytest.mark.parametrize(
+    ("text", "field", "value"),
+    [
+        ("Grand total: EUR 1.234,50 paid by card", "total", "1234.50"),
+        ("Amount due $2,045.00 Total items 3", "total", "2045.00"),
+        ("Invoice date 14.03.2024", "date", "2024-03-14"),
+        ("Purchased on March 5th, 2023 in store", "date", "2023-03-05"),
+        ("Comes with a two-year limited warranty", "warranty_period", "2 years"),
+        ("Warranty period: 6 months", "warranty_period", "6 months"),
+        ("Sold by: Best Electronics Ltd Invoice 42", "vendor", "Best Electronics Ltd"),
+    ],
+)
+def test_rule_formats(text, field, value):
+    """Test common layouts of each field are recognized."""
+    assert extract_with_rules(chunks_of([text]))[field].value == value
+
+
+def test_ambiguous_date_has_low_confidence():
+    """Test a slashed date that could be day- or month-first isn't trusted outright."""
+    fields = extract_with_rules(chunks_of(["Date: 03/04/2024"]))
+
+    assert fields["date"].value == "2024-03-04"
+    assert fields["date"].confidence < 0.8
+
+
+async def test_confident_rules_skip_llm(extractor, openai_service):
+    """Test a document the rules fully cover never reaches the LLM."""
+    fields = await extractor.extract(chunks_of(RECEIPT))
+
+    openai_service.chat_completion.assert_not_awaited()
+    assert {field.name for field in fields} == {"vendor", "date", "total"}
+
+
+async def test_llm_asked_only_for_uncertain_fields(extractor, openai_service):
+    """Test the LLM fills fields the rules missed or doubted, and nothing without a cue."""
+    fields = {field.name: field for field in await extractor.extract(chunks_of(MANUAL))}
+
+    message = openai_service.chat_completion.await_args.kwargs["message"]
+    assert "- vendor:" in message
+    assert "- warranty_period:" in message
+    # No amounts or dates in the manual, so no point asking for them
+    assert "- total:" not in message
+    assert "- date:" not in message
+    assert fields["vendor"].value == "Contoso Appliances"
+    assert fields["vendor"].source == FieldSource.LLM
+    assert fields["warranty_period"].value == "18 months"
+    assert fields["warranty_period"].confidence == 0.7
+
+
+async def test_llm_failure_keeps_rule_results(extractor, openai_service):
+    """Test an unreachable AI service leaves the rule results in place."""
+    openai_service.chat_completion.side_effect = APIConnectionError(request=MagicMock())
+
+    fields = {field.name: field for field in await extractor.extract(chunks_of(MANUAL))}
+
+    assert fields["vendor"].value == "Kitchen Mixer KM-200"
+    assert fields["vendor"].source == FieldSource.RULES
+
+
+async def test_invalid_llm_values_are_dropped(extractor, openai_service):
+    """Test LLM answers are validated and normalized like rule results."""
+    openai_service.chat_completion.return_value = (
+        '{"date": "last Tuesday", "total": "$1,234.5", "vendor": null}',
+        "gpt-4o-mini",
+        42,
+    )
+
+    fields = {
+        field.name: field
+        for field in await extractor.extract(chunks_of(["sale of 12 items, 1234.50"]))
+    }
+
+    assert "date" not in fields
+    assert fields["total"].value == "1234.50"
+    assert "vendor" not in fields
+
+
+async def test_unavailable_ai_uses_rules_only(openai_service):
+    """Test no LLM call is attempted without an AI service."""
+    openai_service.is_available = False
+    extractor = FieldExtractor(openai_service, min_confidence=0.8, llm_max_chars=1000)
+
+    fields = await extractor.extract(chunks_of(MANUAL))
+
+    openai_service.chat_completion.assert_not_awaited()
+    assert all(field.source == FieldSource.RULES for field in fields)
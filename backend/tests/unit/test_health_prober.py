@@ -0,0 +1,108 @@
+"""Unit tests for the background health prober."""
+
+import asyncio
+from unittest.mock import patch
+
+from app.config import settings
+from app.db.engine import dispose_engine
+from app.models.health import ServiceHealthStatus, ServiceHealthStatusEnum
+from app.services.health_prober import HealthProber, check_database
+
+
+def connected() -> ServiceHealthStatus:
+    return ServiceHealthStatus(status=ServiceHealthStatusEnum.CONNECTED, message="ok")
+
+
+async def test_background_probe_records_results():
+    """Test the background loop runs checks and stores results."""
+    calls = 0
+
+    async def check():
+        nonlocal calls
+        calls += 1
+        return connected()
+
+    prober = HealthProber(interval_seconds=0.01, timeout_seconds=1)
+    prober.register("service", check)
+    await prober.start()
+    await asyncio.sleep(0.05)
+    await prober.stop()
+
+    snapshot = await prober.snapshot()
+    assert calls >= 2
+    assert snapshot["service"].status == ServiceHealthStatusEnum.CONNECTED
+    assert snapshot["service"].checked_at is not None
+
+
+async def test_snapshot_does_not_rerun_checks():
+    """Test reading the snapshot doesn't call the dependency again."""
+    calls = 0
+
+    async def check():
+        nonlocal calls
+        calls += 1
+        return connected()
+
+    prober = HealthProber(interval_seconds=60, timeout_seconds=1)
+    prober.register("service", check)
+    await prober.probe_all()
+    for _ in range(10):
+        await prober.snapshot()
+
+    assert calls == 1
+
+
+async def test_slow_check_times_out():
+    """Test a hanging check is reported as an error."""
+
+    async def hang():
+        await asyncio.sleep(60)
+        return connected()
+
+    prober = HealthProber(interval_seconds=60, timeout_seconds=0.01)
+    prober.register("service", hang)
+
+    snapshot = await prober.snapshot()
+
+    assert snapshot["service"].status == ServiceHealthStatusEnum.ERROR
+    assert "timed out" in snapshot["service"].message
+
+
+async def test_failing_check_is_reported_as_error():
+    """Test an exception in a check doesn't break the other checks."""
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def check():
+        return connected()
+
+    prober = HealthProber(interval_seconds=60, timeout_seconds=1)
+    prober.register("broken", broken)
+    prober.register("service", check)
+
+    snapshot = await prober.snapshot()
+
+    assert snapshot["broken"].status == ServiceHealthStatusEnum.ERROR
+    assert snapshot["service"].status == ServiceHealthStatusEnum.CONNECTED
+
+
+@patch.object(settings, "DATABASE_URL", None)
+async def test_database_check_without_database():
+    """Test the database check reports not configured instead of failing."""
+    result = await check_database()
+
+    assert result.status == ServiceHealthStatusEnum.NOT_CONFIGURED
+
+
+@patch.object(settings, "DATABASE_URL", "postgresql+asyncpg://postgres@127.0.0.1:1/none")
+async def test_database_check_unreachable():
+    """Test an unreachable database is reported as an error."""
+    await dispose_engine()
+    try:
+        result = await check_database()
+    finally:
+        await dispose_engine()
+
+    assert result.status == ServiceHealthStatusEnum.ERROR
+    assert result.message.startswith("Connection failed")
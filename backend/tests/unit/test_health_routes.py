@@ -1,12 +1,18 @@
 """Unit tests for health check endpoints."""
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, patch
 
 from fastapi.testclient import TestClient
 
+from app.config import settings
 from app.main import app
-from app.models.health import OverallHealthStatusEnum, ServiceHealthStatusEnum
-from app.routes.health import get_openai_service
+from app.models.health import (
+    OverallHealthStatusEnum,
+    ServiceHealthStatus,
+    ServiceHealthStatusEnum,
+)
+from app.routes.health import get_health_prober
+from app.services.health_prober import HealthProber
 
 client = TestClient(app)
 
@@ -20,20 +26,58 @@ def test_basic_health_check(client):
     assert data["version"] == "1.0.0"
 
 
+@patch.object(settings, "FAST_JSON_RESPONSES", True)
+def test_basic_health_check_fast_json(client):
+    """Test the health check is unchanged with fast JSON responses."""
+    response = client.get("/api/v1/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy", "version": "1.0.0"}
+
+
+@patch.object(settings, "OPENAI_API_KEY", None)
 def test_full_health_check_without_openai_key(client):
     """Test detailed health check when OpenAI is not configured."""
-    # Override the dependency
-    mock_service = MagicMock()
-    mock_service.is_available = False
-    app.dependency_overrides[get_openai_service] = lambda: mock_service
+    response = client.get("/api/v1/health/full")
+    assert response.status_code == 200
+    data = response.json()
+    assert "services" in data
+    assert "openai" in data["services"]
+    assert data["services"]["openai"]["status"] == ServiceHealthStatusEnum.NOT_CONFIGURED.value
+    assert data["services"]["openai"]["checked_at"] is not None
+
+
+def test_full_health_check_serves_cached_results(client):
+    """Test repeated requests reuse the last probe instead of re-checking."""
+    check = AsyncMock(
+        return_value=ServiceHealthStatus(status=ServiceHealthStatusEnum.CONNECTED, message="ok")
+    )
+    prober = HealthProber(interval_seconds=60, timeout_seconds=1)
+    prober.register("openai", check)
+    app.dependency_overrides[get_health_prober] = lambda: prober
 
     try:
-        response = client.get("/api/v1/health/full")
-        assert response.status_code == 200
-        data = response.json()
-        assert "services" in data
-        assert "openai" in data["services"]
-        assert data["services"]["openai"]["status"] == ServiceHealthStatusEnum.NOT_CONFIGURED.value
+        first = client.get("/api/v1/health/full").json()
+        second = client.get("/api/v1/health/full").json()
     finally:
-        # Clean up
         app.dependency_overrides.clear()
+
+    assert check.await_count == 1
+    assert first["status"] == OverallHealthStatusEnum.HEALTHY.value
+    assert second["services"]["openai"]["age_seconds"] >= 0
+
+
+def test_full_health_check_degraded_on_error(client):
+    """Test a failing dependency marks overall status as degraded."""
+    check = AsyncMock(
+        return_value=ServiceHealthStatus(status=ServiceHealthStatusEnum.ERROR, message="down")
+    )
+    prober = HealthProber(interval_seconds=60, timeout_seconds=1)
+    prober.register("openai", check)
+    app.dependency_overrides[get_health_prober] = lambda: prober
+
+    try:
+        data = client.get("/api/v1/health/full").json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert data["status"] == OverallHealthStatusEnum.DEGRADED.value
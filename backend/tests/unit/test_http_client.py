@@ -0,0 +1,150 @@
+"""Unit tests for the shared HTTP client for upstream AI calls."""
+
+import asyncio
+import logging
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.main import app
+from app.services.http_client import (
+    build_http_client,
+    close_http_client,
+    get_http_client,
+    trace_pool_wait,
+)
+from app.services.openai_service import OpenAIService
+
+
+def connections(kind: str) -> float:
+    return REGISTRY.get_sample_value("openai_http_requests_total", {"connection": kind}) or 0.0
+
+
+def pool_waits() -> float:
+    return REGISTRY.get_sample_value("openai_http_pool_wait_seconds_count") or 0.0
+
+
+@patch.object(settings, "OPENAI_HTTP_MAX_CONNECTIONS", 7)
+@patch.object(settings, "OPENAI_HTTP_MAX_KEEPALIVE_CONNECTIONS", 3)
+@patch.object(settings, "OPENAI_CONNECT_TIMEOUT_SECONDS", 2.0)
+@patch.object(settings, "OPENAI_READ_TIMEOUT_SECONDS", 30.0)
+@patch.object(settings, "OPENAI_POOL_TIMEOUT_SECONDS", 1.5)
+async def test_build_http_client_applies_settings():
+    """Test pool limits and timeouts come from settings."""
+    client = build_http_client()
+    pool = client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert client.timeout == httpx.Timeout(30.0, connect=2.0, pool=1.5)
+    await client.aclose()
+
+
+@patch.object(settings, "OPENAI_HTTP2", True)
+async def test_http2_without_h2_falls_back(caplog):
+    """Test HTTP/2 is skipped with a warning when h2 isn't installed."""
+    with (
+        patch("importlib.util.find_spec", return_value=None),
+        caplog.at_level(logging.WARNING),
+    ):
+        client = build_http_client()
+    assert "h2 package" in caplog.text
+    assert client._transport._pool._http2 is False
+    await client.aclose()
+
+
+async def test_shared_client_closed():
+    """Test one client is shared until closed."""
+    client = get_http_client()
+    assert get_http_client() is client
+
+    await close_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client
+    await close_http_client()
+
+
+async def test_trace_pool_wait_counts_new_and_reused_connections():
+    """Test each request is counted once, as new or reused, with its pool wait."""
+    new, reused, waits = connections("new"), connections("reused"), pool_waits()
+
+    first = httpx.Request("GET", "http://upstream/v1/models")
+    await trace_pool_wait(first)
+    trace = first.extensions["trace"]
+    await trace("connection.connect_tcp.started", {})
+    await trace("http11.send_request_headers.started", {})
+
+    second = httpx.Request("GET", "http://upstream/v1/models")
+    await trace_pool_wait(second)
+    await second.extensions["trace"]("http11.receive_response_headers.started", {})
+    await second.extensions["trace"]("http11.send_request_headers.started", {})
+
+    assert connections("new") == new + 1
+    assert connections("reused") == reused + 1
+    assert pool_waits() == waits + 2
+
+
+async def test_pool_metrics_from_real_connections():
+    """Test keep-alive reuse is measured on actual connections."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Keep-alive: answer every request on the connection until the client closes it
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    new, reused = connections("new"), connections("reused")
+
+    client = build_http_client()
+    try:
+        for _ in range(3):
+            response = await client.get(f"http://127.0.0.1:{port}/")
+            assert response.status_code == 200
+    finally:
+        await client.aclose()
+        server.close()
+
+    assert connections("new") == new + 1
+    assert connections("reused") == reused + 2
+
+
+@patch("openai.AsyncOpenAI")
+@patch.object(settings, "OPENAI_READ_TIMEOUT_SECONDS", 12.0)
+def test_openai_client_uses_shared_http_client(mock_openai_class, mock_openai_key):
+    """Test the OpenAI client sends through the shared pool with its timeouts."""
+    OpenAIService().warm_up()
+
+    kwargs = mock_openai_class.call_args.kwargs
+    assert kwargs["http_client"] is get_http_client()
+    assert kwargs["timeout"].read == 12.0
+
+
+@patch.object(settings, "DATABASE_URL", None)  # Only the HTTP pool is under test
+@patch("openai.AsyncOpenAI")
+def test_lifespan_shutdown_closes_pool_and_next_lifespan_gets_a_new_one(
+    mock_openai_class, mock_openai_key
+):
+    """Test shutdown closes the shared client, and a later startup doesn't reuse it."""
+    mock_openai_class.return_value.models.list = AsyncMock()
+    http_clients = []
+    # Startup creates the OpenAI client, before the health prober first uses it
+    with patch.object(settings, "LAZY_STARTUP", False):
+        for _ in range(2):
+            with TestClient(app) as client:
+                assert client.get("/api/v1/health").status_code == 200
+                http_client = mock_openai_class.call_args.kwargs["http_client"]
+                assert http_client is get_http_client()
+                assert not http_client.is_closed
+                http_clients.append(http_client)
+            assert http_client.is_closed
+
+    assert http_clients[0] is not http_clients[1]
+    assert mock_openai_class.call_count == 2
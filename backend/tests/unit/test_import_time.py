@@ -0,0 +1,98 @@
+"""Unit tests for lazy imports and the cold start import-time budget."""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.lazy_imports import lazy_import
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Opt-in budget for the time to import app.main in a fresh interpreter, e.g. 1.2:
+# wall-clock time depends on the machine, so it's only checked where it's set
+IMPORT_BUDGET_SECONDS = os.environ.get("IMPORT_TIME_BUDGET_SECONDS")
+IMPORT_RUNS = 3
+# Modules that must only be loaded on first use
+DEFERRED_MODULES = (
+    "openai._client",
+    "pypdf._reader",
+    "tiktoken.core",
+    "rich.console",
+    "sqlalchemy.ext.asyncio",
+    "asyncpg.connection",
+)
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess[str]:
+    """Run code in a fresh interpreter with production (JSON) logging."""
+    return subprocess.run(  # noqa: S603
+        [sys.executable, *args, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DEBUG": "false", "LAZY_STARTUP": "true"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_lazy_import_defers_execution():
+    """Test the module only runs on first attribute access."""
+    code = (
+        "import sys\n"
+        "from app.lazy_imports import lazy_import\n"
+        "json = lazy_import('json')\n"
+        "print('json.decoder' in sys.modules)\n"
+        "json.dumps({})\n"
+        "print('json.decoder' in sys.modules)\n"
+    )
+    assert run_python(code).stdout.split() == ["False", "True"]
+
+
+def test_lazy_import_returns_loaded_module():
+    """Test an already imported module is returned as is."""
+    assert lazy_import("json") is sys.modules["json"]
+
+
+def test_lazy_import_missing_module():
+    """Test a missing module fails at import, not on first use."""
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("mnemos_no_such_module")
+
+
+def test_preload_executes_module():
+    """Test preload runs a deferred import."""
+    code = (
+        "import sys\n"
+        "from app.lazy_imports import lazy_import, preload\n"
+        "preload(lazy_import('json'))\n"
+        "print('json.decoder' in sys.modules)\n"
+    )
+    assert run_python(code).stdout.split() == ["True"]
+
+
+def test_app_import_defers_heavy_modules():
+    """Test importing the app doesn't load the OpenAI SDK, pypdf, tiktoken, rich or SQLAlchemy."""
+    code = (
+        "import sys\n"
+        "import app.main\n"
+        f"print(*[name for name in {DEFERRED_MODULES!r} if name in sys.modules])\n"
+    )
+    assert run_python(code).stdout.strip() == ""
+
+
+@pytest.mark.skipif(IMPORT_BUDGET_SECONDS is None, reason="IMPORT_TIME_BUDGET_SECONDS not set")
+def test_app_import_time_within_budget():
+    """Test cold start (python -X importtime) stays within the budget."""
+    budget = float(IMPORT_BUDGET_SECONDS)
+    pattern = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| app\.main$", re.MULTILINE)
+    timings = []
+    for _ in range(IMPORT_RUNS):
+        match = pattern.search(run_python("import app.main", "-X", "importtime").stderr)
+        assert match is not None
+        timings.append(int(match.group(1)) / 1_000_000)
+
+    # Best of a few runs, to ignore noise from other processes
+    assert min(timings) < budget, f"import app.main took {min(timings):.2f}s, budget is {budget}s"
@@ -0,0 +1,253 @@
+"""Unit tests for the document ingestion service."""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from app.models.documents import DocumentStatus, DocumentStatusEnum
+from app.services.chunk_store import StoredVersion
+from app.services.chunking import Chunk
+from app.services.embedding_batcher import EmbeddingPriority
+from app.services.ingestion import (
+    EXTRACT_QUEUE,
+    INDEX_QUEUE,
+    IngestionService,
+    UnsupportedDocumentError,
+    UploadTooLargeError,
+)
+from app.services.job_queue import Job
+from app.services.vector_index import SearchFilters, VectorIndex
+from tests.pdf_factory import make_pdf
+
+
+async def as_chunks(data: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    """Yield data in small chunks, like a request body stream."""
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.fixture
+def ingestion_service(tmp_path):
+    """Ingestion service storing under tmp_path, extracting in threads."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        service = IngestionService(
+            storage_dir=tmp_path, max_upload_bytes=1024 * 1024, pages_per_task=2, executor=executor
+        )
+        service.start()
+        yield service
+
+
+async def wait_until_done(service: IngestionService, document_id: str):
+    for _ in range(200):
+        document = service.get(document_id)
+        if document.completed_at is not None:
+            return document
+        await asyncio.sleep(0.01)
+    pytest.fail("Ingestion did not finish")
+
+
+async def test_upload_stores_file_by_hash(ingestion_service, tmp_path):
+    """Test the upload is written under its SHA-256 with no temp files left."""
+    pdf = make_pdf(["Receipt"])
+
+    document = await ingestion_service.upload(as_chunks(pdf), "receipt.pdf")
+
+    assert document.size_bytes == len(pdf)
+    assert (tmp_path / f"{document.sha256}.pdf").read_bytes() == pdf
+    assert [p.name for p in tmp_path.iterdir()] == [f"{document.sha256}.pdf"]
+
+
+async def test_pages_extracted_in_ranges_with_progress(ingestion_service):
+    """Test every page range is extracted and progress reaches the page count."""
+    pdf = make_pdf([f"Page {i}" for i in range(5)])
+
+    document = await ingestion_service.upload(as_chunks(pdf), "manual.pdf")
+    document = await wait_until_done(ingestion_service, document.id)
+
+    assert document.status == DocumentStatusEnum.COMPLETED
+    assert document.pages_total == 5
+    assert document.pages_processed == 5
+    assert document.chunks_total == 5
+    assert document.version_id is None
+
+
+async def test_new_version_requires_database(ingestion_service):
+    """Test uploading a version of an existing document needs a chunk store."""
+    with pytest.raises(ValueError, match="Database not configured"):
+        await ingestion_service.upload(as_chunks(make_pdf(["v2"])), "v2.pdf", document_id="doc-1")
+
+
+async def test_non_pdf_rejected(ingestion_service, tmp_path):
+    """Test non-PDF uploads are rejected and nothing is kept on disk."""
+    with pytest.raises(UnsupportedDocumentError):
+        await ingestion_service.upload(as_chunks(b"hello, not a pdf"), "notes.txt")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_oversized_upload_rejected(ingestion_service, tmp_path):
+    """Test uploads over the limit are aborted mid-stream."""
+    ingestion_service.max_upload_bytes = 100
+
+    with pytest.raises(UploadTooLargeError):
+        await ingestion_service.upload(as_chunks(make_pdf(["x" * 200])), "big.pdf")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_corrupt_pdf_marks_document_failed(ingestion_service):
+    """Test extraction errors are reported on the document."""
+    document = await ingestion_service.upload(as_chunks(b"%PDF-1.4 garbage"), "broken.pdf")
+    document = await wait_until_done(ingestion_service, document.id)
+
+    assert document.status == DocumentStatusEnum.FAILED
+    assert document.error
+
+
+async def test_key_fields_extracted(ingestion_service):
+    """Test key fields found in the text are reported on the document."""
+    pdf = make_pdf(["ACME Hardware Receipt Date: 2024-03-25 Total $17.81"])
+
+    document = await ingestion_service.upload(as_chunks(pdf), "receipt.pdf")
+    document = await wait_until_done(ingestion_service, document.id)
+
+    fields = {field.name: field.value for field in document.fields}
+    assert fields == {"vendor": "ACME Hardware", "date": "2024-03-25", "total": "17.81"}
+
+
+async def test_distinct_chunks_embedded_and_indexed(ingestion_service):
+    """Test each distinct chunk text is embedded once, as bulk work, and indexed."""
+    openai_service = MagicMock(
+        is_available=True,
+        embed=AsyncMock(side_effect=lambda texts, _: np.eye(len(texts), 4, dtype=np.float32)),
+    )
+    ingestion_service._openai_service = openai_service
+    ingestion_service._vector_index = VectorIndex(None, dimensions=4)
+    pdf = make_pdf(["Same clause", "Same clause", "Other clause"])
+
+    document = await ingestion_service.upload(as_chunks(pdf), "manual.pdf", tags=["manuals"])
+    document = await wait_until_done(ingestion_service, document.id)
+
+    assert document.status == DocumentStatusEnum.COMPLETED
+    assert document.chunks_total == 3
+    assert document.chunks_embedded == 2
+    openai_service.embed.assert_awaited_once_with(
+        ["Same clause", "Other clause"], EmbeddingPriority.BULK
+    )
+    hits = ingestion_service._vector_index.search(
+        np.array([0, 1, 0, 0], dtype=np.float32), k=1, filters=SearchFilters(tags=("manuals",))
+    )
+    assert [(hit.document_id, hit.page) for hit in hits] == [(document.id, 2)]
+
+
+@pytest.fixture
+def jobs():
+    """Job queue recording the handler's state changes."""
+
+    @contextlib.asynccontextmanager
+    async def keep_alive(job, progress):
+        yield
+
+    return MagicMock(
+        keep_alive=keep_alive,
+        save_checkpoint=AsyncMock(),
+        handoff=AsyncMock(),
+        complete=AsyncMock(),
+        fail=AsyncMock(),
+    )
+
+
+def make_job(queue: str, path: str, checkpoint: dict | None = None, attempts: int = 1) -> Job:
+    status = DocumentStatus(
+        id="doc-1",
+        filename="manual.pdf",
+        sha256="0" * 64,
+        size_bytes=1,
+        status=DocumentStatusEnum.QUEUED,
+        created_at=datetime.now(UTC),
+    )
+    return Job(
+        "job-1",
+        "ingest_document",
+        queue,
+        "doc-1",
+        {"path": path},
+        checkpoint or {},
+        status.model_dump(mode="json"),
+        attempts,
+        3,
+    )
+
+
+@pytest.fixture
+def queued_service(ingestion_service):
+    """Ingestion service with a mocked chunk store and AI service."""
+    version_chunks = [Chunk("a" * 64, "Clause", 0)]
+    ingestion_service._chunk_store = MagicMock(
+        reuse_version=AsyncMock(return_value=None),
+        add_version=AsyncMock(return_value=StoredVersion("v-1", 1, 1, ["a" * 64])),
+        get_version_chunks=AsyncMock(return_value=version_chunks),
+        save_fields=AsyncMock(),
+    )
+    ingestion_service._openai_service = MagicMock(
+        is_available=True,
+        embed=AsyncMock(side_effect=lambda texts, _: np.eye(len(texts), 4, dtype=np.float32)),
+    )
+    ingestion_service._vector_index = VectorIndex(None, dimensions=4)
+    return ingestion_service
+
+
+async def test_queued_job_checkpoints_then_hands_off_for_indexing(queued_service, jobs, tmp_path):
+    """Test the extract stage checkpoints the stored version and queues the index stage."""
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(make_pdf(["Clause"]))
+    job = make_job(EXTRACT_QUEUE, str(path))
+
+    await queued_service.run_job(job, jobs)
+
+    jobs.save_checkpoint.assert_awaited_once()
+    assert jobs.save_checkpoint.await_args.args[1] == {"version_id": "v-1"}
+    queue, _, progress = jobs.handoff.await_args.args[1:]
+    assert queue == INDEX_QUEUE
+    assert progress["status"] == DocumentStatusEnum.INDEXING
+    assert progress["chunks_embedded"] == 1
+
+
+async def test_index_stage_indexes_and_completes(queued_service, jobs):
+    """Test the index stage loads the checkpointed version and adds it to the index."""
+    job = make_job(INDEX_QUEUE, "unused.pdf", checkpoint={"version_id": "v-1"})
+
+    await queued_service.run_job(job, jobs)
+
+    queued_service._chunk_store.get_version_chunks.assert_awaited_once_with("v-1")
+    assert queued_service._vector_index.size == 1
+    assert jobs.complete.await_args.args[1]["status"] == DocumentStatusEnum.COMPLETED
+
+
+async def test_retry_skips_extraction_after_checkpoint(queued_service, jobs):
+    """Test a retried job reloads its stored chunks instead of extracting the file again."""
+    job = make_job(EXTRACT_QUEUE, "missing.pdf", checkpoint={"version_id": "v-1"}, attempts=2)
+
+    await queued_service.run_job(job, jobs)
+
+    queued_service._chunk_store.add_version.assert_not_awaited()
+    jobs.handoff.assert_awaited_once()
+
+
+async def test_failed_attempt_is_retried(queued_service, jobs):
+    """Test a failing stage records the error and leaves the document queued for a retry."""
+    job = make_job(EXTRACT_QUEUE, "missing.pdf")
+
+    await queued_service.run_job(job, jobs)
+
+    error, progress = jobs.fail.await_args.args[1:]
+    assert error == "Text extraction failed: FileNotFoundError"
+    assert progress["status"] == DocumentStatusEnum.EXTRACTING
+    assert progress["completed_at"] is None
+    jobs.handoff.assert_not_awaited()
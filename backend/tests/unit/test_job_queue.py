@@ -0,0 +1,81 @@
+"""Unit tests for the job worker loop and retry backoff."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import settings
+from app.services.job_queue import Job, JobWorker, LeaseLostError, _retry_delay
+
+
+def make_job(attempts: int = 1, max_attempts: int = 3) -> Job:
+    return Job("job-1", "test", "q", None, {}, {}, None, attempts, max_attempts)
+
+
+@pytest.fixture
+def job_queue():
+    return MagicMock(worker_id="host:1", fail=AsyncMock(), release=AsyncMock())
+
+
+@patch.object(settings, "JOB_RETRY_BASE_DELAY_SECONDS", 5.0)
+@patch.object(settings, "JOB_RETRY_MAX_DELAY_SECONDS", 60.0)
+def test_retry_delay_doubles_up_to_cap():
+    """Test the backoff ceiling doubles per attempt and is capped."""
+    with patch("app.services.job_queue.random.uniform", side_effect=lambda _, high: high):
+        assert [_retry_delay(attempt) for attempt in range(1, 6)] == [5, 10, 20, 40, 60]
+
+
+def test_final_attempt():
+    """Test a job is on its final attempt once attempts reach the maximum."""
+    assert not make_job(attempts=2).final_attempt
+    assert make_job(attempts=3).final_attempt
+
+
+async def test_handler_exception_recorded_as_failed_attempt(job_queue):
+    """Test an exception escaping the handler fails the attempt rather than the worker."""
+    handler = AsyncMock(side_effect=RuntimeError("boom"))
+    job = make_job()
+
+    await JobWorker(job_queue, ["q"], handler, 0.01)._run(job)
+
+    handler.assert_awaited_once_with(job, job_queue)
+    job_queue.fail.assert_awaited_once_with(job, "RuntimeError: boom", None)
+
+
+async def test_lost_lease_abandons_job(job_queue):
+    """Test a job whose lease was lost isn't failed by this worker."""
+    handler = AsyncMock(side_effect=LeaseLostError("lost"))
+
+    await JobWorker(job_queue, ["q"], handler, 0.01)._run(make_job())
+
+    job_queue.fail.assert_not_awaited()
+
+
+async def test_attempts_exhausted_by_expired_leases(job_queue):
+    """Test a job reclaimed after its last attempt's lease expired is failed, not run."""
+    handler = AsyncMock()
+    job = make_job(attempts=4, max_attempts=3)
+
+    await JobWorker(job_queue, ["q"], handler, 0.01)._run(job)
+
+    handler.assert_not_awaited()
+    job_queue.fail.assert_awaited_once()
+
+
+async def test_stop_releases_current_job(job_queue):
+    """Test stopping the worker puts its in-progress job back on the queue."""
+    started = asyncio.Event()
+    job = make_job()
+
+    async def handler(job, job_queue):
+        started.set()
+        await asyncio.sleep(10)
+
+    job_queue.claim = AsyncMock(side_effect=[job, None])
+    worker = JobWorker(job_queue, ["q"], handler, 0.01)
+    worker.start()
+    await asyncio.wait_for(started.wait(), 1)
+    await worker.stop()
+
+    job_queue.release.assert_awaited_once_with(job)
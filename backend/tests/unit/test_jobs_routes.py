@@ -0,0 +1,62 @@
+"""Unit tests for the jobs endpoint."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.main import app
+from app.models.jobs import JobStatus, JobStatusEnum
+from app.routes.jobs import get_job_queue
+
+
+@pytest.fixture
+def job_queue():
+    """Job queue returning one known job, used by the app."""
+    now = datetime.now(UTC)
+    job = JobStatus(
+        id="job-1",
+        kind="ingest_document",
+        queue="ingest",
+        subject_id="doc-1",
+        status=JobStatusEnum.QUEUED,
+        attempts=1,
+        max_attempts=5,
+        error="Text extraction failed: OSError",
+        run_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    queue = MagicMock(get=AsyncMock(side_effect=lambda job_id: job if job_id == "job-1" else None))
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    yield queue
+    app.dependency_overrides.clear()
+
+
+def test_get_job(client, job_queue):
+    """Test a job's status, attempts and last error are returned."""
+    response = client.get("/api/v1/jobs/job-1")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "queued"
+    assert data["attempts"] == 1
+    assert data["error"] == "Text extraction failed: OSError"
+
+
+def test_unknown_job_returns_404(client, job_queue):
+    """Test an unknown job ID returns 404."""
+    response = client.get("/api/v1/jobs/missing")
+
+    assert response.status_code == 404
+
+
+def test_jobs_require_database(client):
+    """Test the endpoint returns 503 without a job queue."""
+    app.dependency_overrides[get_job_queue] = lambda: None
+    try:
+        response = client.get("/api/v1/jobs/job-1")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
@@ -0,0 +1,76 @@
+"""Unit tests for logging configuration."""
+
+import json
+import logging
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.logging_config import JsonFormatter, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def restore_logging(capsys):
+    """Restore the application's logging setup after the test."""
+    yield
+    # The handler keeps the stream it's created with: not capsys's, which is closed next
+    with capsys.disabled():
+        setup_logging(log_level="DEBUG" if settings.DEBUG else "INFO", json_logs=not settings.DEBUG)
+
+
+def make_record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "GET %s", ("/x",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test JSON lines carry the message and `extra` fields."""
+    line = JsonFormatter().format(make_record(request_id="abc", status_code=200))
+    payload = json.loads(line)
+
+    assert payload["message"] == "GET /x"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.test"
+    assert payload["request_id"] == "abc"
+    assert payload["status_code"] == 200
+    assert "args" not in payload
+    assert "\n" not in line
+
+
+def test_json_formatter_includes_exception():
+    """Test exceptions are rendered into the JSON payload."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "app.test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+        )
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert "ValueError: boom" in payload["exc_info"]
+
+
+def test_json_logs_are_written_by_background_thread(capsys, restore_logging):
+    """Test JSON mode writes records from the queue listener."""
+    setup_logging(log_level="INFO", json_logs=True)
+
+    logging.getLogger("app.test").info("hello %s", "world", extra={"request_id": "r1"})
+    shutdown_logging()  # Flush the queue
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    record = next(line for line in lines if line["logger"] == "app.test")
+    assert record["message"] == "hello world"
+    assert record["request_id"] == "r1"
+
+
+def test_setup_logging_registers_exit_flush_once(restore_logging):
+    """Test setting logging up again doesn't register another exit handler."""
+    with patch("app.logging_config.atexit.register") as register:
+        setup_logging(log_level="INFO", json_logs=True)
+        setup_logging(log_level="INFO", json_logs=True)
+
+    register.assert_not_called()
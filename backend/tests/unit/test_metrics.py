@@ -0,0 +1,99 @@
+"""Unit tests for the Prometheus metrics endpoint and instrumentation."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from openai import OpenAIError
+from prometheus_client import REGISTRY
+
+from app.services.openai_service import OpenAIService
+
+
+def sample(name: str, labels: dict[str, str]) -> float:
+    """Current value of a sample (0 if not yet recorded)."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    """Test /metrics serves the Prometheus text format."""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds" in response.text
+
+
+def test_request_latency_labelled_by_route_template(client):
+    """Test requests are recorded under their route, not the raw path."""
+    labels = {"method": "GET", "route": "/api/v1/health", "status": "200"}
+    before = sample("http_request_duration_seconds_count", labels)
+
+    client.get("/api/v1/health")
+
+    assert sample("http_request_duration_seconds_count", labels) == before + 1
+    assert sample("http_requests_in_progress", {"method": "GET"}) == 0
+
+
+def test_unmatched_paths_share_one_label(client):
+    """Test 404s don't create a label per path."""
+    labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    before = sample("http_request_duration_seconds_count", labels)
+
+    client.get("/no-such-path-1")
+    client.get("/no-such-path-2")
+
+    assert sample("http_request_duration_seconds_count", labels) == before + 2
+
+
+@patch("openai.AsyncOpenAI")
+async def test_openai_latency_and_tokens_recorded(mock_openai_class, mock_openai_key):
+    """Test OpenAI calls record latency and tokens per model."""
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(content="Hi"))]
+    response.model = "gpt-4o-mini"
+    response.usage = MagicMock(total_tokens=42)
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=response)
+    mock_openai_class.return_value = mock_client
+    latency_labels = {"model": "gpt-4o-mini", "operation": "chat"}
+    tokens_before = sample("openai_tokens_total", {"model": "gpt-4o-mini"})
+    calls_before = sample("openai_request_duration_seconds_count", latency_labels)
+
+    await OpenAIService().chat_completion("Hello", use_cache=False)
+
+    assert sample("openai_tokens_total", {"model": "gpt-4o-mini"}) == tokens_before + 42
+    assert sample("openai_request_duration_seconds_count", latency_labels) == calls_before + 1
+
+
+@patch("openai.AsyncOpenAI")
+async def test_openai_cached_prompt_tokens_recorded(mock_openai_class, mock_openai_key):
+    """Test prompt tokens served from the provider's prefix cache are counted."""
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(content="Hi"))]
+    response.model = "gpt-4o"
+    response.usage = MagicMock(
+        total_tokens=2100, prompt_tokens_details=MagicMock(cached_tokens=1536)
+    )
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=response)
+    mock_openai_class.return_value = mock_client
+    before = sample("openai_cached_prompt_tokens_total", {"model": "gpt-4o"})
+
+    await OpenAIService().chat_completion("Hello", model="gpt-4o", use_cache=False)
+
+    assert sample("openai_cached_prompt_tokens_total", {"model": "gpt-4o"}) == before + 1536
+
+
+@patch("openai.AsyncOpenAI")
+async def test_openai_errors_counted_by_type(mock_openai_class, mock_openai_key):
+    """Test failed OpenAI calls are counted by exception type."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=OpenAIError("boom"))
+    mock_openai_class.return_value = mock_client
+    labels = {"component": "openai", "type": "OpenAIError"}
+    before = sample("errors_total", labels)
+
+    with pytest.raises(OpenAIError):
+        await OpenAIService().chat_completion("Hello", use_cache=False)
+
+    assert sample("errors_total", labels) == before + 1
@@ -1,11 +1,19 @@
 """Unit tests for OpenAI service."""
 
+import asyncio
+import base64
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+import numpy as np
 import pytest
+from openai import RateLimitError
 
 from app.config import settings
+from app.models.ai import ChatStreamDone
 from app.services.openai_service import OpenAIService
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.tokenizer import PromptTooLongError
 
 
 @pytest.fixture
@@ -22,7 +30,7 @@ def mock_openai_response():
     return mock_response
 
 
-@patch("app.services.openai_service.AsyncOpenAI")
+@patch("openai.AsyncOpenAI")
 def test_openai_service_initialization_with_key(mock_openai_class, mock_openai_key):
     """Test service initializes correctly with API key."""
     service = OpenAIService()
@@ -36,7 +44,26 @@ def test_openai_service_initialization_without_key():
     assert service.is_available is False
 
 
-@patch("app.services.openai_service.AsyncOpenAI")
+@patch("openai.AsyncOpenAI")
+def test_client_created_on_first_use(mock_openai_class, mock_openai_key):
+    """Test the client is only created on the first call (or warm-up), once."""
+    service = OpenAIService()
+    mock_openai_class.assert_not_called()
+
+    service.warm_up()
+    service.warm_up()
+    mock_openai_class.assert_called_once()
+
+
+@patch("openai.AsyncOpenAI")
+@patch.object(settings, "OPENAI_API_KEY", None)
+def test_warm_up_without_key(mock_openai_class):
+    """Test warming up without an API key creates no client."""
+    OpenAIService().warm_up()
+    mock_openai_class.assert_not_called()
+
+
+@patch("openai.AsyncOpenAI")
 async def test_chat_completion_success(mock_openai_class, mock_openai_key, mock_openai_response):
     """Test successful chat completion."""
     # Setup mock
@@ -63,7 +90,7 @@ async def test_chat_completion_without_api_key():
         await service.chat_completion("Hello")
 
 
-@patch("app.services.openai_service.AsyncOpenAI")
+@patch("openai.AsyncOpenAI")
 async def test_test_connection_success(mock_openai_class, mock_openai_key):
     """Test successful connection test."""
     # Setup mock
@@ -87,3 +114,340 @@ async def test_test_connection_without_key():
 
     assert success is False
     assert "not configured" in message.lower()
+
+
+class FakeChatStream:
+    """Minimal stand-in for openai.AsyncStream."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def make_stream_chunks():
+    """Two text deltas followed by a usage-only chunk."""
+    return [
+        MagicMock(
+            model="gpt-4o-mini", usage=None, choices=[MagicMock(delta=MagicMock(content="Hel"))]
+        ),
+        MagicMock(
+            model="gpt-4o-mini", usage=None, choices=[MagicMock(delta=MagicMock(content="lo"))]
+        ),
+        MagicMock(model="gpt-4o-mini", usage=MagicMock(total_tokens=12), choices=[]),
+    ]
+
+
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_stream_success(mock_openai_class, mock_openai_key):
+    """Test streaming yields tokens then a summary with usage and TTFT."""
+    stream = FakeChatStream(make_stream_chunks())
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=stream)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    events = [event async for event in service.chat_completion_stream("Hello")]
+
+    assert [event.content for event in events[:-1]] == ["Hel", "lo"]
+    done = events[-1]
+    assert isinstance(done, ChatStreamDone)
+    assert done.tokens_used == 12
+    assert done.time_to_first_token_ms is not None
+    assert stream.closed is True
+
+
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_stream_closes_upstream_on_early_exit(
+    mock_openai_class, mock_openai_key
+):
+    """Test closing the generator early closes the upstream stream."""
+    stream = FakeChatStream(make_stream_chunks())
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=stream)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    events = service.chat_completion_stream("Hello")
+    first = await anext(events)
+    await events.aclose()
+
+    assert first.content == "Hel"
+    assert stream.closed is True
+
+
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_served_from_cache(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test identical requests only call OpenAI once."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    first = await service.chat_completion("Hello")
+    second = await service.chat_completion("Hello")
+
+    assert first == second
+    assert mock_client.chat.completions.create.await_count == 1
+    cache_stats = service.stats().cache
+    assert cache_stats is not None
+    assert cache_stats.hits == 1
+
+
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_bypasses_cache(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test use_cache=False always calls OpenAI."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    await service.chat_completion("Hello", use_cache=False)
+    await service.chat_completion("Hello", use_cache=False)
+
+    assert mock_client.chat.completions.create.await_count == 2
+
+
+@patch("openai.AsyncOpenAI")
+async def test_concurrent_identical_chat_completions_are_coalesced(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test concurrent identical requests make one upstream call."""
+
+    async def slow_create(**_kwargs):
+        await asyncio.sleep(0.01)
+        return mock_openai_response
+
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=slow_create)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    results = await asyncio.gather(*(service.chat_completion("Hello") for _ in range(3)))
+
+    assert len(set(results)) == 1
+    assert mock_client.chat.completions.create.await_count == 1
+    assert service.stats().coalescing.coalesced == 2
+
+
+def make_rate_limit_error(headers: dict[str, str] | None = None, code: str | None = None):
+    """Build the error the SDK raises for a 429 response."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, request=request, headers=headers)
+    body = {"code": code} if code else None
+    return RateLimitError("Rate limit reached", response=response, body=body)
+
+
+@patch.object(settings, "OPENAI_RETRY_BASE_DELAY_SECONDS", 0.001)
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_retries_after_rate_limit(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test a 429 is retried after the server-suggested delay."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(
+        side_effect=[make_rate_limit_error({"retry-after-ms": "5"}), mock_openai_response]
+    )
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    content, _, _ = await service.chat_completion("Hello")
+
+    assert content == "Test response"
+    assert mock_client.chat.completions.create.await_count == 2
+
+
+@patch.object(settings, "OPENAI_RETRY_BASE_DELAY_SECONDS", 0.001)
+@patch.object(settings, "OPENAI_MAX_RETRIES", 1)
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_persistent_rate_limit_raises(mock_openai_class, mock_openai_key):
+    """Test 429s that outlast the retries surface as RateLimitExceededError."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(
+        side_effect=make_rate_limit_error({"retry-after": "0.001"})
+    )
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    with pytest.raises(RateLimitExceededError):
+        await service.chat_completion("Hello")
+
+    assert mock_client.chat.completions.create.await_count == 2
+
+
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_quota_error_not_retried(mock_openai_class, mock_openai_key):
+    """Test an exhausted billing quota is not retried or treated as a rate limit."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(
+        side_effect=make_rate_limit_error(code="insufficient_quota")
+    )
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    with pytest.raises(RateLimitError):
+        await service.chat_completion("Hello")
+
+    assert mock_client.chat.completions.create.await_count == 1
+
+
+@patch.object(settings, "OPENAI_REQUESTS_PER_MINUTE", 1)
+@patch.object(settings, "OPENAI_MAX_RATE_LIMIT_WAIT_SECONDS", 1.0)
+@patch("openai.AsyncOpenAI")
+async def test_chat_completion_rejected_when_budget_exhausted(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test calls that would wait too long for budget fail fast without calling OpenAI."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    await service.chat_completion("Hello")
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await service.chat_completion("Hello again")
+
+    assert exc_info.value.retry_after > 1.0
+    assert mock_client.chat.completions.create.await_count == 1
+
+
+@patch("openai.AsyncOpenAI")
+async def test_oversize_prompt_rejected_before_sending(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test a prompt that can't fit the context window never reaches OpenAI."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+
+    with pytest.raises(PromptTooLongError) as exc_info:
+        await OpenAIService().chat_completion("warranty " * 20_000, model="gpt-4")
+
+    assert exc_info.value.max_prompt_tokens == 8_192 - settings.OPENAI_MIN_OUTPUT_TOKENS
+    mock_client.chat.completions.create.assert_not_called()
+
+
+@patch.object(settings, "PROMPT_OVERFLOW", "truncate")
+@patch("openai.AsyncOpenAI")
+async def test_oversize_message_truncated_to_fit(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test truncation keeps the start of the message and leaves room for the answer."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+    message = "warranty " * 20_000
+
+    await OpenAIService().chat_completion(message, model="gpt-4", max_tokens=500)
+
+    kwargs = mock_client.chat.completions.create.call_args.kwargs
+    sent = kwargs["messages"][1]["content"]
+    assert message.startswith(sent)
+    assert len(sent) < len(message)
+    assert settings.OPENAI_MIN_OUTPUT_TOKENS <= kwargs["max_tokens"] <= 500
+
+
+@patch("openai.AsyncOpenAI")
+async def test_max_tokens_limited_to_remaining_context(
+    mock_openai_class, mock_openai_key, mock_openai_response
+):
+    """Test max_tokens shrinks to what the prompt leaves of the context window."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+    mock_openai_class.return_value = mock_client
+    service = OpenAIService()
+    message = "warranty " * 2_500
+    prompt_tokens = service._tokenizer.count_chat("gpt-4", "Be brief.", message)
+
+    await service.chat_completion(
+        message, model="gpt-4", system_prompt="Be brief.", max_tokens=8_000
+    )
+
+    max_tokens = mock_client.chat.completions.create.call_args.kwargs["max_tokens"]
+    assert max_tokens == 8_192 - prompt_tokens
+
+
+def embeddings_response(texts: list[str]) -> MagicMock:
+    """Mock embeddings response encoding each text's length, in reverse order."""
+    data = [
+        MagicMock(
+            index=i,
+            embedding=base64.b64encode(
+                np.full(settings.EMBEDDING_DIMENSIONS, len(text), dtype=np.float32).tobytes()
+            ).decode(),
+        )
+        for i, text in enumerate(texts)
+    ]
+    return MagicMock(data=data[::-1], usage=MagicMock(total_tokens=len(texts)))
+
+
+@patch.object(settings, "DATABASE_URL", None)  # In-process cache tier only
+@patch("openai.AsyncOpenAI")
+async def test_concurrent_embeds_share_one_request(mock_openai_class, mock_openai_key):
+    """Test concurrent embed() calls are batched into a single upstream request."""
+    mock_client = AsyncMock()
+    mock_client.embeddings.create = AsyncMock(
+        side_effect=lambda **kwargs: embeddings_response(kwargs["input"])
+    )
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    first, second = await asyncio.gather(service.embed(["a", "bb"]), service.embed(["ccc"]))
+
+    assert mock_client.embeddings.create.await_count == 1
+    assert first.shape == (2, settings.EMBEDDING_DIMENSIONS)
+    assert first.dtype == np.float32
+    assert first[:, 0].tolist() == [1, 2]
+    assert second[:, 0].tolist() == [3]
+    assert service.stats().embeddings.texts == 3
+    await service.close()
+
+
+@patch("openai.AsyncOpenAI")
+async def test_embed_rejects_blank_text(mock_openai_class, mock_openai_key):
+    """Test blank texts are rejected before they can fail a shared batch."""
+    service = OpenAIService()
+
+    with pytest.raises(ValueError, match="blank"):
+        await service.embed(["ok", "  "])
+
+
+@patch.object(settings, "OPENAI_API_KEY", None)
+async def test_embed_without_api_key():
+    """Test embed raises error without API key."""
+    service = OpenAIService()
+
+    with pytest.raises(ValueError, match="AI service not available"):
+        await service.embed(["Hello"])
+
+
+@patch.object(settings, "DATABASE_URL", None)  # In-process cache tier only
+@patch("openai.AsyncOpenAI")
+async def test_embed_serves_repeated_texts_from_cache(mock_openai_class, mock_openai_key):
+    """Test texts embedded before, or repeated within a call, are embedded only once."""
+    mock_client = AsyncMock()
+    mock_client.embeddings.create = AsyncMock(
+        side_effect=lambda **kwargs: embeddings_response(kwargs["input"])
+    )
+    mock_openai_class.return_value = mock_client
+
+    service = OpenAIService()
+    await service.embed(["a", "bb"])
+    vectors = await service.embed(["bb", "ccc", "ccc"])
+
+    assert [call.kwargs["input"] for call in mock_client.embeddings.create.await_args_list] == [
+        ["a", "bb"],
+        ["ccc"],
+    ]
+    assert vectors[:, 0].tolist() == [2, 3, 3]
+    await service.close()
@@ -0,0 +1,119 @@
+"""Unit tests for document chat (retrieval-augmented generation)."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import settings
+from app.models.search import SearchResponse, SearchResult
+from app.services.rag import RAGService, context_budget, pack_context
+from app.services.tokenizer import Tokenizer
+from app.services.vector_index import SearchFilters
+
+
+def count_chars(text: str) -> int:
+    """Token count stand-in: one token per 4 characters."""
+    return len(text) // 4
+
+
+def result(document_id: str, chunk_hash: str, text: str | None, page: int = 0) -> SearchResult:
+    return SearchResult(
+        document_id=document_id, page=page, score=0.5, chunk_hash=chunk_hash, text=text
+    )
+
+
+@pytest.fixture
+def search_service():
+    """Search returning a warranty chunk (best) and a receipt chunk."""
+    results = [
+        result("manual", "w" * 64, "The warranty lasts two years.", page=3),
+        result("receipt", "r" * 64, "Purchased 2024-03-25 at ACME Hardware."),
+    ]
+    return MagicMock(search=AsyncMock(return_value=SearchResponse(query="q", results=results)))
+
+
+@pytest.fixture
+def openai_service():
+    return MagicMock(
+        chat_completion=AsyncMock(
+            return_value=("Two years, bought in March [2].", "gpt-4o-mini", 90)
+        )
+    )
+
+
+def test_pack_context_keeps_best_ranked_that_fit():
+    """Test lower-ranked chunks fill the budget left by one that doesn't fit."""
+    results = [
+        result("a", "1" * 64, "x" * 400),  # ~120 tokens with overhead
+        result("b", "2" * 64, "y" * 4000),  # Too big for what's left
+        result("c", "3" * 64, "z" * 200),
+    ]
+
+    packed = pack_context(results, budget=200, count_tokens=count_chars)
+
+    assert [source.document_id for source in packed] == ["a", "c"]
+
+
+def test_pack_context_drops_duplicates_and_missing_text():
+    """Test repeated chunks and identical text are packed once."""
+    results = [
+        result("b", "1" * 64, "Same  text"),
+        result("a", "1" * 64, "Same text"),
+        result("a", "2" * 64, "same text"),
+        result("a", "3" * 64, None),
+        result("a", "4" * 64, "Other text"),
+    ]
+
+    packed = pack_context(results, budget=1000, count_tokens=count_chars)
+
+    assert [(source.document_id, source.chunk_hash[0]) for source in packed] == [
+        ("a", "4"),
+        ("b", "1"),
+    ]
+
+
+def test_context_budget_respects_model_window(monkeypatch):
+    """Test the budget shrinks when the configured maximum wouldn't fit the model."""
+    monkeypatch.setattr(settings, "RAG_CONTEXT_MAX_TOKENS", 100_000)
+
+    tokenizer = Tokenizer(cache_size=16)
+
+    assert context_budget(tokenizer, "gpt-4o-mini", "question") == 100_000
+    assert context_budget(tokenizer, "gpt-4", "question") < 8_192 - settings.RAG_MAX_OUTPUT_TOKENS
+
+
+async def test_chat_answers_from_excerpts_with_citations(search_service, openai_service):
+    """Test excerpts go in the system prompt and cited ones are marked."""
+    service = RAGService(openai_service, search_service, Tokenizer(cache_size=16))
+    filters = SearchFilters(tags=("home",))
+
+    response = await service.chat("How long is the warranty?", "gpt-4o-mini", filters)
+
+    search_service.search.assert_awaited_once_with(
+        "How long is the warranty?", settings.RAG_SEARCH_K, filters
+    )
+    kwargs = openai_service.chat_completion.call_args.kwargs
+    assert kwargs["message"] == "How long is the warranty?"
+    prompt = kwargs["system_prompt"]
+    # Document order, not rank order, keeps the prefix stable across questions
+    assert prompt.index("[1] (document manual, page 4)") < prompt.index("[2] (document receipt")
+    assert "The warranty lasts two years." in prompt
+    assert response.response == "Two years, bought in March [2]."
+    assert [(c.index, c.document_id, c.cited) for c in response.citations] == [
+        (1, "manual", False),
+        (2, "receipt", True),
+    ]
+
+
+async def test_chat_without_matches_still_answers(search_service, openai_service):
+    """Test the model is told nothing matched instead of being given no context."""
+    search_service.search.return_value = SearchResponse(query="q", results=[])
+
+    response = await RAGService(openai_service, search_service, Tokenizer(cache_size=16)).chat(
+        "Anything?", "gpt-4o-mini"
+    )
+
+    assert (
+        "No document excerpts" in openai_service.chat_completion.call_args.kwargs["system_prompt"]
+    )
+    assert response.citations == []
@@ -0,0 +1,120 @@
+"""Unit tests for the OpenAI rate limiter."""
+
+import json
+import time
+
+import httpx
+import pytest
+
+from app.services.rate_limiter import (
+    RateLimiter,
+    RateLimitExceededError,
+    TokenBucket,
+    _parse_duration,
+    get_rate_limiter,
+    observe_rate_limit_headers,
+    retry_after_from_headers,
+)
+
+
+def test_token_bucket_waits_for_refill():
+    """Test consuming past the level reports the time until refill."""
+    bucket = TokenBucket(capacity_per_minute=60)  # 1 per second
+    now = time.monotonic()
+
+    bucket.consume(60, now)
+
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1) == pytest.approx(0.0)
+
+
+def test_token_bucket_sync_only_lowers_level():
+    """Test server headers can shrink the budget but not inflate it."""
+    bucket = TokenBucket(capacity_per_minute=100)
+
+    bucket.sync(limit=50, remaining=10)
+    assert bucket.capacity == 50
+    assert bucket.level == 10
+
+    bucket.sync(limit=None, remaining=40)
+    assert bucket.level == 10
+
+
+async def test_acquire_rejects_when_wait_too_long():
+    """Test callers are rejected with a retry hint instead of queueing too long."""
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, max_wait_seconds=1.0)
+
+    await limiter.acquire("gpt-4o-mini", 10)
+    await limiter.acquire("gpt-4o-mini", 10)
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await limiter.acquire("gpt-4o-mini", 10)
+
+    assert exc_info.value.retry_after == pytest.approx(30.0, rel=0.01)
+
+
+async def test_acquire_budgets_are_per_model():
+    """Test exhausting one model's budget doesn't block another model."""
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=100, max_wait_seconds=0.0)
+
+    await limiter.acquire("gpt-4o", 100)
+    await limiter.acquire("gpt-4o-mini", 100)
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire("gpt-4o", 100)
+
+
+async def test_pause_blocks_model():
+    """Test a pause (e.g. after a 429) holds back callers for that model."""
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1000, max_wait_seconds=1.0)
+
+    limiter.pause("gpt-4o-mini", 5.0)
+
+    with pytest.raises(RateLimitExceededError):
+        await limiter.acquire("gpt-4o-mini", 1)
+
+
+def test_parse_duration():
+    """Test OpenAI reset durations are parsed to seconds."""
+    assert _parse_duration("20ms") == pytest.approx(0.02)
+    assert _parse_duration("1s") == 1.0
+    assert _parse_duration("6m0s") == 360.0
+    assert _parse_duration("1h2m3.5s") == pytest.approx(3723.5)
+    assert _parse_duration("soon") is None
+
+
+def test_retry_after_from_headers():
+    """Test Retry-After takes precedence over x-ratelimit-reset-* headers."""
+    assert retry_after_from_headers({"retry-after": "2"}) == 2.0
+    assert retry_after_from_headers({"retry-after-ms": "250"}) == 0.25
+    assert (
+        retry_after_from_headers(
+            {"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}
+        )
+        == 360.0
+    )
+    assert retry_after_from_headers({}) is None
+
+
+async def test_observe_rate_limit_headers_updates_model_budget():
+    """Test response headers adjust the budget of the model in the request."""
+    request = httpx.Request(
+        "POST",
+        "https://api.openai.com/v1/chat/completions",
+        content=json.dumps({"model": "gpt-4o-mini", "messages": []}).encode(),
+    )
+    response = httpx.Response(
+        200,
+        request=request,
+        headers={
+            "x-ratelimit-limit-requests": "5000",
+            "x-ratelimit-remaining-requests": "3",
+            "x-ratelimit-limit-tokens": "4000000",
+            "x-ratelimit-remaining-tokens": "1000",
+        },
+    )
+
+    await observe_rate_limit_headers(response)
+
+    budget = get_rate_limiter()._budget("gpt-4o-mini")
+    assert budget.requests.capacity == 5000
+    assert budget.requests.level == 3
+    assert budget.tokens.level == 1000
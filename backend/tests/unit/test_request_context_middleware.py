@@ -0,0 +1,118 @@
+"""Unit tests for the request context middleware."""
+
+import logging
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.middleware.request_context import (
+    AccessLogSampler,
+    RequestContextMiddleware,
+    _build_security_headers,
+)
+
+
+def test_response_has_request_id_and_security_headers(client):
+    """Test middleware adds request ID, timing and security headers."""
+    response = client.get("/api/v1/health")
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"]
+    assert float(response.headers["X-Process-Time"]) >= 0
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_client_request_id_is_propagated(client):
+    """Test an incoming X-Request-ID is reused in the response."""
+    response = client.get("/api/v1/health", headers={"X-Request-ID": "req-123"})
+
+    assert response.headers["X-Request-ID"] == "req-123"
+
+
+def test_request_id_available_in_request_state():
+    """Test handlers can read the request ID from request.state."""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/echo")
+    async def echo(request: Request) -> dict[str, str]:
+        return {"request_id": request.state.request_id}
+
+    response = TestClient(app).get("/echo", headers={"X-Request-ID": "abc"})
+
+    assert response.json() == {"request_id": "abc"}
+
+
+def test_streaming_response_passes_through():
+    """Test streamed bodies are relayed intact with headers added."""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    response = TestClient(app).get("/stream")
+
+    assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+    assert response.headers["X-Request-ID"]
+
+
+def test_headers_set_by_the_app_are_replaced():
+    """Test request ID and timing headers the app already set are replaced, not duplicated."""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/proxied")
+    async def proxied() -> Response:
+        return Response(headers={"X-Request-ID": "upstream", "X-Process-Time": "9.999"})
+
+    response = TestClient(app).get("/proxied", headers={"X-Request-ID": "abc"})
+
+    assert response.headers.get_list("X-Request-ID") == ["abc"]
+    assert len(response.headers.get_list("X-Process-Time")) == 1
+    assert response.headers["X-Process-Time"] != "9.999"
+
+
+def test_security_headers_skip_hsts_in_debug():
+    """Test HSTS is only sent outside debug mode."""
+    debug_headers = dict(_build_security_headers(debug=True))
+    prod_headers = dict(_build_security_headers(debug=False))
+
+    assert b"strict-transport-security" not in debug_headers
+    assert b"strict-transport-security" in prod_headers
+
+
+def test_access_log_sampler_matches_longest_prefix():
+    """Test the most specific prefix decides the sample rate."""
+    sampler = AccessLogSampler({"/api/v1/health": 0.0, "/api/v1/health/full": 1.0})
+
+    assert sampler.rate_for("/api/v1/health") == 0.0
+    assert sampler.rate_for("/api/v1/health/full") == 1.0
+    assert sampler.rate_for("/api/v1/healthz") == 1.0
+    assert sampler.rate_for("/api/v1/ai/chat") == 1.0
+
+
+def test_sampled_out_requests_are_not_logged(caplog):
+    """Test requests on a route sampled at 0 produce no access log."""
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/quiet")
+    async def quiet() -> dict[str, str]:
+        return {}
+
+    with patch.object(settings, "LOG_ACCESS_SAMPLE_RATES", "/quiet=0"):
+        test_client = TestClient(app)
+        with caplog.at_level(logging.INFO, logger="app.middleware.request_context"):
+            test_client.get("/quiet")
+
+    assert not caplog.records
@@ -0,0 +1,107 @@
+"""Unit tests for the chat response cache."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.config import settings
+from app.db.engine import dispose_engine
+from app.services.response_cache import (
+    CachedCompletion,
+    InMemoryResponseCache,
+    PostgresResponseCache,
+    build_response_cache,
+    make_cache_key,
+)
+
+
+def make_cache(**overrides) -> InMemoryResponseCache:
+    options = {"ttl_seconds": 60, "max_entries": 10, "max_bytes": 1024 * 1024} | overrides
+    return InMemoryResponseCache(**options)
+
+
+def test_cache_key_depends_on_all_inputs():
+    """Test every request parameter changes the cache key."""
+    base = make_cache_key("gpt-4o-mini", "system", "hello", 500)
+
+    assert base == make_cache_key("gpt-4o-mini", "system", "hello", 500)
+    assert base != make_cache_key("gpt-4o", "system", "hello", 500)
+    assert base != make_cache_key("gpt-4o-mini", "other", "hello", 500)
+    assert base != make_cache_key("gpt-4o-mini", "system", "hello!", 500)
+    assert base != make_cache_key("gpt-4o-mini", "system", "hello", 100)
+
+
+async def test_cache_hit_and_miss_counters():
+    """Test lookups count hits and misses."""
+    cache = make_cache()
+    value = CachedCompletion("answer", "gpt-4o-mini", 10)
+
+    assert await cache.get("key") is None
+    await cache.set("key", value)
+    assert await cache.get("key") == value
+
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.hit_ratio == 0.5
+    assert stats.entries == 1
+
+
+async def test_cache_entries_expire_after_ttl():
+    """Test entries are not served after their TTL."""
+    cache = make_cache(ttl_seconds=10)
+
+    with patch("app.services.response_cache.time.monotonic", return_value=100.0):
+        await cache.set("key", CachedCompletion("answer", "gpt-4o-mini", 10))
+    with patch("app.services.response_cache.time.monotonic", return_value=111.0):
+        assert await cache.get("key") is None
+
+    assert cache.stats().evictions == 1
+    assert cache.stats().entries == 0
+
+
+async def test_cache_evicts_least_recently_used_entry():
+    """Test the least recently used entry is evicted when full."""
+    cache = make_cache(max_entries=2)
+    await cache.set("a", CachedCompletion("a", "m", 1))
+    await cache.set("b", CachedCompletion("b", "m", 1))
+    await cache.get("a")  # "b" is now least recently used
+    await cache.set("c", CachedCompletion("c", "m", 1))
+
+    assert await cache.get("a") is not None
+    assert await cache.get("b") is None
+    assert await cache.get("c") is not None
+
+
+async def test_cache_is_bounded_by_bytes():
+    """Test total size stays under max_bytes."""
+    cache = make_cache(max_bytes=1000)
+    for i in range(10):
+        await cache.set(str(i), CachedCompletion("x" * 300, "m", 1))
+
+    assert cache.size_bytes <= 1000
+    assert await cache.get("9") is not None
+    assert await cache.get("0") is None
+
+
+@patch.object(settings, "DATABASE_URL", "postgresql+asyncpg://postgres@127.0.0.1:1/none")
+async def test_postgres_cache_unreachable_database_is_a_miss():
+    """Test an unreachable database (OSError from the driver) doesn't fail the request."""
+    await dispose_engine()
+    cache = PostgresResponseCache(ttl_seconds=60, max_entries=10)
+    try:
+        await cache.set("key", CachedCompletion("answer", "gpt-4o-mini", 10))
+        assert await cache.get("key") is None
+    finally:
+        await dispose_engine()
+
+    assert cache.stats().misses == 1
+
+
+@patch.object(settings, "RESPONSE_CACHE_ENABLED", True)
+@patch.object(settings, "RESPONSE_CACHE_BACKEND", "postgres")
+@patch.object(settings, "DATABASE_URL", None)
+def test_postgres_backend_requires_database():
+    """Test the Postgres backend is rejected without a database to store it in."""
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        build_response_cache()
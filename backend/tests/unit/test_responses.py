@@ -0,0 +1,98 @@
+"""Unit tests for custom response classes."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from app.config import settings
+from app.models.ai import ChatResponse
+from app.responses import EventStreamResponse, NDJSONResponse, json_response_class, trusted_model
+
+
+async def test_event_stream_closes_generator_on_disconnect():
+    """Test a client disconnect stops and closes the event generator."""
+    closed = asyncio.Event()
+
+    async def events():
+        try:
+            yield "event: token\ndata: {}\n\n"
+            await asyncio.sleep(60)  # Upstream still generating
+            yield "never sent"
+        finally:
+            closed.set()
+
+    sent: list[dict] = []
+
+    async def receive():
+        await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    response = EventStreamResponse(events())
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=1)
+
+    assert closed.is_set()
+    assert sent[0]["type"] == "http.response.start"
+    assert all(m.get("body") != b"never sent" for m in sent)
+
+
+@pytest.mark.parametrize("disconnect", [False, True])
+async def test_streaming_response_runs_background_task(disconnect):
+    """Test background tasks run after the stream, whether it finished or the client left."""
+    ran = asyncio.Event()
+
+    async def lines():
+        yield "{}\n"
+        if disconnect:
+            await asyncio.sleep(60)
+
+    async def receive():
+        await asyncio.sleep(0.01 if disconnect else 60)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    response = NDJSONResponse(lines(), background=BackgroundTask(ran.set))
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=1)
+
+    assert ran.is_set()
+
+
+def test_json_response_class():
+    """Test responses are serialized with orjson only in fast mode."""
+    assert json_response_class() is JSONResponse
+    with patch.object(settings, "FAST_JSON_RESPONSES", True):
+        assert json_response_class() is ORJSONResponse
+
+
+def test_trusted_model_validates_by_default():
+    """Test models are validated unless fast mode is on."""
+    with pytest.raises(ValidationError):
+        trusted_model(ChatResponse, response="Hi", model="gpt-4o-mini", tokens_used=-1)
+
+
+@patch.object(settings, "FAST_JSON_RESPONSES", True)
+def test_trusted_model_skips_validation_in_fast_mode():
+    """Test fast mode builds the model without validating, with defaults filled in."""
+    response = trusted_model(ChatResponse, response="Hi", model="gpt-4o-mini", tokens_used=-1)
+    assert response.tokens_used == -1
+    assert response.citations == []
+    assert (
+        response.model_dump_json()
+        == trusted_model(
+            ChatResponse, response="Hi", model="gpt-4o-mini", tokens_used=-1
+        ).model_dump_json()
+    )
+
+
+def test_orjson_response_matches_json_response():
+    """Test both response classes produce the same body."""
+    content = {"error": "Validation error", "errors": [{"field": "body.message", "type": "x"}]}
+    assert ORJSONResponse(content).body == JSONResponse(content).body
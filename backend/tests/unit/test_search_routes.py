@@ -0,0 +1,82 @@
+"""Unit tests for the search endpoint."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.services.rate_limiter import RateLimitExceededError
+from app.services.search import SearchService, get_search_service
+from app.services.vector_index import IndexEntry, VectorIndex
+
+
+@pytest.fixture
+def openai_service():
+    """AI service embedding every query as [1, 0, 0, 0]."""
+    return MagicMock(
+        embed=AsyncMock(return_value=np.array([[1, 0, 0, 0]], dtype=np.float32)),
+    )
+
+
+@pytest.fixture
+def search_client(client, openai_service):
+    """Client searching a small in-memory index."""
+    index = VectorIndex(None, dimensions=4)
+    index.replace_document(
+        "warranty-doc",
+        [IndexEntry("a" * 64, 0), IndexEntry("b" * 64, 3)],
+        np.array([[0.9, 0.1, 0, 0], [0, 1, 0, 0]], dtype=np.float32),
+        tags=("appliances",),
+    )
+    service = SearchService(openai_service, index, chunk_store=None)
+    app.dependency_overrides[get_search_service] = lambda: service
+    yield client
+    app.dependency_overrides.clear()
+
+
+def test_search_returns_ranked_results(search_client):
+    """Test results come back best first with document and page."""
+    response = search_client.get("/api/v1/search", params={"q": "warranty", "k": 2})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["document_id"], r["page"]) for r in results] == [
+        ("warranty-doc", 0),
+        ("warranty-doc", 3),
+    ]
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_search_tag_filter(search_client):
+    """Test repeated tag parameters filter results."""
+    response = search_client.get("/api/v1/search", params={"q": "warranty", "tag": ["receipts"]})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+def test_search_requires_query(search_client):
+    """Test an empty query is rejected."""
+    response = search_client.get("/api/v1/search", params={"q": ""})
+
+    assert response.status_code == 422
+
+
+def test_search_without_ai_service(search_client, openai_service):
+    """Test 503 when queries can't be embedded."""
+    openai_service.embed.side_effect = ValueError("AI service not available")
+
+    response = search_client.get("/api/v1/search", params={"q": "warranty"})
+
+    assert response.status_code == 503
+
+
+def test_search_rate_limited(search_client, openai_service):
+    """Test 429 with Retry-After when the embedding budget is exhausted."""
+    openai_service.embed.side_effect = RateLimitExceededError(retry_after=2.5)
+
+    response = search_client.get("/api/v1/search", params={"q": "warranty"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,108 @@
+"""Unit tests for hybrid search."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.services.search import SearchService, fuse
+from app.services.vector_index import IndexEntry, SearchHit, VectorIndex
+
+WARRANTY = "a" * 64
+MANUAL = "b" * 64
+RECEIPT = "c" * 64
+
+
+@pytest.fixture
+def openai_service():
+    """AI service embedding every query as [1, 0, 0, 0]."""
+    return MagicMock(
+        embed=AsyncMock(return_value=np.array([[1, 0, 0, 0]], dtype=np.float32)),
+    )
+
+
+@pytest.fixture
+def chunk_store():
+    """Chunk store whose full-text search only matches the receipt chunk."""
+    return MagicMock(
+        search_text=AsyncMock(return_value={RECEIPT: 0.6}),
+        get_texts=AsyncMock(return_value={RECEIPT: "Order ORD-48213 shipped"}),
+    )
+
+
+@pytest.fixture
+def service(openai_service, chunk_store):
+    index = VectorIndex(None, dimensions=4)
+    index.replace_document(
+        "doc",
+        [IndexEntry(WARRANTY, 0), IndexEntry(MANUAL, 1), IndexEntry(RECEIPT, 2)],
+        np.array([[1, 0.1, 0, 0], [0.5, 1, 0, 0], [0, 0, 1, 0]], dtype=np.float32),
+    )
+    return SearchService(openai_service, index, chunk_store)
+
+
+def test_fuse_sums_reciprocal_ranks():
+    """Test a chunk ranked well by both legs beats one ranked first by a single leg."""
+    rankings = {
+        "vector": [SearchHit("x", "doc", 0, 0.9), SearchHit("y", "doc", 1, 0.8)],
+        "lexical": [SearchHit("z", "doc", 2, 0.7), SearchHit("y", "doc", 1, 0.5)],
+    }
+
+    results = fuse(rankings, rrf_k=60)
+
+    assert [result.chunk_hash for result in results] == ["y", "x", "z"]
+    assert results[0].score == pytest.approx(2 / 62)
+    assert (results[0].vector_score, results[0].lexical_score) == (0.8, 0.5)
+    assert results[1].lexical_score is None
+
+
+async def test_exact_token_match_is_returned(service, chunk_store):
+    """Test an exact-token full-text match is fused to the top, with its text."""
+    response = await service.search("ORD-48213", k=3)
+
+    assert response.degraded == []
+    # First by full text and third by vector search beats first by vector search alone
+    receipt = response.results[0]
+    assert receipt.chunk_hash == RECEIPT
+    assert receipt.score == pytest.approx(1 / 61 + 1 / 63)
+    assert receipt.lexical_score == 0.6
+    assert receipt.text == "Order ORD-48213 shipped"
+    chunk_store.search_text.assert_awaited_once_with("ORD-48213", settings.SEARCH_CANDIDATES)
+
+
+@patch.object(settings, "SEARCH_LEXICAL_TIMEOUT_MS", 10.0)
+async def test_slow_leg_is_left_out(service, chunk_store):
+    """Test a leg that exceeds its timeout doesn't stall the response."""
+
+    async def slow_search(query, limit):
+        await asyncio.sleep(1)
+
+    chunk_store.search_text.side_effect = slow_search
+
+    response = await service.search("warranty", k=2)
+
+    assert response.degraded == ["lexical"]
+    assert [result.chunk_hash for result in response.results] == [WARRANTY, MANUAL]
+    assert response.results[0].lexical_score is None
+
+
+async def test_vector_failure_falls_back_to_full_text(service, openai_service):
+    """Test full-text results are still returned when the query can't be embedded."""
+    openai_service.embed.side_effect = ValueError("AI service not available")
+
+    response = await service.search("ORD-48213", k=3)
+
+    assert response.degraded == ["vector"]
+    assert [result.chunk_hash for result in response.results] == [RECEIPT]
+
+
+async def test_all_legs_failing_raises_vector_error(service, openai_service, chunk_store):
+    """Test the embedding error surfaces when no leg succeeded."""
+    openai_service.embed.side_effect = ValueError("AI service not available")
+    chunk_store.search_text.side_effect = OperationalError("SELECT", {}, Exception("down"))
+
+    with pytest.raises(ValueError, match="not available"):
+        await service.search("warranty", k=3)
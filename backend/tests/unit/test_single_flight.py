@@ -0,0 +1,128 @@
+"""Unit tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    """Test identical concurrent calls run once and all get the result."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    stats = single_flight.stats()
+    assert stats.executions == 1
+    assert stats.coalesced == 4
+    assert stats.in_flight == 0
+
+
+async def test_different_keys_are_not_coalesced():
+    """Test calls with different keys run independently."""
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        return "result"
+
+    await asyncio.gather(single_flight.do("a", fetch), single_flight.do("b", fetch))
+
+    assert single_flight.stats().executions == 2
+
+
+async def test_errors_are_raised_to_every_waiter():
+    """Test a failing call raises in all waiters."""
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        single_flight.do("key", fail), single_flight.do("key", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_waiter_does_not_cancel_others():
+    """Test one waiter disconnecting leaves the shared call running."""
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_call_cancelled_when_all_waiters_leave():
+    """Test the shared call is cancelled once nobody is waiting for it."""
+    single_flight = SingleFlight()
+    upstream_cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            upstream_cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    await asyncio.wait_for(upstream_cancelled.wait(), timeout=1)
+    assert single_flight.stats().in_flight == 0
+
+
+async def test_join_after_last_waiter_cancelled_starts_fresh_call():
+    """Test a caller arriving while a cancelled call unwinds isn't handed its cancellation."""
+    single_flight = SingleFlight()
+    release_cleanup = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                # Slow cleanup, like closing an upstream HTTP response
+                await release_cleanup.wait()
+                raise
+        return "fresh"
+
+    waiter = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert await asyncio.wait_for(single_flight.do("key", fetch), timeout=1) == "fresh"
+    assert single_flight.executions == 2
+    release_cleanup.set()
+    await asyncio.sleep(0)  # Let the cancelled call finish unwinding
@@ -0,0 +1,91 @@
+"""Unit tests for local token counting."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+from app.config import settings
+from app.services import tokenizer as tokenizer_module
+from app.services.tokenizer import Tokenizer, context_window
+
+
+def test_counts_are_memoized():
+    """Test a repeated text is only tokenized once."""
+    tokenizer = Tokenizer(cache_size=16)
+
+    first = tokenizer.count("You are a helpful assistant.", "gpt-4o-mini")
+    second = tokenizer.count("You are a helpful assistant.", "gpt-4o-mini")
+
+    assert first == second > 0
+    assert tokenizer._count.cache_info().hits == 1
+
+
+def test_chat_count_includes_message_overhead():
+    """Test a chat prompt costs more than its two texts."""
+    tokenizer = Tokenizer(cache_size=16)
+
+    total = tokenizer.count_chat("gpt-4o-mini", "Be brief.", "What is the warranty?")
+
+    texts = tokenizer.count("Be brief.", "gpt-4o-mini") + tokenizer.count(
+        "What is the warranty?", "gpt-4o-mini"
+    )
+    assert total > texts
+
+
+def test_truncate_fits_token_limit():
+    """Test truncation keeps the start of the text within the limit."""
+    tokenizer = Tokenizer(cache_size=16)
+    text = "The dishwasher warranty covers parts and labour. " * 100
+
+    truncated = tokenizer.truncate(text, "gpt-4o-mini", 50)
+
+    assert text.startswith(truncated)
+    assert 0 < tokenizer.count(truncated, "gpt-4o-mini") <= 50
+
+
+def test_falls_back_to_estimate_without_tiktoken(monkeypatch):
+    """Test counting by characters when tiktoken isn't installed."""
+    monkeypatch.setattr(tokenizer_module, "tiktoken", None)
+    tokenizer = Tokenizer(cache_size=16)
+
+    assert tokenizer.count("a" * 400, "gpt-4o-mini") == 100
+    assert tokenizer.truncate("a" * 400, "gpt-4o-mini", 10) == "a" * 40
+
+
+def test_context_window_matches_most_specific_prefix():
+    """Test dated model names resolve to their family's window."""
+    assert context_window("gpt-4o-mini-2024-07-18") == 128_000
+    assert context_window("gpt-4-0613") == 8_192
+    assert context_window("some-local-model") == 8_192
+
+
+async def test_prepare_loads_encoding_off_the_event_loop():
+    """Test a model's encoding is loaded in a worker thread, once."""
+    loaded_in: list[int] = []
+
+    def load(_model):
+        loaded_in.append(threading.get_ident())
+
+    tokenizer = Tokenizer(cache_size=16)
+    with patch.object(tokenizer_module, "_load_encoding", side_effect=load):
+        await tokenizer.prepare("gpt-4o-mini")
+        await tokenizer.prepare("gpt-4o-mini")
+
+    assert len(loaded_in) == 1
+    assert loaded_in[0] != threading.get_ident()
+
+
+def test_warm_up_loads_configured_models():
+    """Test warming up loads the chat, embedding and field extraction encodings."""
+    tokenizer = Tokenizer(cache_size=16)
+    with (
+        patch.object(tokenizer_module, "tiktoken", MagicMock()),
+        patch.object(tokenizer_module, "_load_encoding", return_value=None) as load,
+        patch.object(settings, "FIELD_EXTRACTION_MODEL", "gpt-4.1-mini"),
+    ):
+        tokenizer.warm_up()
+
+    assert {call.args[0] for call in load.call_args_list} == {
+        settings.CHAT_MODEL,
+        settings.EMBEDDING_MODEL,
+        "gpt-4.1-mini",
+    }
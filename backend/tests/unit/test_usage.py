@@ -0,0 +1,47 @@
+"""Unit tests for per-user usage and cost accounting."""
+
+import pytest
+
+from app.services.usage import ANONYMOUS_USER, UsageLedger, cost_usd, current_user
+
+
+def test_cost_uses_cached_and_output_prices():
+    """Test cached prompt tokens are billed at the cached price."""
+    # gpt-4o-mini: $0.15 input, $0.075 cached input, $0.60 output per million
+    cost = cost_usd("gpt-4o-mini-2024-07-18", 2_000_000, 1_000_000, cached_tokens=1_000_000)
+
+    assert cost == pytest.approx(0.15 + 0.075 + 0.60)
+    assert cost_usd("some-local-model", 1000, 1000) == 0.0
+
+
+def test_ledger_attributes_calls_to_current_user():
+    """Test usage accumulates per user, most recently active first."""
+    ledger = UsageLedger(max_users=10)
+
+    token = current_user.set("alice")
+    try:
+        ledger.record("gpt-4o-mini", 100, 20)
+        ledger.record("gpt-4o-mini", 300, 40, cached_tokens=200)
+    finally:
+        current_user.reset(token)
+    ledger.record("gpt-4o-mini", 50, 5)
+
+    users = ledger.report().users
+    assert [usage.user for usage in users] == [ANONYMOUS_USER, "alice"]
+    alice = ledger.report("alice").users[0]
+    assert (alice.requests, alice.prompt_tokens, alice.cached_prompt_tokens) == (2, 400, 200)
+    assert alice.completion_tokens == 60
+    assert alice.cost_usd > 0
+
+
+def test_ledger_drops_least_recently_active_user():
+    """Test only max_users users are kept."""
+    ledger = UsageLedger(max_users=2)
+
+    for user in ("a", "b", "a", "c"):
+        token = current_user.set(user)
+        ledger.record("gpt-4o-mini", 10, 1)
+        current_user.reset(token)
+
+    assert [usage.user for usage in ledger.report().users] == ["c", "a"]
+    assert ledger.report("b").users == []
@@ -0,0 +1,169 @@
+"""Unit tests for the in-process vector index."""
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import IndexEntry, SearchFilters, VectorIndex
+
+DIMENSIONS = 8
+
+
+def unit(i: int) -> np.ndarray:
+    """Basis vector i."""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    vector[i] = 1
+    return vector
+
+
+def add(index: VectorIndex, document_id: str, axes: list[int], **kwargs) -> None:
+    """Index one chunk per axis, with chunk hash f"{document_id}-{axis}" and page = axis."""
+    index.replace_document(
+        document_id,
+        [IndexEntry(f"{document_id}-{axis}", axis) for axis in axes],
+        np.stack([unit(axis) * 3 for axis in axes]),  # Unnormalized on purpose
+        **kwargs,
+    )
+
+
+def test_search_returns_top_k_by_cosine():
+    """Test results are the k most similar chunks, best first."""
+    index = VectorIndex(None, DIMENSIONS)
+    add(index, "doc", [0, 1, 2])
+
+    hits = index.search(unit(1) + 0.5 * unit(2), k=2)
+
+    assert [hit.chunk_hash for hit in hits] == ["doc-1", "doc-2"]
+    assert hits[0].score == pytest.approx(1 / np.sqrt(1.25))
+    assert hits[0].page == 1
+
+
+def test_new_version_replaces_document_chunks():
+    """Test re-indexing a document drops its previous chunks."""
+    index = VectorIndex(None, DIMENSIONS)
+    add(index, "doc", [0, 1])
+    add(index, "doc", [2])
+
+    assert index.size == 1
+    assert [hit.chunk_hash for hit in index.search(unit(0), k=10)] == ["doc-2"]
+
+
+def test_filters_by_tag_date_and_document():
+    """Test tag, date range and document filters restrict the candidates."""
+    index = VectorIndex(None, DIMENSIONS)
+    add(index, "old", [0], tags=("receipts",), indexed_at=datetime(2024, 1, 1, tzinfo=UTC))
+    add(index, "new", [1], tags=("receipts", "tax"), indexed_at=datetime(2025, 6, 1, tzinfo=UTC))
+    add(index, "manual", [2], indexed_at=datetime(2025, 6, 1, tzinfo=UTC))
+    query = unit(0) + unit(1) + unit(2)
+
+    def documents(**filters) -> set[str]:
+        return {hit.document_id for hit in index.search(query, 10, SearchFilters(**filters))}
+
+    assert documents(tags=("receipts",)) == {"old", "new"}
+    assert documents(tags=("receipts", "tax")) == {"new"}
+    assert documents(tags=("unknown",)) == set()
+    assert documents(date_from=datetime(2025, 1, 1)) == {"new", "manual"}
+    assert documents(date_to=datetime(2024, 12, 31, tzinfo=UTC)) == {"old"}
+    assert documents(document_id="manual") == {"manual"}
+
+
+def test_locate_resolves_and_filters_scored_chunks():
+    """Test chunks scored elsewhere map to live, filter-passing rows, best score first."""
+    index = VectorIndex(None, DIMENSIONS)
+    assert index.locate({"doc-0": 1.0}) == []
+    add(index, "doc", [0, 1, 2], tags=("receipts",))
+    add(index, "other", [3])
+    add(index, "doc", [1, 2], tags=("receipts",))  # New version drops doc-0
+
+    hits = index.locate({"doc-0": 0.9, "doc-1": 0.2, "doc-2": 0.5, "other-3": 0.7, "x": 1.0})
+
+    assert [(hit.chunk_hash, hit.score) for hit in hits] == [
+        ("other-3", 0.7),
+        ("doc-2", 0.5),
+        ("doc-1", 0.2),
+    ]
+    assert hits[1].document_id == "doc"
+    assert hits[1].page == 2
+    filtered = index.locate({"doc-1": 0.2, "other-3": 0.7}, SearchFilters(tags=("receipts",)))
+    assert [hit.chunk_hash for hit in filtered] == ["doc-1"]
+
+
+def test_persisted_index_reloads(tmp_path):
+    """Test vectors and metadata survive a reload from disk."""
+    index = VectorIndex(tmp_path, DIMENSIONS)
+    add(index, "doc", [3, 4], tags=("manuals",))
+
+    reloaded = VectorIndex(tmp_path, DIMENSIONS)
+    reloaded.load()
+
+    hits = reloaded.search(unit(4), k=1, filters=SearchFilters(tags=("manuals",)))
+    assert [(hit.document_id, hit.chunk_hash) for hit in hits] == [("doc", "doc-4")]
+    assert reloaded.size == 2
+
+
+def test_reload_with_other_dimensions_starts_empty(tmp_path):
+    """Test an index built for other embedding dimensions is not used."""
+    add(VectorIndex(tmp_path, DIMENSIONS), "doc", [0])
+
+    reloaded = VectorIndex(tmp_path, DIMENSIONS * 2)
+    reloaded.load()
+
+    assert reloaded.size == 0
+
+
+def test_compaction_keeps_live_rows(tmp_path):
+    """Test replaced rows are reclaimed without losing live ones."""
+    index = VectorIndex(tmp_path, DIMENSIONS)
+    add(index, "keep", [5])
+    for _ in range(3):
+        index.replace_document(
+            "churn",
+            [IndexEntry(f"c{i}", 0) for i in range(1000)],
+            np.tile(unit(0), (1000, 1)),
+        )
+
+    assert index._size < 3000
+    assert index.size == 1001
+    assert index.search(unit(5), k=1)[0].chunk_hash == "keep-5"
+
+
+def test_processes_sharing_an_index_see_each_others_changes(tmp_path):
+    """Test documents indexed by one process are searchable in another, without clobbering."""
+    first = VectorIndex(tmp_path, DIMENSIONS)
+    second = VectorIndex(tmp_path, DIMENSIONS)
+    first.load()
+    second.load()
+
+    add(first, "a", [1])
+    add(second, "b", [2])
+    add(first, "c", [3])
+
+    for index in (first, second):
+        assert {hit.document_id for hit in index.search(unit(1), k=10)} == {"a", "b", "c"}
+        assert index.search(unit(2), k=1)[0].chunk_hash == "b-2"
+
+    second.remove_document("a")
+    assert first.size == 2
+
+    reloaded = VectorIndex(tmp_path, DIMENSIONS)
+    reloaded.load()
+    assert [reloaded.search(unit(axis), k=1)[0].chunk_hash for axis in (2, 3)] == ["b-2", "c-3"]
+
+
+def test_shared_index_survives_growth_and_compaction_elsewhere(tmp_path):
+    """Test a process keeps finding the right rows after another one grows and compacts."""
+    reader = VectorIndex(tmp_path, DIMENSIONS)
+    writer = VectorIndex(tmp_path, DIMENSIONS)
+    add(reader, "keep", [5])
+    for _ in range(3):
+        writer.replace_document(
+            "churn",
+            [IndexEntry(f"c{i}", 0) for i in range(1000)],
+            np.tile(unit(0), (1000, 1)),
+        )
+
+    assert reader.size == 1001
+    assert reader.search(unit(5), k=1)[0].chunk_hash == "keep-5"
+    # The vectors file is never shrunk under another process's memory map
+    assert (tmp_path / "vectors.f32").stat().st_size >= reader._vectors.nbytes